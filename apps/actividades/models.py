@@ -5,11 +5,14 @@ from django.db import models
 
 from apps.clientes.models import Cliente
 from apps.oportunidades.models import Oportunidad
+from common.contadores import ContadoresMixin
 
 
-class Actividad(models.Model):
+class Actividad(ContadoresMixin):
     """Registro de actividades."""
 
+    contadores = {"cliente": "num_actividades"}
+
     TIPOS = [
         ("llamada", "Llamada"),
         ("reunion", "Reunión"),
@@ -33,9 +36,13 @@ class Actividad(models.Model):
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="actividades")
     resultado = models.TextField(null=True, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-fecha_hora"]
+        indexes = [
+            models.Index(fields=["estado", "fecha_hora"], name="idx_actividad_estado_fecha"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.asunto} - {self.estado}"
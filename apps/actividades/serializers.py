@@ -49,7 +49,8 @@ class ActividadSerializer(serializers.ModelSerializer):
             "usuario_id",
             "resultado",
             "fecha_creacion",
+            "fecha_actualizacion",
         ]
-        read_only_fields = ["id", "usuario", "usuario_id", "fecha_creacion"]
+        read_only_fields = ["id", "usuario", "usuario_id", "fecha_creacion", "fecha_actualizacion"]
 
 
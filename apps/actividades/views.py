@@ -15,8 +15,15 @@ from .serializers import ActividadSerializer
 
 @extend_schema(tags=["Actividades"])
 class ActividadViewSet(CSVExportMixin, BaseModelViewSet):
-    queryset = Actividad.objects.select_related("cliente", "oportunidad", "usuario")
+    queryset = Actividad.objects.all()
+    use_projection = True
     serializer_class = ActividadSerializer
+    field_select_related = {
+        "cliente": ("cliente",),
+        "oportunidad": ("oportunidad",),
+        "usuario": ("usuario",),
+    }
+    query_plans = {"export": (), "write": ("cliente", "oportunidad", "usuario")}
     filterset_class = ActividadFilter
     ordering_fields = ["fecha_hora", "fecha_creacion"]
     list_message = "Actividades obtenidas exitosamente"
@@ -40,10 +47,23 @@ class ActividadViewSet(CSVExportMixin, BaseModelViewSet):
         "usuario",
         "fecha_hora",
     )
+    csv_values = (
+        "id",
+        "tipo",
+        "asunto",
+        "estado",
+        "cliente__nombre_completo",
+        "oportunidad__nombre",
+        "usuario__nombre_completo",
+        "fecha_hora",
+    )
 
     def perform_create(self, serializer):
         serializer.save(usuario=self.request.user)
 
+    def bulk_prepare(self, instancia: Actividad):
+        instancia.usuario = self.request.user
+
     def csv_row_builder(self, actividad: Actividad):
         return (
             actividad.id,
@@ -62,7 +82,7 @@ class ActividadViewSet(CSVExportMixin, BaseModelViewSet):
         actividad = self.get_object()
         actividad.estado = "completada"
         actividad.resultado = payload["resultado"]
-        actividad.save(update_fields=["estado", "resultado"])
+        actividad.save(update_fields=["estado", "resultado", "fecha_actualizacion"])
         serializer = self.get_serializer(actividad)
         return success_response(serializer.data, message="Actividad marcada como completada")
 
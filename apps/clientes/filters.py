@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from django.db import models
 import django_filters
 
+from common.search import BusquedaTexto
+
 from .models import Cliente
 
 
@@ -15,11 +16,6 @@ class ClienteFilter(django_filters.FilterSet):
         fields = []
 
     def filter_search(self, queryset, name, value):
-        if not value:
-            return queryset
-        return queryset.filter(
-            models.Q(nombre_completo__icontains=value)
-            | models.Q(email__icontains=value)
-        )
+        return BusquedaTexto.filtrar(queryset, value)
 
 
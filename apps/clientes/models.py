@@ -3,11 +3,15 @@ from __future__ import annotations
 from django.db import models
 
 from apps.empresas.models import Empresa
+from common.contadores import ContadoresMixin, ContadoresPadreMixin
+from common.search import FullTextIndex
 
 
-class Cliente(models.Model):
+class Cliente(ContadoresMixin, ContadoresPadreMixin):
     """Contacto asociado a una empresa."""
 
+    contadores = {"empresa": "num_clientes"}
+
     nombre_completo = models.CharField(max_length=150)
     empresa = models.ForeignKey(Empresa, on_delete=models.PROTECT, related_name="clientes")
     cargo = models.CharField(max_length=100, null=True, blank=True)
@@ -16,9 +20,14 @@ class Cliente(models.Model):
     direccion = models.CharField(max_length=300, null=True, blank=True)
     notas = models.TextField(null=True, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    # Mantenidos por Oportunidad y Actividad (common.contadores).
+    num_oportunidades = models.IntegerField(default=0, editable=False, db_index=True)
+    num_actividades = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["nombre_completo"]
+        indexes = [FullTextIndex(fields=["nombre_completo", "email"], name="ft_cliente_busqueda")]
 
     def __str__(self) -> str:
         return f"{self.nombre_completo} - {self.empresa.nombre}"
@@ -35,9 +35,10 @@ class ClienteSerializer(serializers.ModelSerializer):
             "direccion",
             "notas",
             "fecha_creacion",
+            "fecha_actualizacion",
             "num_oportunidades",
             "num_actividades",
         ]
-        read_only_fields = ["id", "fecha_creacion", "num_oportunidades", "num_actividades"]
+        read_only_fields = ["id", "fecha_creacion", "fecha_actualizacion", "num_oportunidades", "num_actividades"]
 
 
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from itertools import count
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad
+from apps.reportes.tests import crear_datos
+
+from .models import Cliente
+
+# COUNT de la página y la página (con su empresa en el mismo JOIN).
+CONSULTAS_LIST = 2
+# El cliente con su empresa.
+CONSULTAS_RETRIEVE = 1
+# COUNT del límite de filas y el cursor de la exportación.
+CONSULTAS_EXPORT = 2
+# La empresa, el INSERT y num_clientes de la empresa, dentro de un savepoint.
+CONSULTAS_CREATE = 5
+# El cliente y el UPDATE, dentro de un savepoint.
+CONSULTAS_UPDATE = 4
+
+
+class ClienteConsultasTests(TestCase):
+    """Cada acción hace las mismas consultas sin importar cuántas filas haya."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = crear_datos(empresas=2, clientes=2, oportunidades=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.cliente = Cliente.objects.order_by("pk").first()
+        self.numero = count()
+
+    def ampliar(self):
+        for _ in range(5):
+            indice = next(self.numero)
+            cliente = Cliente.objects.create(
+                nombre_completo=f"Cliente extra {indice}",
+                empresa=Empresa.objects.create(nombre=f"Extra {indice}"),
+                telefono="+51999999999",
+                email=f"extra{indice}@example.com",
+            )
+            Oportunidad.objects.create(
+                nombre=f"Oportunidad extra {indice}",
+                cliente=cliente,
+                empresa=cliente.empresa,
+                valor=100,
+                probabilidad=50,
+                fecha_cierre_estimada="2099-01-01",
+                etapa="prospeccion",
+            )
+
+    def assertConsultasConstantes(self, consultas, peticion):
+        with self.assertNumQueries(consultas):
+            peticion()
+        self.ampliar()
+        with self.assertNumQueries(consultas):
+            peticion()
+
+    def test_list(self):
+        def listar():
+            self.assertEqual(self.client.get(reverse("cliente-list")).status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_LIST, listar)
+
+    def test_retrieve(self):
+        def detalle():
+            respuesta = self.client.get(reverse("cliente-detail", args=[self.cliente.pk]))
+            self.assertEqual(respuesta.status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_RETRIEVE, detalle)
+
+    def test_export(self):
+        def exportar():
+            b"".join(self.client.get(reverse("cliente-export")).streaming_content)
+
+        self.assertConsultasConstantes(CONSULTAS_EXPORT, exportar)
+
+    def test_create(self):
+        def crear():
+            indice = next(self.numero)
+            datos = {
+                "nombre_completo": f"Cliente nuevo {indice}",
+                "empresa_id": self.cliente.empresa_id,
+                "telefono": "+51999999999",
+                "email": f"nuevo{indice}@example.com",
+            }
+            self.assertEqual(self.client.post(reverse("cliente-list"), datos, format="json").status_code, 201)
+
+        self.assertConsultasConstantes(CONSULTAS_CREATE, crear)
+
+    def test_update(self):
+        def actualizar():
+            url = reverse("cliente-detail", args=[self.cliente.pk])
+            self.assertEqual(self.client.patch(url, {"cargo": "Gerente"}, format="json").status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_UPDATE, actualizar)
+
+
+class ContadoresTests(TestCase):
+    def test_guardar_no_pisa_contadores_concurrentes(self):
+        crear_datos(empresas=1, clientes=1, oportunidades=1)
+        cliente = Cliente.objects.get()
+        empresa = Empresa.objects.get()
+
+        # Otra transacción da de alta una oportunidad después de leer las filas.
+        Oportunidad.objects.create(
+            nombre="Concurrente",
+            cliente_id=cliente.pk,
+            empresa_id=empresa.pk,
+            valor=100,
+            probabilidad=50,
+            fecha_cierre_estimada="2099-01-01",
+            etapa="prospeccion",
+        )
+        cliente.cargo = "Gerente"
+        cliente.save()
+        empresa.notas = "Editada"
+        empresa.save()
+
+        cliente.refresh_from_db()
+        empresa.refresh_from_db()
+        self.assertEqual(cliente.cargo, "Gerente")
+        self.assertEqual(cliente.num_oportunidades, 2)
+        self.assertEqual(empresa.notas, "Editada")
+        self.assertEqual(empresa.num_oportunidades, 2)
+        self.assertEqual(empresa.num_clientes, 1)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from django.db.models import Count
 from drf_spectacular.utils import extend_schema
 
 from common.exceptions import ConstraintError
@@ -15,15 +14,16 @@ from .serializers import ClienteSerializer
 
 @extend_schema(tags=["Clientes"])
 class ClienteViewSet(CSVExportMixin, BaseModelViewSet):
-    queryset = (
-        Cliente.objects.select_related("empresa")
-        .annotate(
-            num_oportunidades=Count("oportunidades", distinct=True),
-            num_actividades=Count("actividades", distinct=True),
-        )
-    )
+    queryset = Cliente.objects.all()
+    use_projection = True
     serializer_class = ClienteSerializer
+    field_select_related = {"empresa": ("empresa",)}
+    # La exportación lee la empresa con .values(); las escrituras devuelven
+    # la empresa anidada.
+    query_plans = {"export": (), "write": ("empresa",)}
     filterset_class = ClienteFilter
+    # /empresas/{empresa_pk}/clientes/
+    parent_lookups = {"empresa_pk": "empresa"}
     ordering_fields = ["nombre_completo", "fecha_creacion", "num_oportunidades"]
     list_message = "Clientes obtenidos exitosamente"
     retrieve_message = "Cliente obtenido exitosamente"
@@ -45,6 +45,16 @@ class ClienteViewSet(CSVExportMixin, BaseModelViewSet):
         "num_actividades",
         "fecha_creacion",
     )
+    csv_values = (
+        "id",
+        "nombre_completo",
+        "empresa__nombre",
+        "telefono",
+        "email",
+        "num_oportunidades",
+        "num_actividades",
+        "fecha_creacion",
+    )
 
     def csv_row_builder(self, cliente: Cliente):
         return (
@@ -53,8 +63,8 @@ class ClienteViewSet(CSVExportMixin, BaseModelViewSet):
             cliente.empresa.nombre,
             cliente.telefono,
             cliente.email,
-            getattr(cliente, "num_oportunidades", 0),
-            getattr(cliente, "num_actividades", 0),
+            cliente.num_oportunidades,
+            cliente.num_actividades,
             cliente.fecha_creacion.isoformat(),
         )
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import django_filters
 
+from common.search import BusquedaTexto
+
 from .models import Empresa
 
 
@@ -13,6 +15,6 @@ class EmpresaFilter(django_filters.FilterSet):
         fields = ["industria"]
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(nombre__icontains=value)
+        return BusquedaTexto.filtrar(queryset, value)
 
 
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from django.db import models
 
+from common.contadores import ContadoresPadreMixin
+from common.search import FullTextIndex
 
-class Empresa(models.Model):
+
+class Empresa(ContadoresPadreMixin):
     """Empresa cliente."""
 
     INDUSTRIAS = [
@@ -24,9 +27,14 @@ class Empresa(models.Model):
     direccion = models.CharField(max_length=300, null=True, blank=True)
     notas = models.TextField(null=True, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    # Mantenidos por Cliente y Oportunidad (common.contadores); indexados para ordenar.
+    num_clientes = models.IntegerField(default=0, editable=False, db_index=True)
+    num_oportunidades = models.IntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         ordering = ["nombre"]
+        indexes = [FullTextIndex(fields=["nombre"], name="ft_empresa_busqueda")]
 
     def __str__(self) -> str:
         return self.nombre
@@ -24,10 +24,11 @@ class EmpresaSerializer(serializers.ModelSerializer):
             "direccion",
             "notas",
             "fecha_creacion",
+            "fecha_actualizacion",
             "num_clientes",
             "num_oportunidades",
         ]
-        read_only_fields = ["id", "fecha_creacion", "num_clientes", "num_oportunidades"]
+        read_only_fields = ["id", "fecha_creacion", "fecha_actualizacion", "num_clientes", "num_oportunidades"]
 
 
 class ClienteResumenSerializer(serializers.ModelSerializer):
@@ -43,8 +44,10 @@ class OportunidadResumenSerializer(serializers.ModelSerializer):
 
 
 class EmpresaDetailSerializer(EmpresaSerializer):
-    clientes = ClienteResumenSerializer(many=True, read_only=True)
-    oportunidades = OportunidadResumenSerializer(many=True, read_only=True)
+    # Vistas previas acotadas (las más recientes, ver EmpresaViewSet); los
+    # listados completos son /empresas/{id}/clientes/ y /oportunidades/.
+    clientes = ClienteResumenSerializer(source="clientes_recientes", many=True, read_only=True)
+    oportunidades = OportunidadResumenSerializer(source="oportunidades_recientes", many=True, read_only=True)
 
     class Meta(EmpresaSerializer.Meta):
         fields = EmpresaSerializer.Meta.fields + ["clientes", "oportunidades"]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from itertools import count
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.clientes.models import Cliente
+from apps.reportes.tests import crear_datos
+
+from .models import Empresa
+
+# COUNT de la página y la página.
+CONSULTAS_LIST = 2
+# La empresa y los prefetch recortados de clientes y oportunidades.
+CONSULTAS_RETRIEVE = 3
+# COUNT del límite de filas y el cursor de la exportación.
+CONSULTAS_EXPORT = 2
+# Nombre único e INSERT.
+CONSULTAS_CREATE = 2
+# La empresa y el UPDATE.
+CONSULTAS_UPDATE = 2
+
+
+class EmpresaConsultasTests(TestCase):
+    """Cada acción hace las mismas consultas sin importar cuántas filas haya."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = crear_datos(empresas=2, clientes=2, oportunidades=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.empresa = Empresa.objects.order_by("pk").first()
+        self.numero = count()
+
+    def ampliar(self):
+        for _ in range(5):
+            indice = next(self.numero)
+            empresa = Empresa.objects.create(nombre=f"Extra {indice}")
+            for sufijo in ("a", "b"):
+                Cliente.objects.create(
+                    nombre_completo=f"Cliente extra {indice}{sufijo}",
+                    empresa=empresa if sufijo == "a" else self.empresa,
+                    telefono="+51999999999",
+                    email=f"extra{indice}{sufijo}@example.com",
+                )
+
+    def assertConsultasConstantes(self, consultas, peticion):
+        with self.assertNumQueries(consultas):
+            peticion()
+        self.ampliar()
+        with self.assertNumQueries(consultas):
+            peticion()
+
+    def test_list(self):
+        def listar():
+            self.assertEqual(self.client.get(reverse("empresa-list")).status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_LIST, listar)
+
+    def test_retrieve(self):
+        def detalle():
+            respuesta = self.client.get(reverse("empresa-detail", args=[self.empresa.pk]))
+            self.assertEqual(respuesta.status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_RETRIEVE, detalle)
+
+    def test_export(self):
+        def exportar():
+            b"".join(self.client.get(reverse("empresa-export")).streaming_content)
+
+        self.assertConsultasConstantes(CONSULTAS_EXPORT, exportar)
+
+    def test_create(self):
+        def crear():
+            datos = {"nombre": f"Nueva {next(self.numero)}"}
+            self.assertEqual(self.client.post(reverse("empresa-list"), datos, format="json").status_code, 201)
+
+        self.assertConsultasConstantes(CONSULTAS_CREATE, crear)
+
+    def test_update(self):
+        def actualizar():
+            url = reverse("empresa-detail", args=[self.empresa.pk])
+            self.assertEqual(self.client.patch(url, {"telefono": "+51111111111"}, format="json").status_code, 200)
+
+        self.assertConsultasConstantes(CONSULTAS_UPDATE, actualizar)
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from apps.clientes.views import ClienteViewSet
+from apps.oportunidades.views import OportunidadViewSet
+
 from .views import EmpresaViewSet
 
 router = DefaultRouter()
 router.register("", EmpresaViewSet, basename="empresa")
 
-urlpatterns = router.urls
-
-
+# Subrecursos paginados de una empresa: los listados de clientes y
+# oportunidades filtrados por parent_lookups.
+urlpatterns = [
+    path(
+        "<int:empresa_pk>/clientes/",
+        ClienteViewSet.as_view({"get": "list"}),
+        name="empresa-clientes",
+    ),
+    path(
+        "<int:empresa_pk>/oportunidades/",
+        OportunidadViewSet.as_view({"get": "list"}),
+        name="empresa-oportunidades",
+    ),
+] + router.urls
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from django.db.models import Count
-
+from django.db.models import Prefetch
 from drf_spectacular.utils import extend_schema
 
+from apps.clientes.models import Cliente
+from apps.oportunidades.models import Oportunidad
 from common.exceptions import ConstraintError
 from common.mixins import CSVExportMixin
 from common.viewsets import BaseModelViewSet
@@ -13,18 +14,35 @@ from .models import Empresa
 from .schemas import EmpresaCreateSchema, EmpresaUpdateSchema
 from .serializers import EmpresaDetailSerializer, EmpresaSerializer
 
+# Elementos de cada vista previa en el detalle; num_clientes y
+# num_oportunidades indican cuántos hay en total.
+VISTA_PREVIA = 5
+
 
 @extend_schema(tags=["Empresas"])
 class EmpresaViewSet(CSVExportMixin, BaseModelViewSet):
-    queryset = (
-        Empresa.objects.all()
-        .annotate(
-            num_clientes=Count("clientes", distinct=True),
-            num_oportunidades=Count("oportunidades", distinct=True),
-        )
-        .prefetch_related("clientes", "oportunidades")
-    )
+    queryset = Empresa.objects.all()
+    use_projection = True
     serializer_class = EmpresaSerializer
+    # Prefetch recortado: una consulta por relación con LIMIT por empresa.
+    field_prefetch_related = {
+        "clientes": (
+            Prefetch(
+                "clientes",
+                queryset=Cliente.objects.only("id", "empresa_id", "nombre_completo", "cargo", "email")
+                .order_by("-fecha_creacion", "-id")[:VISTA_PREVIA],
+                to_attr="clientes_recientes",
+            ),
+        ),
+        "oportunidades": (
+            Prefetch(
+                "oportunidades",
+                queryset=Oportunidad.objects.only("id", "empresa_id", "nombre", "valor", "etapa")
+                .order_by("-fecha_creacion", "-id")[:VISTA_PREVIA],
+                to_attr="oportunidades_recientes",
+            ),
+        ),
+    }
     filterset_class = EmpresaFilter
     ordering_fields = ["nombre", "fecha_creacion", "num_clientes", "num_oportunidades"]
     list_message = "Empresas obtenidas exitosamente"
@@ -47,6 +65,16 @@ class EmpresaViewSet(CSVExportMixin, BaseModelViewSet):
         "num_oportunidades",
         "fecha_creacion",
     )
+    csv_values = (
+        "id",
+        "nombre",
+        "industria",
+        "num_empleados",
+        "telefono",
+        "num_clientes",
+        "num_oportunidades",
+        "fecha_creacion",
+    )
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -60,8 +88,8 @@ class EmpresaViewSet(CSVExportMixin, BaseModelViewSet):
             empresa.industria or "",
             empresa.num_empleados or "",
             empresa.telefono or "",
-            getattr(empresa, "num_clientes", 0),
-            getattr(empresa, "num_oportunidades", 0),
+            empresa.num_clientes,
+            empresa.num_oportunidades,
             empresa.fecha_creacion.isoformat(),
         )
 
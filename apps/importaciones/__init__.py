@@ -0,0 +1 @@
+"""App de importaciones masivas."""
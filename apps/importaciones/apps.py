@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ImportacionesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.importaciones"
+    verbose_name = "Importaciones"
@@ -0,0 +1,137 @@
+"""Lectura en streaming de archivos de importación y escritura del archivo de errores.
+
+Los lectores recorren el archivo binario fila a fila y producen
+``(linea, fila, errores)``: ``fila`` es el dict listo para validar y
+``errores`` (``{campo: [mensajes]}``) viene con valor cuando la fila no se
+pudo interpretar. Nunca se carga el archivo completo en memoria.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Fila = Tuple[int, Dict[str, Any], Optional[Dict[str, List[str]]]]
+
+EXTENSIONES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def formato_por_nombre(nombre: str) -> Optional[str]:
+    for extension, formato in EXTENSIONES.items():
+        if nombre.lower().endswith(extension):
+            return formato
+    return None
+
+
+class Lector:
+    formato = ""
+
+    def __init__(self, binario: IO[bytes]):
+        self.binario = binario
+
+    def __iter__(self) -> Iterator[Fila]:
+        raise NotImplementedError
+
+    @property
+    def columnas(self) -> Sequence[str]:
+        return ()
+
+    def posicion(self) -> int:
+        """Bytes consumidos del archivo, para informar el progreso."""
+
+        try:
+            return self.binario.tell()
+        except (OSError, ValueError):
+            return 0
+
+
+class LectorCSV(Lector):
+    """CSV UTF-8 (con o sin BOM) con encabezado en la primera línea.
+
+    Las celdas vacías se omiten: en un alta el campo queda con su valor por
+    defecto y en una actualización conserva el valor guardado.
+    """
+
+    formato = "csv"
+
+    def __init__(self, binario):
+        super().__init__(binario)
+        self.texto = io.TextIOWrapper(binario, encoding="utf-8-sig", newline="")
+        self.lector = csv.DictReader(self.texto)
+
+    @property
+    def columnas(self):
+        return self.lector.fieldnames or ()
+
+    def __iter__(self):
+        for crudo in self.lector:
+            if None in crudo:
+                yield self.lector.line_num, crudo, {"non_field_errors": ["La fila tiene más columnas que el encabezado"]}
+                continue
+            fila = {}
+            for columna, valor in crudo.items():
+                valor = (valor or "").strip()
+                if valor:
+                    fila[columna.strip()] = valor
+            yield self.lector.line_num, fila, None
+        # El lector de texto no debe cerrar el archivo binario al liberarse.
+        self.texto.detach()
+
+
+class LectorNDJSON(Lector):
+    """Un objeto JSON por línea; las líneas en blanco se ignoran."""
+
+    formato = "ndjson"
+
+    def __iter__(self):
+        for linea, contenido in enumerate(self.binario, start=1):
+            if not contenido.strip():
+                continue
+            try:
+                fila = orjson.loads(contenido) if orjson else json.loads(contenido)
+            except ValueError:
+                yield linea, {}, {"non_field_errors": ["La línea no es JSON válido"]}
+                continue
+            if not isinstance(fila, dict):
+                yield linea, {}, {"non_field_errors": ["Cada línea debe ser un objeto JSON"]}
+                continue
+            yield linea, fila, None
+
+
+LECTORES = {lector.formato: lector for lector in (LectorCSV, LectorNDJSON)}
+
+
+class ArchivoErrores:
+    """Filas rechazadas, en el mismo formato que la entrada.
+
+    En CSV se repiten las columnas originales y se agregan ``linea`` y
+    ``errores`` (JSON), de modo que el archivo se puede corregir y volver a
+    importar. En NDJSON cada línea es ``{"linea", "errores", "fila"}``.
+    """
+
+    def __init__(self, destino: IO[str], lector: Lector):
+        self.destino = destino
+        self.lector = lector
+        self.cantidad = 0
+        self.escritor = None
+
+    def escribir(self, linea: int, fila: Dict[str, Any], errores: Dict[str, List[str]]) -> None:
+        self.cantidad += 1
+        errores_json = json.dumps(errores, ensure_ascii=False)
+        if self.lector.formato == "csv":
+            if self.escritor is None:
+                self.escritor = csv.writer(self.destino)
+                self.escritor.writerow([*self.lector.columnas, "linea", "errores"])
+            self.escritor.writerow([*(fila.get(columna, "") for columna in self.lector.columnas), linea, errores_json])
+        else:
+            registro = {"linea": linea, "errores": errores, "fila": fila}
+            self.destino.write(json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n")
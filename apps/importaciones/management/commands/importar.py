@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.importaciones.lectura import formato_por_nombre
+from apps.importaciones.services import IMPORTADORES, ImportacionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un archivo CSV o NDJSON local de empresas o clientes (upsert por nombre de "
+        "empresa y email de cliente), por lotes y sin cargarlo entero en memoria. Las filas "
+        "rechazadas se escriben en un archivo de errores con el mismo formato."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del archivo a importar.")
+        parser.add_argument("--recurso", required=True, choices=sorted(IMPORTADORES))
+        parser.add_argument("--formato", choices=["csv", "ndjson"], help="Por defecto se deduce de la extensión.")
+        parser.add_argument("--errores", help="Archivo de filas rechazadas (por defecto <archivo>.errores.<formato>).")
+        parser.add_argument("--lote", type=int, help="Filas por lote (por defecto IMPORTACIONES_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        ruta = options["archivo"]
+        formato = options["formato"] or formato_por_nombre(ruta)
+        if formato is None:
+            raise CommandError("No se pudo deducir el formato; use --formato csv|ndjson")
+        try:
+            tamano = os.path.getsize(ruta)
+        except OSError as exc:
+            raise CommandError(f"No se puede leer {ruta}: {exc}") from exc
+        ruta_errores = options["errores"] or f"{os.path.splitext(ruta)[0]}.errores.{formato}"
+
+        def progreso(importador):
+            porcentaje = importador.lector.posicion() / tamano * 100 if tamano else 100
+            self.stdout.write(
+                f"{importador.filas_procesadas} filas ({porcentaje:.0f}%): {importador.creados} creados, "
+                f"{importador.actualizados} actualizados, {importador.con_error} con error"
+            )
+
+        with open(ruta, "rb") as binario, open(ruta_errores, "w", encoding="utf-8", newline="") as errores:
+            try:
+                resumen = ImportacionService.importar(
+                    options["recurso"], formato, binario, errores, progreso, tamano_lote=options["lote"]
+                )
+            except UnicodeDecodeError as exc:
+                raise CommandError(f"El archivo no está codificado en UTF-8: {exc}") from exc
+
+        if resumen["con_error"]:
+            self.stdout.write(self.style.WARNING(f"{resumen['con_error']} filas rechazadas en {ruta_errores}"))
+        else:
+            os.remove(ruta_errores)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Importación terminada: {resumen['filas_procesadas']} filas, {resumen['creados']} creados, "
+                f"{resumen['actualizados']} actualizados"
+            )
+        )
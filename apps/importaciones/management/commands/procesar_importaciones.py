@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.importaciones.services import ImportacionService
+
+
+class Command(BaseCommand):
+    help = "Worker local que procesa la cola de importaciones subidas por la API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--una-vez", action="store_true", help="Procesa lo pendiente y termina.")
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre sondeos.")
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=3600,
+            help="Segundos sin completar un lote tras los cuales una importación en proceso se considera abandonada.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Worker de importaciones iniciado")
+        while True:
+            liberadas = ImportacionService.liberar_vencidas(options["timeout"])
+            if liberadas:
+                self.stdout.write(f"Importaciones abandonadas reencoladas: {liberadas}")
+
+            importacion = ImportacionService.reclamar()
+            if importacion is None:
+                if options["una_vez"]:
+                    return
+                time.sleep(options["intervalo"])
+                continue
+
+            importacion = ImportacionService.ejecutar(importacion)
+            self.stdout.write(
+                f"Importación {importacion.pk} ({importacion.recurso}): {importacion.estado}, "
+                f"{importacion.creados} creados, {importacion.actualizados} actualizados, "
+                f"{importacion.con_error} con error"
+            )
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class Importacion(models.Model):
+    """Carga de un archivo de empresas o clientes, procesada por ``procesar_importaciones``."""
+
+    PENDIENTE = "pendiente"
+    PROCESANDO = "procesando"
+    COMPLETADO = "completado"
+    ERROR = "error"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (PROCESANDO, "Procesando"),
+        (COMPLETADO, "Completado"),
+        (ERROR, "Error"),
+    ]
+    RECURSOS = [("empresas", "Empresas"), ("clientes", "Clientes")]
+    FORMATOS = [("csv", "CSV"), ("ndjson", "NDJSON")]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    recurso = models.CharField(max_length=15, choices=RECURSOS)
+    formato = models.CharField(max_length=10, choices=FORMATOS)
+    archivo = models.FileField(upload_to="importaciones/")
+    nombre_archivo = models.CharField(max_length=255)
+    tamano_bytes = models.BigIntegerField(default=0)
+    bytes_leidos = models.BigIntegerField(default=0)
+    filas_procesadas = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    con_error = models.PositiveIntegerField(default=0)
+    archivo_errores = models.FileField(upload_to="importaciones/errores/", null=True, blank=True)
+    estado = models.CharField(max_length=15, choices=ESTADOS, default=PENDIENTE)
+    error = models.TextField(null=True, blank=True)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="importaciones",
+        null=True,
+        blank=True,
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    # Latido del worker: se renueva tras cada lote (ver liberar_vencidas).
+    fecha_progreso = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["fecha_creacion"]
+        indexes = [
+            models.Index(fields=["estado", "fecha_creacion"], name="idx_importacion_estado"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.recurso} {self.nombre_archivo} ({self.estado})"
+
+    @property
+    def progreso(self) -> float:
+        """Porcentaje del archivo leído (aproximado: el lector avanza por bloques)."""
+
+        if self.estado == self.COMPLETADO:
+            return 100.0
+        if not self.tamano_bytes:
+            return 0.0
+        return round(min(self.bytes_leidos / self.tamano_bytes, 1) * 100, 1)
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ImportacionCreateSchema(BaseModel):
+    recurso: str = Field(pattern="^(empresas|clientes)$")
+    # Sin formato se deduce de la extensión del archivo (.csv, .ndjson, .jsonl).
+    formato: Optional[str] = Field(default=None, pattern="^(csv|ndjson)$")
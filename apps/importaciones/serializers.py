@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Importacion
+
+
+class ImportacionSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    url_errores = serializers.SerializerMethodField()
+    progreso = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Importacion
+        fields = [
+            "id",
+            "recurso",
+            "formato",
+            "nombre_archivo",
+            "estado",
+            "progreso",
+            "filas_procesadas",
+            "creados",
+            "actualizados",
+            "con_error",
+            "url",
+            "url_errores",
+            "error",
+            "fecha_creacion",
+            "fecha_inicio",
+            "fecha_fin",
+        ]
+        read_only_fields = fields
+
+    def _absoluta(self, url: str) -> str:
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_url(self, obj: Importacion) -> str:
+        return self._absoluta(reverse("importacion", args=[obj.pk]))
+
+    def get_url_errores(self, obj: Importacion):
+        if not obj.archivo_errores:
+            return None
+        return self._absoluta(reverse("importacion-errores", args=[obj.pk]))
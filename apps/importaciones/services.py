@@ -0,0 +1,350 @@
+"""Importación por lotes de empresas y clientes desde CSV/NDJSON."""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+from datetime import timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.clientes.models import Cliente
+from apps.clientes.schemas import ClienteCreateSchema
+from apps.empresas.models import Empresa
+from apps.empresas.schemas import EmpresaCreateSchema
+from common.bulk import BulkMixin, marcar_auto_now, validar_lote
+from common.contadores import Contadores
+from common.search import normalizar
+from common.signals import escritura_masiva
+
+from .lectura import LECTORES, ArchivoErrores, Fila, Lector
+from .models import Importacion
+
+logger = logging.getLogger("crm.importaciones")
+
+
+def clave_empresa(nombre: str) -> str:
+    # Misma igualdad que la collation de MySQL: sin mayúsculas, tildes ni espacios extremos.
+    return normalizar(nombre).strip()
+
+
+def en_lotes(filas: Iterable[Fila], tamano: int) -> Iterable[List[Fila]]:
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def mapa_empresas() -> Dict[str, int]:
+    """Nombre normalizado -> id de todas las empresas, en una sola consulta."""
+
+    return {clave_empresa(nombre): pk for pk, nombre in Empresa.objects.values_list("pk", "nombre").iterator()}
+
+
+class Importador:
+    """Valida y guarda un archivo por lotes de ``BATCH_SIZE`` filas.
+
+    Cada lote se valida con el esquema de alta en una pasada, se resuelve
+    contra lo existente por la clave del recurso (upsert) y se escribe con
+    ``bulk_create``/``bulk_update`` en su propia transacción: un lote que
+    falla en la base no deshace los anteriores. Las filas rechazadas van al
+    ``ArchivoErrores`` y el resto del archivo sigue procesándose. Como la
+    clave hace idempotente la carga, reprocesar un archivo no duplica datos.
+    """
+
+    modelo = None
+    schema = None
+
+    def __init__(self, tamano_lote: Optional[int] = None, progreso: Optional[Callable[["Importador"], None]] = None):
+        self.tamano_lote = tamano_lote or self.config().get("BATCH_SIZE") or 1000
+        self.progreso = progreso
+        self.lector: Optional[Lector] = None
+        self.filas_procesadas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.con_error = 0
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        return getattr(settings, "IMPORTACIONES", {})
+
+    def resumen(self) -> Dict[str, int]:
+        return {
+            "filas_procesadas": self.filas_procesadas,
+            "creados": self.creados,
+            "actualizados": self.actualizados,
+            "con_error": self.con_error,
+        }
+
+    def ejecutar(self, lector: Lector, errores: ArchivoErrores) -> Dict[str, int]:
+        self.lector = lector
+        self.preparar()
+        for lote in en_lotes(lector, self.tamano_lote):
+            self.procesar_lote(lote, errores)
+            self.filas_procesadas += len(lote)
+            if self.progreso is not None:
+                self.progreso(self)
+        return self.resumen()
+
+    def procesar_lote(self, lote: List[Fila], errores: ArchivoErrores) -> None:
+        candidatas: List[Tuple[int, Dict[str, Any]]] = []
+        cuerpos = []
+        for linea, fila, error in lote:
+            if error is None:
+                cuerpo, error = self.preparar_fila(dict(fila))
+            if error is not None:
+                self.rechazar(errores, linea, fila, error)
+                continue
+            candidatas.append((linea, fila))
+            cuerpos.append(cuerpo)
+
+        datos, encontrados = validar_lote(self.schema, cuerpos, exclude_unset=True)
+        validas = []
+        for indice, (linea, fila) in enumerate(candidatas):
+            error = encontrados.get(indice) or self.verificar(datos[indice])
+            if error:
+                self.rechazar(errores, linea, fila, error)
+            else:
+                validas.append((linea, fila, BulkMixin.bulk_values(self.modelo, datos[indice])))
+        if not validas:
+            return
+
+        try:
+            with transaction.atomic(using=self.modelo.objects.db):
+                creados, actualizados = self.guardar([valores for _, _, valores in validas])
+        except DatabaseError as exc:
+            # Restricción violada por una carrera con otra escritura: se
+            # rechaza el lote entero y se continúa con el siguiente.
+            logger.warning("Lote de importación rechazado por la base: %s", exc)
+            for linea, fila, _ in validas:
+                self.rechazar(errores, linea, fila, {"non_field_errors": [f"Error al guardar el lote: {exc}"]})
+            return
+        self.creados += creados
+        self.actualizados += actualizados
+        escritura_masiva.send(sender=self.modelo)
+
+    def rechazar(self, errores: ArchivoErrores, linea: int, fila: Dict[str, Any], error: Dict[str, List[str]]) -> None:
+        self.con_error += 1
+        errores.escribir(linea, fila, error)
+
+    def guardar(self, lote: List[Dict[str, Any]]) -> Tuple[int, int]:
+        existentes = self.buscar(lote)
+        nuevos: Dict[Any, Any] = {}
+        campos = set()
+        creados = actualizados = 0
+        for valores in lote:
+            clave = self.clave(valores)
+            instancia = existentes.get(clave) or nuevos.get(clave)
+            if instancia is None:
+                nuevos[clave] = self.modelo(**valores)
+                creados += 1
+                continue
+            # Una clave repetida en el archivo actualiza lo que dejó la fila anterior.
+            for nombre, valor in valores.items():
+                setattr(instancia, nombre, valor)
+            if instancia.pk is not None:
+                campos.update(valores)
+            actualizados += 1
+
+        por_actualizar = [instancia for instancia in existentes.values() if instancia.pk is not None]
+        if campos and por_actualizar:
+            campos.update(marcar_auto_now(self.modelo, por_actualizar))
+            self.modelo.objects.bulk_update(por_actualizar, sorted(campos))
+            Contadores.cambios(self.modelo, por_actualizar)
+        if nuevos:
+            instancias = list(nuevos.values())
+            BulkMixin.bulk_insert(self.modelo, instancias)
+            Contadores.altas(self.modelo, instancias)
+            self.despues_de_crear(instancias)
+        return creados, actualizados
+
+    def preparar(self) -> None:
+        """Carga lo que se reutiliza entre lotes (mapas de claves)."""
+
+    def preparar_fila(self, fila: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, List[str]]]]:
+        """Ajusta una fila antes de validarla; devuelve ``(fila, errores)``."""
+
+        return fila, None
+
+    def verificar(self, valores: Dict[str, Any]) -> Optional[Dict[str, List[str]]]:
+        """Comprobaciones de la fila ya validada que el esquema no cubre."""
+
+        return None
+
+    def clave(self, valores: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def buscar(self, lote: List[Dict[str, Any]]) -> Dict[Any, Any]:
+        """Instancias existentes del lote, indexadas por ``clave``."""
+
+        raise NotImplementedError
+
+    def despues_de_crear(self, instancias: List[Any]) -> None:
+        """Se llama con las instancias nuevas del lote, ya con pk."""
+
+
+class ImportadorEmpresas(Importador):
+    """Upsert por nombre (sin distinguir mayúsculas ni tildes)."""
+
+    modelo = Empresa
+    schema = EmpresaCreateSchema
+
+    def preparar(self):
+        self.ids = mapa_empresas()
+
+    def clave(self, valores):
+        return clave_empresa(valores["nombre"])
+
+    def buscar(self, lote):
+        ids = {self.ids[clave] for clave in map(self.clave, lote) if clave in self.ids}
+        return {self.clave({"nombre": empresa.nombre}): empresa for empresa in Empresa.objects.in_bulk(ids).values()}
+
+    def despues_de_crear(self, instancias):
+        for empresa in instancias:
+            self.ids[self.clave({"nombre": empresa.nombre})] = empresa.pk
+
+
+class ImportadorClientes(Importador):
+    """Upsert por email. La empresa se indica con ``empresa_id`` o por nombre en ``empresa``."""
+
+    modelo = Cliente
+    schema = ClienteCreateSchema
+
+    def preparar(self):
+        self.empresas = mapa_empresas()
+        self.ids_empresa = set(self.empresas.values())
+
+    def preparar_fila(self, fila):
+        nombre = fila.pop("empresa", None)
+        if "empresa_id" not in fila and nombre is not None:
+            pk = self.empresas.get(clave_empresa(str(nombre)))
+            if pk is None:
+                return fila, {"empresa": [f"No existe la empresa '{nombre}'"]}
+            fila["empresa_id"] = pk
+        return fila, None
+
+    def verificar(self, valores):
+        if "empresa_id" in valores and valores["empresa_id"] not in self.ids_empresa:
+            return {"empresa_id": [f"No existe el registro {valores['empresa_id']}"]}
+        return None
+
+    def clave(self, valores):
+        return valores["email"].casefold()
+
+    def buscar(self, lote):
+        emails = {valores["email"] for valores in lote}
+        existentes = {}
+        # Si el email ya está repetido en la base se actualiza el cliente más antiguo.
+        for cliente in Cliente.objects.filter(email__in=emails).order_by("-pk"):
+            existentes[self.clave({"email": cliente.email})] = cliente
+        return existentes
+
+
+IMPORTADORES = {"empresas": ImportadorEmpresas, "clientes": ImportadorClientes}
+
+
+class ImportacionService:
+    """Encola, reclama y ejecuta importaciones fuera del ciclo de la petición."""
+
+    @staticmethod
+    def encolar(archivo, recurso: str, formato: str, usuario=None) -> Importacion:
+        # FileField copia el archivo subido por bloques; no se lee entero.
+        return Importacion.objects.create(
+            recurso=recurso,
+            formato=formato,
+            archivo=archivo,
+            nombre_archivo=archivo.name,
+            tamano_bytes=archivo.size or 0,
+            usuario=usuario,
+        )
+
+    @staticmethod
+    def reclamar() -> Optional[Importacion]:
+        with transaction.atomic():
+            importacion = (
+                Importacion.objects.select_for_update(skip_locked=True)
+                .filter(estado=Importacion.PENDIENTE)
+                .order_by("fecha_creacion")
+                .first()
+            )
+            if importacion is None:
+                return None
+            importacion.estado = Importacion.PROCESANDO
+            importacion.fecha_inicio = importacion.fecha_progreso = timezone.now()
+            importacion.save(update_fields=["estado", "fecha_inicio", "fecha_progreso"])
+        return importacion
+
+    @staticmethod
+    def importar(
+        recurso: str,
+        formato: str,
+        binario,
+        destino_errores,
+        progreso: Optional[Callable[[Importador], None]] = None,
+        tamano_lote: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Importa ``binario`` y escribe las filas rechazadas en ``destino_errores`` (texto)."""
+
+        lector = LECTORES[formato](binario)
+        importador = IMPORTADORES[recurso](tamano_lote=tamano_lote, progreso=progreso)
+        return importador.ejecutar(lector, ArchivoErrores(destino_errores, lector))
+
+    @staticmethod
+    def ejecutar(importacion: Importacion) -> Importacion:
+        def progreso(importador: Importador) -> None:
+            Importacion.objects.filter(pk=importacion.pk).update(
+                bytes_leidos=importador.lector.posicion(), fecha_progreso=timezone.now(), **importador.resumen()
+            )
+
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="") as errores:
+            try:
+                with importacion.archivo.open("rb") as binario:
+                    resumen = ImportacionService.importar(
+                        importacion.recurso, importacion.formato, binario, errores, progreso
+                    )
+                for campo, valor in resumen.items():
+                    setattr(importacion, campo, valor)
+                importacion.bytes_leidos = importacion.tamano_bytes
+                importacion.estado = Importacion.COMPLETADO
+                if importacion.con_error:
+                    errores.seek(0)
+                    importacion.archivo_errores.save(
+                        f"{importacion.pk}.{importacion.formato}", File(errores), save=False
+                    )
+            except Exception as exc:  # noqa: BLE001 - el error se guarda en la importación
+                logger.exception("Error procesando importación %s", importacion.pk)
+                importacion.refresh_from_db(fields=["filas_procesadas", "creados", "actualizados", "con_error"])
+                importacion.estado = Importacion.ERROR
+                importacion.error = str(exc)
+        importacion.fecha_fin = timezone.now()
+        importacion.save()
+        return importacion
+
+    @staticmethod
+    def liberar_vencidas(segundos: int) -> int:
+        """Devuelve a la cola las importaciones de un worker que murió a mitad de proceso.
+
+        Se mide desde el último lote (``fecha_progreso``), no desde el inicio:
+        una importación larga que sigue avanzando no se reencola.
+        """
+
+        limite = timezone.now() - timedelta(seconds=segundos)
+        return Importacion.objects.filter(
+            estado=Importacion.PROCESANDO, fecha_progreso__lt=limite
+        ).update(estado=Importacion.PENDIENTE, fecha_inicio=None, fecha_progreso=None)
+
+    @staticmethod
+    def para_usuario(usuario):
+        """Importaciones visibles para ``usuario``: las propias, o todas si es staff."""
+
+        if usuario.is_staff:
+            return Importacion.objects.all()
+        return Importacion.objects.filter(usuario=usuario)
+
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+
+from .models import Importacion
+from .services import ImportacionService
+
+# Los archivos subidos y los de errores no deben quedar en el MEDIA_ROOT del proyecto.
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def crear_usuario(nombre: str) -> User:
+    return User.objects.create_user(
+        username=nombre, email=f"{nombre}@example.com", password="x", nombre_completo=nombre.title()
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImportacionAccesoTests(TestCase):
+    def setUp(self):
+        self.duenio = crear_usuario("duenio")
+        self.otro = crear_usuario("otro")
+        self.importacion = Importacion.objects.create(
+            recurso="empresas",
+            formato="csv",
+            archivo="importaciones/empresas.csv",
+            nombre_archivo="empresas.csv",
+            usuario=self.duenio,
+        )
+        self.client = APIClient()
+
+    def test_solo_el_duenio_o_staff_consultan_la_importacion(self):
+        urls = [
+            reverse("importacion", args=[self.importacion.pk]),
+            reverse("importacion-errores", args=[self.importacion.pk]),
+        ]
+        self.client.force_authenticate(self.otro)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_authenticate(self.duenio)
+        self.assertEqual(self.client.get(urls[0]).status_code, 200)
+
+        self.otro.is_staff = True
+        self.otro.save()
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.get(urls[0]).status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class LiberarVencidasTests(TestCase):
+    def setUp(self):
+        self.importacion = Importacion.objects.create(
+            recurso="empresas", formato="csv", archivo="importaciones/empresas.csv", nombre_archivo="empresas.csv"
+        )
+        ImportacionService.reclamar()
+        hace_dos_horas = timezone.now() - timedelta(hours=2)
+        Importacion.objects.filter(pk=self.importacion.pk).update(fecha_inicio=hace_dos_horas)
+
+    def test_no_reencola_si_el_ultimo_lote_es_reciente(self):
+        Importacion.objects.filter(pk=self.importacion.pk).update(fecha_progreso=timezone.now())
+        self.assertEqual(ImportacionService.liberar_vencidas(3600), 0)
+
+    def test_reencola_sin_progreso(self):
+        Importacion.objects.filter(pk=self.importacion.pk).update(
+            fecha_progreso=timezone.now() - timedelta(hours=2)
+        )
+        self.assertEqual(ImportacionService.liberar_vencidas(3600), 1)
+        self.importacion.refresh_from_db()
+        self.assertEqual(self.importacion.estado, Importacion.PENDIENTE)
+        self.assertIsNone(self.importacion.fecha_progreso)
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from django.urls import path
+
+from .views import ImportacionErroresView, ImportacionView, ImportacionesView
+
+urlpatterns = [
+    path("", ImportacionesView.as_view(), name="importaciones"),
+    path("<uuid:importacion_id>/", ImportacionView.as_view(), name="importacion"),
+    path("<uuid:importacion_id>/errores/", ImportacionErroresView.as_view(), name="importacion-errores"),
+]
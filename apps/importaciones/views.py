@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from common.responses import success_response
+from common.schemas import parse_schema
+from common.streaming import CONTENT_TYPES
+
+from .lectura import formato_por_nombre
+from .schemas import ImportacionCreateSchema
+from .serializers import ImportacionSerializer
+from .services import Importador, ImportacionService
+
+
+@extend_schema(tags=["Importaciones"])
+class ImportacionesView(APIView):
+    """Recibe el archivo y lo encola; lo procesa ``procesar_importaciones``."""
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            raise ValidationError({"archivo": ["Adjunte el archivo a importar"]})
+        parametros = parse_schema(ImportacionCreateSchema, request.data.dict())
+        formato = parametros["formato"] or formato_por_nombre(archivo.name)
+        if formato is None:
+            raise ValidationError({"formato": ["Indique csv o ndjson, o use la extensión .csv, .ndjson o .jsonl"]})
+        maximo = Importador.config().get("MAX_MB")
+        if maximo and archivo.size > maximo * 1024 * 1024:
+            raise ValidationError({"archivo": [f"El archivo supera el máximo de {maximo} MB"]})
+
+        importacion = ImportacionService.encolar(archivo, parametros["recurso"], formato, usuario=request.user)
+        return success_response(
+            ImportacionSerializer(importacion, context={"request": request}).data,
+            message="Importación encolada exitosamente",
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+
+
+@extend_schema(tags=["Importaciones"])
+class ImportacionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, importacion_id, *args, **kwargs):
+        importacion = get_object_or_404(ImportacionService.para_usuario(request.user), pk=importacion_id)
+        data = ImportacionSerializer(importacion, context={"request": request}).data
+        return success_response(data, message="Estado de la importación obtenido exitosamente")
+
+
+@extend_schema(tags=["Importaciones"])
+class ImportacionErroresView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, importacion_id, *args, **kwargs):
+        importacion = get_object_or_404(ImportacionService.para_usuario(request.user), pk=importacion_id)
+        if not importacion.archivo_errores:
+            raise Http404
+        return FileResponse(
+            importacion.archivo_errores.open("rb"),
+            as_attachment=True,
+            filename=f"errores-{importacion.pk}.{importacion.formato}",
+            content_type=CONTENT_TYPES[importacion.formato],
+        )
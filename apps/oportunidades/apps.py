@@ -6,5 +6,5 @@ class OportunidadesConfig(AppConfig):
     name = "apps.oportunidades"
     verbose_name = "Oportunidades"
 
-
-
+    def ready(self):
+        from . import signals  # noqa: F401
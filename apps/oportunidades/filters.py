@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import django_filters
 
-from .models import Oportunidad
+from common.dates import FechaLocalFilter
+from common.search import BusquedaTexto
+
+from .models import Oportunidad, TipoCambio
 
 
 class OportunidadFilter(django_filters.FilterSet):
@@ -10,6 +13,8 @@ class OportunidadFilter(django_filters.FilterSet):
     valor_max = django_filters.NumberFilter(field_name="valor", lookup_expr="lte")
     fecha_desde = django_filters.DateFilter(field_name="fecha_cierre_estimada", lookup_expr="gte")
     fecha_hasta = django_filters.DateFilter(field_name="fecha_cierre_estimada", lookup_expr="lte")
+    cierre_desde = FechaLocalFilter(field_name="fecha_cierre_real", lookup_expr="gte")
+    cierre_hasta = FechaLocalFilter(field_name="fecha_cierre_real", lookup_expr="lte")
     search = django_filters.CharFilter(method="filter_search")
     cliente_id = django_filters.NumberFilter(field_name="cliente_id")
     empresa_id = django_filters.NumberFilter(field_name="empresa_id")
@@ -19,8 +24,13 @@ class OportunidadFilter(django_filters.FilterSet):
         fields = ["estado", "etapa", "moneda"]
 
     def filter_search(self, queryset, name, value):
-        if not value:
-            return queryset
-        return queryset.filter(nombre__icontains=value)
+        return BusquedaTexto.filtrar(queryset, value)
+
 
+class TipoCambioFilter(django_filters.FilterSet):
+    fecha_desde = django_filters.DateFilter(field_name="fecha", lookup_expr="gte")
+    fecha_hasta = django_filters.DateFilter(field_name="fecha", lookup_expr="lte")
 
+    class Meta:
+        model = TipoCambio
+        fields = ["moneda_origen", "moneda_destino"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import statistics
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.clientes.models import Cliente
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad
+from apps.oportunidades.serializers import OportunidadSerializer
+from common import renderers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de renderizar una página de oportunidades (sobre de la API "
+        "incluido) con el JSONRenderer de DRF y con FastJSONRenderer. No usa la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=100, help="Oportunidades en la página.")
+        parser.add_argument("--repeticiones", type=int, default=500, help="Renders por medición.")
+        parser.add_argument("--mediciones", type=int, default=5, help="Mediciones por renderer (se toma la mediana).")
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stderr.write("orjson no está instalado: FastJSONRenderer usará la implementación de DRF")
+
+        pagina = self._pagina(options["filas"])
+        resultados = {}
+        salidas = {}
+        for nombre, renderer in (("drf", JSONRenderer()), ("rapido", renderers.FastJSONRenderer())):
+            salidas[nombre] = renderer.render(pagina)
+            tiempos = timeit.repeat(
+                lambda renderer=renderer: renderer.render(pagina),
+                number=options["repeticiones"],
+                repeat=options["mediciones"],
+            )
+            resultados[nombre] = statistics.median(tiempos) / options["repeticiones"] * 1_000_000
+            self.stdout.write(f"{nombre}: {resultados[nombre]:.1f} µs por página ({len(salidas[nombre])} bytes)")
+
+        if salidas["drf"] != salidas["rapido"]:
+            if json.loads(salidas["drf"]) != json.loads(salidas["rapido"]):
+                raise CommandError("Las salidas de ambos renderers no son equivalentes")
+            self.stdout.write("Aviso: salidas equivalentes pero con bytes distintos")
+        self.stdout.write(self.style.SUCCESS(f"Aceleración: x{resultados['drf'] / resultados['rapido']:.2f}"))
+
+    def _pagina(self, filas):
+        # Instancias en memoria: se mide solo la serialización a JSON, no la base.
+        ahora = timezone.now()
+        empresa = Empresa(id=1, nombre="Compañía Andina S.A.C.")
+        cliente = Cliente(id=1, nombre_completo="María Pérez", email="maria@example.com", empresa=empresa)
+        oportunidades = [
+            Oportunidad(
+                id=indice,
+                nombre=f"Renovación de licencias {indice}",
+                cliente=cliente,
+                empresa=empresa,
+                valor=Decimal(1000 + indice * 37) + Decimal("0.50"),
+                moneda="PEN",
+                probabilidad=indice % 101,
+                fecha_cierre_estimada=(ahora + timedelta(days=indice)).date(),
+                etapa="propuesta",
+                estado="abierta",
+                notas="Seguimiento trimestral; contacto vía correo",
+                fecha_creacion=ahora - timedelta(days=indice, microseconds=indice),
+            )
+            for indice in range(1, filas + 1)
+        ]
+        return {
+            "success": True,
+            "data": OportunidadSerializer(oportunidades, many=True).data,
+            "count": filas,
+            "count_exacto": True,
+            "next": "https://api.example.com/api/v1/oportunidades/?page=2",
+            "previous": None,
+            "message": "Oportunidades obtenidas exitosamente",
+            "total_valor": 123456.5,
+            "total_valor_ponderado": 61728.25,
+        }
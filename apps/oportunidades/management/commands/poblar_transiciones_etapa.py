@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.oportunidades.models import Oportunidad, TransicionEtapa
+from apps.reportes.cache import ReporteCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Registra la transición inicial de las oportunidades que no tienen historial. "
+        "Solo se conoce la etapa actual: se fecha en el cierre real si existe o en la creación."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        pendientes = (
+            Oportunidad.objects.filter(transiciones__isnull=True)
+            .order_by("id")
+            .values_list("id", "etapa", "fecha_creacion", "fecha_cierre_real")
+        )
+        lote = []
+        total = 0
+        for oportunidad_id, etapa, fecha_creacion, fecha_cierre_real in pendientes.iterator(chunk_size=batch_size):
+            lote.append(
+                TransicionEtapa(
+                    oportunidad_id=oportunidad_id,
+                    etapa_origen=None,
+                    etapa_destino=etapa,
+                    fecha=fecha_cierre_real or fecha_creacion,
+                )
+            )
+            if len(lote) >= batch_size:
+                total += self._guardar(lote)
+                lote = []
+        if lote:
+            total += self._guardar(lote)
+
+        ReporteCache.invalidar(TransicionEtapa)
+        self.stdout.write(self.style.SUCCESS(f"Transiciones registradas: {total}"))
+
+    @staticmethod
+    def _guardar(lote):
+        with transaction.atomic():
+            TransicionEtapa.objects.bulk_create(lote)
+        return len(lote)
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from apps.clientes.models import Cliente
 from apps.empresas.models import Empresa
+from common.contadores import ContadoresMixin
+from common.search import FullTextIndex
 
 
-class Oportunidad(models.Model):
+class Oportunidad(ContadoresMixin):
     """Oportunidades comerciales."""
 
+    contadores = {"empresa": "num_oportunidades", "cliente": "num_oportunidades"}
+
     ETAPAS = [
         ("prospeccion", "Prospección"),
         ("calificacion", "Calificación"),
@@ -34,10 +39,17 @@ class Oportunidad(models.Model):
     resultado = models.CharField(max_length=10, choices=RESULTADOS, null=True, blank=True)
     notas = models.TextField(null=True, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
     fecha_cierre_real = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-fecha_creacion"]
+        indexes = [
+            models.Index(fields=["estado", "resultado", "fecha_cierre_real"], name="idx_oport_estado_cierre"),
+            # Columnas del pipeline: GROUP BY etapa y cada página por etapa en el orden por defecto.
+            models.Index(fields=["etapa", "fecha_creacion"], name="idx_oport_etapa_creacion"),
+            FullTextIndex(fields=["nombre"], name="ft_oportunidad_busqueda"),
+        ]
 
     @property
     def valor_ponderado(self):
@@ -47,4 +59,46 @@ class Oportunidad(models.Model):
         return f"{self.nombre} ({self.etapa})"
 
 
+class TipoCambio(models.Model):
+    """Tasa de conversión fechada: 1 ``moneda_origen`` = ``tasa`` ``moneda_destino``."""
+
+    MONEDAS = [("PEN", "Sol"), ("USD", "Dólar"), ("EUR", "Euro")]
+
+    moneda_origen = models.CharField(max_length=3, choices=MONEDAS)
+    moneda_destino = models.CharField(max_length=3, choices=MONEDAS)
+    fecha = models.DateField()
+    tasa = models.DecimalField(max_digits=18, decimal_places=6)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-fecha", "moneda_origen", "moneda_destino"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["moneda_origen", "moneda_destino", "fecha"],
+                name="uniq_tipo_cambio_par_fecha",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.moneda_origen}/{self.moneda_destino} {self.fecha}: {self.tasa}"
 
+
+class TransicionEtapa(models.Model):
+    """Historial de cambios de etapa; alimenta el reporte de conversión."""
+
+    oportunidad = models.ForeignKey(Oportunidad, on_delete=models.CASCADE, related_name="transiciones")
+    etapa_origen = models.CharField(max_length=20, choices=Oportunidad.ETAPAS, null=True, blank=True)
+    etapa_destino = models.CharField(max_length=20, choices=Oportunidad.ETAPAS)
+    fecha = models.DateTimeField(default=timezone.now)
+    segundos_en_origen = models.PositiveBigIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["fecha"]
+        indexes = [
+            models.Index(fields=["oportunidad", "fecha"], name="idx_transicion_oport_fecha"),
+            models.Index(fields=["etapa_origen", "etapa_destino"], name="idx_transicion_origen_dest"),
+            models.Index(fields=["etapa_destino", "oportunidad"], name="idx_transicion_destino"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.oportunidad_id}: {self.etapa_origen} -> {self.etapa_destino}"
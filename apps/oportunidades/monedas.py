@@ -0,0 +1,129 @@
+"""Conversión de montos entre monedas dentro de las agregaciones SQL."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import Case, Count, DecimalField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import TipoCambio
+
+Par = Tuple[str, str]
+
+MONEDAS = [codigo for codigo, _ in TipoCambio.MONEDAS]
+
+# Tasas vigentes por proceso; se recargan cuando cambia la versión de la
+# tabla (leída de la base, común a todos los workers) o el día local.
+_VIGENTES: Dict[str, Any] = {"clave": None, "tasas": {}}
+
+
+class ConversionMoneda:
+    """Expresiones que llevan ``valor`` a una moneda base sin salir de la consulta."""
+
+    decimal = DecimalField(max_digits=20, decimal_places=6)
+
+    @staticmethod
+    def version() -> Tuple[Any, int]:
+        # La última modificación detecta altas y cambios; el conteo, las bajas.
+        version = TipoCambio.objects.aggregate(ultima=Max("fecha_actualizacion"), filas=Count("pk"))
+        return version["ultima"], version["filas"]
+
+    @staticmethod
+    def tasas_vigentes() -> Dict[Par, Decimal]:
+        hoy = timezone.localdate()
+        clave = (hoy, ConversionMoneda.version())
+        if _VIGENTES["clave"] != clave:
+            tasas: Dict[Par, Decimal] = {}
+            # La tabla es pequeña: la primera fila de cada par es la más reciente.
+            for origen, destino, tasa in TipoCambio.objects.filter(fecha__lte=hoy).values_list(
+                "moneda_origen", "moneda_destino", "tasa"
+            ):
+                tasas.setdefault((origen, destino), tasa)
+            _VIGENTES.update(clave=clave, tasas=tasas)
+        return _VIGENTES["tasas"]
+
+    @staticmethod
+    def invalidar() -> None:
+        _VIGENTES["clave"] = None
+
+    @staticmethod
+    def factor(origen: str, destino: str, tasas: Dict[Par, Decimal]) -> Optional[Decimal]:
+        if origen == destino:
+            return Decimal("1")
+        if (origen, destino) in tasas:
+            return tasas[(origen, destino)]
+        inversa = tasas.get((destino, origen))
+        return Decimal("1") / inversa if inversa else None
+
+    @staticmethod
+    def convertir_vigente(valor, moneda_base: str, campo_moneda: str = "moneda") -> Case:
+        """``valor`` convertido con las tasas vigentes, resuelto como ``CASE`` en SQL."""
+
+        tasas = ConversionMoneda.tasas_vigentes()
+        casos = []
+        for moneda in MONEDAS:
+            factor = ConversionMoneda.factor(moneda, moneda_base, tasas)
+            if factor is None:
+                raise ValidationError(
+                    {"moneda_base": [f"No hay tipo de cambio vigente de {moneda} a {moneda_base}"]}
+                )
+            casos.append(When(**{campo_moneda: moneda}, then=valor * Value(factor)))
+        return Case(*casos, output_field=ConversionMoneda.decimal)
+
+    @staticmethod
+    def convertir_fechado(
+        valor, moneda_base: str, campo_fecha: str, campo_moneda: str = "moneda"
+    ) -> Case:
+        """``valor`` convertido con la tasa que regía en ``campo_fecha`` de cada fila.
+
+        La tasa sale de una subconsulta correlacionada sobre el índice único
+        (origen, destino, fecha); sin tasa directa se usa la inversa y, si no
+        hay ninguna anterior a la fecha, la vigente.
+        """
+
+        def tasa(origen, destino):
+            return Subquery(
+                TipoCambio.objects.filter(
+                    moneda_origen=origen,
+                    moneda_destino=destino,
+                    fecha__lte=OuterRef(campo_fecha),
+                )
+                .order_by("-fecha")
+                .values("tasa")[:1],
+                output_field=ConversionMoneda.decimal,
+            )
+
+        alternativas = [
+            tasa(OuterRef(campo_moneda), Value(moneda_base)),
+            Value(Decimal("1")) / tasa(Value(moneda_base), OuterRef(campo_moneda)),
+        ]
+        tasas = ConversionMoneda.tasas_vigentes()
+        vigentes = [
+            When(**{campo_moneda: moneda}, then=Value(factor))
+            for moneda in MONEDAS
+            if (factor := ConversionMoneda.factor(moneda, moneda_base, tasas)) is not None
+        ]
+        if vigentes:
+            alternativas.append(Case(*vigentes, output_field=ConversionMoneda.decimal))
+
+        return Case(
+            When(**{campo_moneda: moneda_base}, then=valor),
+            default=valor * Coalesce(*alternativas, output_field=ConversionMoneda.decimal),
+            output_field=ConversionMoneda.decimal,
+        )
+
+    @staticmethod
+    def referencia(moneda_base: str) -> Dict[str, object]:
+        """Tasas vigentes usadas, para informarlas junto a los totales."""
+
+        tasas = ConversionMoneda.tasas_vigentes()
+        return {
+            moneda: float(factor)
+            for moneda in MONEDAS
+            if moneda != moneda_base
+            and (factor := ConversionMoneda.factor(moneda, moneda_base, tasas)) is not None
+        }
@@ -56,3 +56,36 @@ class ActualizarEtapaSchema(BaseModel):
     notas: Optional[str] = Field(default=None, max_length=1000)
 
 
+class MonedaBaseQuerySchema(BaseModel):
+    moneda_base: Optional[str] = Field(default=None, pattern=MONEDA_PATTERN)
+
+
+class OportunidadListQuerySchema(MonedaBaseQuerySchema):
+    totales: bool = True
+
+
+class TipoCambioSchema(BaseModel):
+    moneda_origen: str = Field(pattern=MONEDA_PATTERN)
+    moneda_destino: str = Field(pattern=MONEDA_PATTERN)
+    fecha: date
+    tasa: condecimal(gt=0, max_digits=18, decimal_places=6)
+
+    @validator("moneda_destino")
+    def validar_par(cls, value: str, values):
+        if value == values.get("moneda_origen"):
+            raise ValueError("moneda_destino debe ser distinta de moneda_origen")
+        return value
+
+
+class TipoCambioUpdateSchema(BaseModel):
+    moneda_origen: Optional[str] = Field(default=None, pattern=MONEDA_PATTERN)
+    moneda_destino: Optional[str] = Field(default=None, pattern=MONEDA_PATTERN)
+    fecha: Optional[date] = None
+    tasa: Optional[condecimal(gt=0, max_digits=18, decimal_places=6)] = None
+
+    @validator("moneda_destino")
+    def validar_par(cls, value: Optional[str], values):
+        # Con una sola moneda en el PATCH el par se valida contra el registro.
+        if value is not None and value == values.get("moneda_origen"):
+            raise ValueError("moneda_destino debe ser distinta de moneda_origen")
+        return value
@@ -5,7 +5,7 @@ from rest_framework import serializers
 from apps.clientes.models import Cliente
 from apps.empresas.models import Empresa
 
-from .models import Oportunidad
+from .models import Oportunidad, TipoCambio
 
 
 class ClienteLiteSerializer(serializers.ModelSerializer):
@@ -44,12 +44,14 @@ class OportunidadSerializer(serializers.ModelSerializer):
             "resultado",
             "notas",
             "fecha_creacion",
+            "fecha_actualizacion",
             "fecha_cierre_real",
         ]
         read_only_fields = [
             "id",
             "valor_ponderado",
             "fecha_creacion",
+            "fecha_actualizacion",
             "fecha_cierre_real",
         ]
 
@@ -57,3 +59,18 @@ class OportunidadSerializer(serializers.ModelSerializer):
         return obj.valor_ponderado
 
 
+class TipoCambioSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TipoCambio
+        fields = ["id", "moneda_origen", "moneda_destino", "fecha", "tasa"]
+        read_only_fields = ["id"]
+
+    def validate(self, attrs):
+        # Un PATCH puede cambiar solo una de las monedas del par.
+        origen = attrs.get("moneda_origen", getattr(self.instance, "moneda_origen", None))
+        destino = attrs.get("moneda_destino", getattr(self.instance, "moneda_destino", None))
+        if origen == destino:
+            raise serializers.ValidationError(
+                {"moneda_destino": ["moneda_destino debe ser distinta de moneda_origen"]}
+            )
+        return attrs
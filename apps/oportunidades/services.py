@@ -1,20 +1,33 @@
 from __future__ import annotations
 
 from collections import OrderedDict
-from decimal import Decimal
-from typing import Dict, Iterable, Tuple, Type
+from typing import Any, Dict, List, Optional, Tuple
 
+from django.db import transaction
+from django.db.models import Count, F, Max, QuerySet, Sum
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Oportunidad
+from apps.reportes.rollups import Contribucion, VentasRollup
+
+from .models import Oportunidad, TransicionEtapa
+from .monedas import ConversionMoneda
 
 
 class OportunidadService:
     """Aplicamos Service Layer para mantener reglas de negocio cohesionadas."""
 
+    @staticmethod
+    def crear(serializer: serializers.ModelSerializer) -> Oportunidad:
+        with transaction.atomic():
+            oportunidad = serializer.save()
+            OportunidadService.registrar_transicion(oportunidad, None)
+        return oportunidad
+
     @staticmethod
     def actualizar_etapa(oportunidad: Oportunidad, etapa: str, notas: str | None = None) -> Oportunidad:
+        anterior = VentasRollup.contribucion(oportunidad)
+        etapa_anterior = oportunidad.etapa
         oportunidad.etapa = etapa
         if etapa in {"cerrado_ganado", "cerrado_perdido"}:
             oportunidad.estado = "cerrada"
@@ -26,35 +39,116 @@ class OportunidadService:
             oportunidad.fecha_cierre_real = None
         if notas is not None:
             oportunidad.notas = notas
-        oportunidad.save()
+        with transaction.atomic():
+            oportunidad.save()
+            VentasRollup.aplicar(anterior, VentasRollup.contribucion(oportunidad))
+            OportunidadService.registrar_transicion(oportunidad, etapa_anterior)
+        return oportunidad
+
+    @staticmethod
+    def actualizar(serializer: serializers.ModelSerializer) -> Oportunidad:
+        anterior = VentasRollup.contribucion(serializer.instance)
+        etapa_anterior = serializer.instance.etapa
+        with transaction.atomic():
+            oportunidad = serializer.save()
+            VentasRollup.aplicar(anterior, VentasRollup.contribucion(oportunidad))
+            OportunidadService.registrar_transicion(oportunidad, etapa_anterior)
         return oportunidad
 
     @staticmethod
-    def build_pipeline(
-        oportunidades: Iterable[Oportunidad],
-        serializer_cls: Type[serializers.ModelSerializer],
-    ) -> Tuple[Dict[str, Dict[str, object]], int, float]:
-        items = list(oportunidades)
-        serialized = serializer_cls(items, many=True).data
-
-        etapas = {}
-        total_valor = Decimal("0")
-        for obj, payload in zip(items, serialized):
-            stage = obj.etapa
-            bucket = etapas.setdefault(stage, {"count": 0, "valor_total": Decimal("0"), "oportunidades": []})
-            bucket["count"] += 1
-            bucket["valor_total"] += Decimal(obj.valor)
-            bucket["oportunidades"].append(payload)
-            total_valor += Decimal(obj.valor)
-
-        ordered = OrderedDict()
-        for stage, _ in Oportunidad.ETAPAS:
-            if stage in etapas:
-                ordered[stage] = etapas[stage]
-
-        for payload in ordered.values():
-            payload["valor_total"] = float(payload["valor_total"])
-
-        return ordered, len(items), float(total_valor)
+    def estado_previo(oportunidad: Oportunidad) -> Tuple[Optional[Contribucion], str]:
+        return VentasRollup.contribucion(oportunidad), oportunidad.etapa
+
+    @staticmethod
+    def crear_lote(oportunidades: List[Oportunidad]) -> None:
+        """Transiciones iniciales de un alta en lote (como ``crear``)."""
+
+        ahora = timezone.now()
+        TransicionEtapa.objects.bulk_create(
+            TransicionEtapa(oportunidad=oportunidad, etapa_origen=None, etapa_destino=oportunidad.etapa, fecha=ahora)
+            for oportunidad in oportunidades
+        )
+
+    @staticmethod
+    def actualizar_lote(cambios: List[Tuple[Any, Oportunidad]]) -> None:
+        """Rollup y transiciones de una modificación en lote (como ``actualizar``).
+
+        ``cambios`` son pares ``(estado_previo, oportunidad ya modificada)``.
+        """
+
+        for (anterior, _), oportunidad in cambios:
+            VentasRollup.aplicar(anterior, VentasRollup.contribucion(oportunidad))
+
+        movidas = [(etapa, oportunidad) for (_, etapa), oportunidad in cambios if etapa != oportunidad.etapa]
+        if not movidas:
+            return
+        ultimas = dict(
+            TransicionEtapa.objects.filter(oportunidad_id__in=[oportunidad.pk for _, oportunidad in movidas])
+            .values("oportunidad_id")
+            .annotate(ultima=Max("fecha"))
+            .values_list("oportunidad_id", "ultima")
+        )
+        ahora = timezone.now()
+        TransicionEtapa.objects.bulk_create(
+            TransicionEtapa(
+                oportunidad=oportunidad,
+                etapa_origen=etapa,
+                etapa_destino=oportunidad.etapa,
+                fecha=ahora,
+                segundos_en_origen=max(
+                    int((ahora - (ultimas.get(oportunidad.pk) or oportunidad.fecha_creacion)).total_seconds()), 0
+                ),
+            )
+            for etapa, oportunidad in movidas
+        )
+
+    @staticmethod
+    def registrar_transicion(oportunidad: Oportunidad, etapa_anterior: str | None) -> TransicionEtapa | None:
+        if etapa_anterior == oportunidad.etapa:
+            return None
+        ahora = timezone.now()
+        segundos = None
+        if etapa_anterior is not None:
+            ultima = (
+                TransicionEtapa.objects.filter(oportunidad=oportunidad)
+                .order_by("-fecha")
+                .values_list("fecha", flat=True)
+                .first()
+            )
+            inicio = ultima or oportunidad.fecha_creacion
+            segundos = max(int((ahora - inicio).total_seconds()), 0)
+        return TransicionEtapa.objects.create(
+            oportunidad=oportunidad,
+            etapa_origen=etapa_anterior,
+            etapa_destino=oportunidad.etapa,
+            fecha=ahora,
+            segundos_en_origen=segundos,
+        )
+
+    @staticmethod
+    def eliminar(oportunidad: Oportunidad) -> None:
+        anterior = VentasRollup.contribucion(oportunidad)
+        with transaction.atomic():
+            oportunidad.delete()
+            VentasRollup.aplicar(anterior, None)
+
+    @staticmethod
+    def resumen_por_etapa(queryset: QuerySet, moneda_base: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """Cantidad y ``valor_total`` de cada etapa con oportunidades, en el orden de ``ETAPAS``.
+
+        Un solo ``GROUP BY etapa``; con ``moneda_base`` el valor se convierte
+        con las tasas vigentes.
+        """
+
+        valor = ConversionMoneda.convertir_vigente(F("valor"), moneda_base) if moneda_base else F("valor")
+        filas = {
+            fila["etapa"]: fila
+            for fila in queryset.order_by().values("etapa").annotate(count=Count("pk"), valor_total=Sum(valor))
+        }
+        return OrderedDict(
+            (etapa, {"count": filas[etapa]["count"], "valor_total": float(filas[etapa]["valor_total"] or 0)})
+            for etapa, _ in Oportunidad.ETAPAS
+            if etapa in filas
+        )
 
 
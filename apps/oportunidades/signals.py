@@ -0,0 +1,21 @@
+"""Invalidación de las tasas de cambio cacheadas por proceso.
+
+Los demás workers detectan el cambio por la versión de la tabla; la señal
+solo adelanta la recarga en el proceso que escribió.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.signals import escritura_masiva
+
+from .models import TipoCambio
+from .monedas import ConversionMoneda
+
+
+@receiver([post_save, post_delete, escritura_masiva], sender=TipoCambio)
+def invalidar_tasas(sender, **kwargs):
+    transaction.on_commit(ConversionMoneda.invalidar)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+
+from .models import TipoCambio
+from .monedas import ConversionMoneda
+
+
+class TipoCambioTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username="tasas", email="tasas@example.com", password="x", nombre_completo="Usuario Tasas"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.tipo = TipoCambio.objects.create(
+            moneda_origen="USD", moneda_destino="PEN", fecha=date.today() - timedelta(days=1), tasa=Decimal("3.7")
+        )
+        self.url = reverse("tipo-cambio-detail", args=[self.tipo.pk])
+
+    def test_patch_valida_par_y_tasa(self):
+        for cuerpo in ({"moneda_destino": "USD"}, {"moneda_origen": "PEN"}, {"tasa": "0"}, {"tasa": "-1"}):
+            with self.subTest(cuerpo=cuerpo):
+                self.assertEqual(self.client.patch(self.url, cuerpo, format="json").status_code, 400)
+
+        respuesta = self.client.patch(self.url, {"tasa": "3.8"}, format="json")
+        self.assertEqual(respuesta.status_code, 200)
+        self.tipo.refresh_from_db()
+        self.assertEqual(self.tipo.tasa, Decimal("3.8"))
+
+    def test_tasas_vigentes_detectan_cambios_de_otro_proceso(self):
+        self.assertEqual(ConversionMoneda.tasas_vigentes()[("USD", "PEN")], Decimal("3.7"))
+
+        # Sin señales, como lo vería un worker distinto del que escribió.
+        TipoCambio.objects.filter(pk=self.tipo.pk).update(tasa=Decimal("3.9"), fecha_actualizacion=timezone.now())
+        self.assertEqual(ConversionMoneda.tasas_vigentes()[("USD", "PEN")], Decimal("3.9"))
+
+        TipoCambio.objects.filter(pk=self.tipo.pk).delete()
+        self.assertNotIn(("USD", "PEN"), ConversionMoneda.tasas_vigentes())
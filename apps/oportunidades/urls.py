@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from rest_framework.routers import DefaultRouter
 
-from .views import OportunidadViewSet
+from .views import OportunidadViewSet, TipoCambioViewSet
 
 router = DefaultRouter()
+# Antes que el prefijo vacío para que "tipos-cambio" no se tome como un id.
+router.register("tipos-cambio", TipoCambioViewSet, basename="tipo-cambio")
 router.register("", OportunidadViewSet, basename="oportunidad")
 
 urlpatterns = router.urls
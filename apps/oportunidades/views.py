@@ -3,23 +3,53 @@ from __future__ import annotations
 from django.db.models import DecimalField, ExpressionWrapper, F, Sum
 from drf_spectacular.utils import extend_schema
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
 
+from common.counts import ConteoCache
 from common.mixins import CSVExportMixin
 from common.responses import success_response
+from common.schemas import parse_schema
 from common.viewsets import BaseModelViewSet
 
-from .filters import OportunidadFilter
-from .models import Oportunidad
-from .schemas import ActualizarEtapaSchema, OportunidadCreateSchema, OportunidadUpdateSchema
-from .serializers import OportunidadSerializer
+from .filters import OportunidadFilter, TipoCambioFilter
+from .models import Oportunidad, TipoCambio
+from .monedas import ConversionMoneda
+from .schemas import (
+    ActualizarEtapaSchema,
+    MonedaBaseQuerySchema,
+    OportunidadCreateSchema,
+    OportunidadListQuerySchema,
+    OportunidadUpdateSchema,
+    TipoCambioSchema,
+    TipoCambioUpdateSchema,
+)
+from .serializers import OportunidadSerializer, TipoCambioSerializer
 from .services import OportunidadService
 
 
 @extend_schema(tags=["Oportunidades"])
 class OportunidadViewSet(CSVExportMixin, BaseModelViewSet):
-    queryset = Oportunidad.objects.select_related("cliente", "cliente__empresa", "empresa")
+    queryset = Oportunidad.objects.all()
+    use_projection = True
     serializer_class = OportunidadSerializer
+    field_select_related = {
+        "cliente": ("cliente",),
+        "empresa": ("empresa",),
+    }
+    # La exportación resuelve los nombres con .values(); las escrituras
+    # (incluida actualizar-etapa) responden con cliente y empresa anidados.
+    query_plans = {"export": (), "write": ("cliente", "empresa")}
+    field_dependencies = {"valor_ponderado": ("valor", "probabilidad")}
+    # Los totales con ?moneda_base= dependen de las tasas vigentes.
+    version_models = (TipoCambio,)
+    # Misma fórmula que Oportunidad.valor_ponderado, sobre las columnas de la fila.
+    projection_computed = {
+        "valor_ponderado": (("valor", "probabilidad"), lambda valor, probabilidad: float(valor) * (probabilidad / 100)),
+    }
     filterset_class = OportunidadFilter
+    # /empresas/{empresa_pk}/oportunidades/
+    parent_lookups = {"empresa_pk": "empresa"}
     ordering_fields = ["valor", "probabilidad", "fecha_creacion", "fecha_cierre_estimada"]
     list_message = "Oportunidades obtenidas exitosamente"
     retrieve_message = "Oportunidad obtenida exitosamente"
@@ -45,33 +75,68 @@ class OportunidadViewSet(CSVExportMixin, BaseModelViewSet):
         "fecha_cierre_estimada",
         "fecha_creacion",
     )
+    csv_values = (
+        "id",
+        "nombre",
+        "cliente__nombre_completo",
+        "empresa__nombre",
+        "valor",
+        "moneda",
+        "probabilidad",
+        "etapa",
+        "estado",
+        "fecha_cierre_estimada",
+        "fecha_creacion",
+    )
 
     def list(self, request, *args, **kwargs):
+        parametros = parse_schema(OportunidadListQuerySchema, request.query_params.dict())
+        if not parametros["totales"]:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(lambda: self.list_con_totales(parametros["moneda_base"]))
+
+    def list_con_totales(self, moneda_base):
         queryset = self.filter_queryset(self.get_queryset())
-        totals = queryset.aggregate(
-            total_valor=Sum("valor"),
-            total_valor_ponderado=Sum(
-                ExpressionWrapper(
-                    F("valor") * F("probabilidad") / 100,
-                    output_field=DecimalField(max_digits=14, decimal_places=2),
-                )
-            ),
+        valor = ConversionMoneda.convertir_vigente(F("valor"), moneda_base) if moneda_base else F("valor")
+        # Total de filas y sumas en un solo agregado (cacheado por filtro); la
+        # página lo recibe como conteo y no ejecuta su propio COUNT.
+        resumen = ConteoCache.resumir(
+            queryset,
+            {
+                "total_valor": Sum(valor),
+                "total_valor_ponderado": Sum(
+                    ExpressionWrapper(
+                        valor * F("probabilidad") / 100,
+                        output_field=DecimalField(max_digits=14, decimal_places=2),
+                    )
+                ),
+            },
         )
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-        else:
-            serializer = self.get_serializer(queryset, many=True)
-            response = success_response(
-                serializer.data,
-                count=len(serializer.data),
-                message=self.list_message,
-            )
-        response.data["total_valor"] = float(totals["total_valor"] or 0)
-        response.data["total_valor_ponderado"] = float(totals["total_valor_ponderado"] or 0)
+        response = self.list_response(queryset, conteo=(resumen["total"], True))
+        response.data["total_valor"] = float(resumen["total_valor"] or 0)
+        response.data["total_valor_ponderado"] = float(resumen["total_valor_ponderado"] or 0)
+        if moneda_base:
+            response.data["moneda_base"] = moneda_base
         return response
 
+    def perform_create(self, serializer):
+        OportunidadService.crear(serializer)
+
+    def perform_update(self, serializer):
+        OportunidadService.actualizar(serializer)
+
+    def bulk_after_create(self, instancias):
+        OportunidadService.crear_lote(instancias)
+
+    def bulk_snapshot(self, instancia: Oportunidad):
+        return OportunidadService.estado_previo(instancia)
+
+    def bulk_after_update(self, cambios):
+        OportunidadService.actualizar_lote(cambios)
+
+    def perform_destroy(self, instance: Oportunidad):
+        OportunidadService.eliminar(instance)
+
     def csv_row_builder(self, oportunidad: Oportunidad):
         return (
             oportunidad.id,
@@ -89,13 +154,31 @@ class OportunidadViewSet(CSVExportMixin, BaseModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="pipeline")
     def pipeline(self, request, *args, **kwargs):
+        moneda_base = parse_schema(MonedaBaseQuerySchema, request.query_params.dict())["moneda_base"]
+        if "cursor" in request.query_params and not request.query_params.get("etapa"):
+            raise ValidationError({"cursor": ["Indique la etapa de la columna a paginar"]})
+        return self.conditional_response(lambda: self.pipeline_response(moneda_base))
+
+    def pipeline_response(self, moneda_base):
         queryset = self.filter_queryset(self.get_queryset())
-        data, total_count, total_valor = OportunidadService.build_pipeline(queryset, OportunidadSerializer)
+        columnas = OportunidadService.resumen_por_etapa(queryset, moneda_base)
+        for etapa, columna in columnas.items():
+            # Cada columna es una página de keyset propia; su next/previous
+            # agrega ?etapa= para seguir paginando solo esa columna.
+            paginador = self.cursor_pagination_class()
+            items = paginador.paginate_queryset(queryset.filter(etapa=etapa), self.request, view=self)
+            paginador.base_url = replace_query_param(paginador.base_url, "etapa", etapa)
+            columna["oportunidades"] = self.get_serializer(items, many=True).data
+            columna["next"] = paginador.get_next_link()
+            columna["previous"] = paginador.get_previous_link()
+
+        extra = {"moneda_base": moneda_base} if moneda_base else {}
         return success_response(
-            data,
+            columnas,
             message="Pipeline obtenido exitosamente",
-            total_oportunidades=total_count,
-            total_valor=total_valor,
+            total_oportunidades=sum(columna["count"] for columna in columnas.values()),
+            total_valor=sum(columna["valor_total"] for columna in columnas.values()),
+            **extra,
         )
 
     @action(detail=True, methods=["patch"], url_path="actualizar-etapa")
@@ -111,3 +194,29 @@ class OportunidadViewSet(CSVExportMixin, BaseModelViewSet):
         return success_response(serializer.data, message="Etapa actualizada exitosamente")
 
 
+@extend_schema(tags=["Oportunidades"])
+class TipoCambioViewSet(BaseModelViewSet):
+    queryset = TipoCambio.objects.all()
+    serializer_class = TipoCambioSerializer
+    filterset_class = TipoCambioFilter
+    ordering_fields = ["fecha", "moneda_origen", "moneda_destino"]
+    list_message = "Tipos de cambio obtenidos exitosamente"
+    retrieve_message = "Tipo de cambio obtenido exitosamente"
+    create_message = "Tipo de cambio creado exitosamente"
+    update_message = "Tipo de cambio actualizado exitosamente"
+    destroy_message = "Tipo de cambio eliminado exitosamente"
+    schema_map = {
+        "create": TipoCambioSchema,
+        "update": TipoCambioSchema,
+        "partial_update": TipoCambioUpdateSchema,
+    }
+
+    def bulk_check(self, model, datos, instancias):
+        super().bulk_check(model, datos, instancias)
+        errores = {
+            indice: {"moneda_destino": ["moneda_destino debe ser distinta de moneda_origen"]}
+            for indice, tipo in enumerate(instancias)
+            if tipo.moneda_origen == tipo.moneda_destino
+        }
+        if errores:
+            raise self.bulk_error(errores)
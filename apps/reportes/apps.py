@@ -6,5 +6,5 @@ class ReportesConfig(AppConfig):
     name = "apps.reportes"
     verbose_name = "Reportes"
 
-
-
+    def ready(self):
+        from . import signals  # noqa: F401
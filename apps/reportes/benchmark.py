@@ -0,0 +1,271 @@
+"""Datos sintéticos y mediciones para el benchmark de ``ReporteService``."""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.actividades.models import Actividad
+from apps.clientes.models import Cliente
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad, TipoCambio, TransicionEtapa
+
+from .rollups import VentasRollup
+from .services import ReporteService
+
+LOTE = 5000
+ETAPAS_ABIERTAS = ["prospeccion", "calificacion", "propuesta", "negociacion"]
+
+Medicion = Dict[str, float]
+
+
+def casos() -> Dict[str, Callable[[], Any]]:
+    """Reportes medidos, con parámetros equivalentes a los de la API."""
+
+    hoy = timezone.localdate()
+    inicio = hoy - timedelta(days=365)
+    return {
+        "dashboard": lambda: ReporteService.dashboard(),
+        "ventas": lambda: ReporteService.reporte_ventas(inicio, hoy, "mes", None),
+        "ventas_moneda_base": lambda: ReporteService.reporte_ventas(inicio, hoy, "mes", None, "PEN"),
+        "conversion": lambda: ReporteService.reporte_conversion(),
+        "clientes_por_empresa": lambda: ReporteService.clientes_por_empresa(),
+    }
+
+
+def _insertar(modelo, instancias: List[Any]) -> List[Any]:
+    """``bulk_create`` conservando la ``fecha_creacion`` asignada a cada instancia.
+
+    ``auto_now_add`` la reemplaza al insertar; se vuelve a escribir después con
+    ``bulk_update`` para repartir las fechas en el pasado como en datos reales.
+    """
+
+    fechas = [instancia.fecha_creacion for instancia in instancias]
+    creadas = modelo.objects.bulk_create(instancias)
+    if creadas[0].pk is None:
+        # Sin RETURNING (MySQL) se recuperan los ids del lote recién insertado.
+        ids = modelo.objects.order_by("-id").values_list("id", flat=True)[: len(creadas)]
+        for instancia, pk in zip(creadas, sorted(ids)):
+            instancia.pk = pk
+    for instancia, fecha in zip(creadas, fechas):
+        instancia.fecha_creacion = fecha
+    modelo.objects.bulk_update(creadas, ["fecha_creacion"], batch_size=1000)
+    return creadas
+
+
+class GeneradorDatos:
+    """Genera un volumen dado de oportunidades con proporciones realistas.
+
+    Por cada 100 oportunidades: 1 empresa, 10 clientes y 100 actividades; cada
+    oportunidad recorre el pipeline registrando sus transiciones de etapa.
+    """
+
+    def __init__(self, oportunidades: int, semilla: int = 42):
+        self.total = oportunidades
+        self.random = random.Random(semilla)
+        self.ahora = timezone.now()
+
+    def generar(self) -> None:
+        usuario = get_user_model().objects.create(
+            username="benchmark",
+            email="benchmark@example.com",
+            nombre_completo="Benchmark",
+        )
+        empresas = self._empresas(max(self.total // 100, 1))
+        clientes = self._clientes(empresas, max(self.total // 10, 1))
+        self._oportunidades(clientes, usuario)
+        self._tipos_cambio()
+        VentasRollup.reconstruir()
+
+    def _fecha(self, max_dias: int = 730):
+        return self.ahora - timedelta(seconds=self.random.randint(0, max_dias * 86400))
+
+    def _empresas(self, cantidad: int) -> List[int]:
+        industrias = [codigo for codigo, _ in Empresa.INDUSTRIAS]
+        for desde in range(0, cantidad, LOTE):
+            _insertar(
+                Empresa,
+                [
+                    Empresa(
+                        nombre=f"Empresa benchmark {i}",
+                        industria=self.random.choice(industrias),
+                        fecha_creacion=self._fecha(),
+                    )
+                    for i in range(desde, min(desde + LOTE, cantidad))
+                ],
+            )
+        return list(Empresa.objects.values_list("id", flat=True))
+
+    def _clientes(self, empresas: List[int], cantidad: int) -> List[tuple]:
+        for desde in range(0, cantidad, LOTE):
+            _insertar(
+                Cliente,
+                [
+                    Cliente(
+                        nombre_completo=f"Cliente benchmark {i}",
+                        empresa_id=self.random.choice(empresas),
+                        telefono="+51999999999",
+                        email=f"cliente{i}@example.com",
+                        fecha_creacion=self._fecha(),
+                    )
+                    for i in range(desde, min(desde + LOTE, cantidad))
+                ],
+            )
+        return list(Cliente.objects.values_list("id", "empresa_id"))
+
+    def _oportunidades(self, clientes: List[tuple], usuario) -> None:
+        tipos = [codigo for codigo, _ in Actividad.TIPOS]
+        estados = [codigo for codigo, _ in Actividad.ESTADOS]
+        for desde in range(0, self.total, LOTE):
+            lote = [self._oportunidad(i, clientes) for i in range(desde, min(desde + LOTE, self.total))]
+            creadas = _insertar(Oportunidad, lote)
+            TransicionEtapa.objects.bulk_create(
+                transicion for oportunidad in creadas for transicion in self._transiciones(oportunidad)
+            )
+            _insertar(
+                Actividad,
+                [
+                    Actividad(
+                        tipo=self.random.choice(tipos),
+                        asunto=f"Seguimiento {oportunidad.nombre}",
+                        fecha_hora=self._fecha(),
+                        estado=self.random.choice(estados),
+                        cliente_id=oportunidad.cliente_id,
+                        oportunidad_id=oportunidad.pk,
+                        usuario=usuario,
+                        fecha_creacion=oportunidad.fecha_creacion,
+                    )
+                    for oportunidad in creadas
+                ],
+            )
+
+    def _oportunidad(self, indice: int, clientes: List[tuple]) -> Oportunidad:
+        cliente_id, empresa_id = self.random.choice(clientes)
+        creacion = self._fecha()
+        etapa = self.random.choices(
+            ETAPAS_ABIERTAS + ["cerrado_ganado", "cerrado_perdido"], weights=[3, 2, 2, 1, 1, 1]
+        )[0]
+        cerrada = etapa.startswith("cerrado")
+        cierre = None
+        if cerrada:
+            segundos = int((self.ahora - creacion).total_seconds())
+            cierre = creacion + timedelta(seconds=self.random.randint(0, max(segundos, 0)))
+        return Oportunidad(
+            nombre=f"Oportunidad benchmark {indice}",
+            cliente_id=cliente_id,
+            empresa_id=empresa_id,
+            valor=Decimal(self.random.randint(1000, 5000000)) / 100,
+            moneda=self.random.choices(["PEN", "USD", "EUR"], weights=[6, 3, 1])[0],
+            probabilidad=self.random.randint(0, 100),
+            fecha_cierre_estimada=(creacion + timedelta(days=90)).date(),
+            etapa=etapa,
+            estado="cerrada" if cerrada else "abierta",
+            resultado=("ganada" if etapa == "cerrado_ganado" else "perdida") if cerrada else None,
+            fecha_creacion=creacion,
+            fecha_cierre_real=cierre,
+        )
+
+    def _transiciones(self, oportunidad: Oportunidad) -> Iterator[TransicionEtapa]:
+        if oportunidad.etapa in ETAPAS_ABIERTAS:
+            recorrido = ETAPAS_ABIERTAS[: ETAPAS_ABIERTAS.index(oportunidad.etapa) + 1]
+        else:
+            pasos = self.random.randint(1, len(ETAPAS_ABIERTAS))
+            recorrido = ETAPAS_ABIERTAS[:pasos] + [oportunidad.etapa]
+        fin = oportunidad.fecha_cierre_real or self.ahora
+        tramo = (fin - oportunidad.fecha_creacion) / len(recorrido)
+        origen = None
+        for paso, destino in enumerate(recorrido):
+            yield TransicionEtapa(
+                oportunidad_id=oportunidad.pk,
+                etapa_origen=origen,
+                etapa_destino=destino,
+                fecha=oportunidad.fecha_creacion + tramo * paso,
+                segundos_en_origen=int(tramo.total_seconds()) if origen else None,
+            )
+            origen = destino
+
+    def _tipos_cambio(self) -> None:
+        hoy = timezone.localdate()
+        TipoCambio.objects.bulk_create(
+            TipoCambio(moneda_origen=origen, moneda_destino="PEN", fecha=hoy - timedelta(days=dias), tasa=tasa)
+            for dias in range(0, 730, 30)
+            for origen, tasa in (("USD", Decimal("3.750000")), ("EUR", Decimal("4.050000")))
+        )
+
+
+def medir(funcion: Callable[[], Any], repeticiones: int) -> Medicion:
+    """Consultas, tiempo (mediana) y memoria pico de un reporte.
+
+    Cada métrica se toma en una pasada distinta: capturar consultas y trazar
+    memoria agregan sobrecarga que distorsionaría el tiempo medido. Una corrida
+    previa calienta las cachés de proceso (p. ej. tasas de cambio vigentes).
+    """
+
+    funcion()
+    with CaptureQueriesContext(connection) as consultas:
+        funcion()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "segundos": round(statistics.median(tiempos), 4),
+        "consultas": len(consultas.captured_queries),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def comparar(
+    actual: Dict[str, Dict[str, Medicion]],
+    base: Dict[str, Dict[str, Medicion]],
+    tolerancia: float,
+    minimo_segundos: float,
+) -> List[str]:
+    """Regresiones de ``actual`` frente a ``base`` por tamaño y reporte.
+
+    El tiempo y la memoria admiten ``tolerancia`` relativa (y el tiempo además
+    un mínimo absoluto para ignorar ruido); el número de consultas no puede
+    aumentar.
+    """
+
+    regresiones = []
+    for tamano, reportes in actual.items():
+        for reporte, medicion in reportes.items():
+            referencia = base.get(tamano, {}).get(reporte)
+            if not referencia:
+                continue
+            if medicion["consultas"] > referencia["consultas"]:
+                regresiones.append(
+                    f"{tamano}/{reporte}: consultas {referencia['consultas']} -> {medicion['consultas']}"
+                )
+            limite = referencia["segundos"] * (1 + tolerancia)
+            if medicion["segundos"] > limite and medicion["segundos"] - referencia["segundos"] > minimo_segundos:
+                regresiones.append(
+                    f"{tamano}/{reporte}: tiempo {referencia['segundos']}s -> {medicion['segundos']}s"
+                )
+            if medicion["memoria_pico_kb"] > referencia["memoria_pico_kb"] * (1 + tolerancia):
+                regresiones.append(
+                    f"{tamano}/{reporte}: memoria {referencia['memoria_pico_kb']}KB"
+                    f" -> {medicion['memoria_pico_kb']}KB"
+                )
+    return regresiones
@@ -0,0 +1,102 @@
+"""Caché versionada para los resultados de reportes."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, Type
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+
+from apps.actividades.models import Actividad
+from apps.clientes.models import Cliente
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad, TipoCambio, TransicionEtapa
+from common.cache import ModelGeneration, cache_compartida
+
+from .models import VentaDiaria
+
+DEPENDENCIAS: Dict[str, Iterable[Type[models.Model]]] = {
+    "dashboard": (Oportunidad, Actividad, Cliente, Empresa, VentaDiaria, TipoCambio),
+    "ventas": (Oportunidad, VentaDiaria, TipoCambio),
+    "conversion": (Oportunidad, TransicionEtapa, TipoCambio),
+    "clientes_por_empresa": (Empresa, Cliente, Oportunidad, TipoCambio),
+}
+
+
+class ReporteCache:
+    """Cachea cada reporte por parámetros y por generación de sus modelos."""
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        return getattr(settings, "REPORTES_CACHE", {})
+
+    @staticmethod
+    def backend():
+        return caches[ReporteCache.config().get("ALIAS", "default")]
+
+    @staticmethod
+    def generaciones() -> ModelGeneration:
+        return ModelGeneration(ReporteCache.backend())
+
+    @staticmethod
+    def firma(nombre: str, parametros: Dict[str, Any]) -> str:
+        generaciones = ReporteCache.generaciones().get_many(DEPENDENCIAS[nombre])
+        contenido = json.dumps(
+            {"parametros": parametros, "generaciones": generaciones},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    @staticmethod
+    def clave(nombre: str, parametros: Dict[str, Any]) -> str:
+        return f"reporte:{nombre}:{ReporteCache.firma(nombre, parametros)}"
+
+    @staticmethod
+    def obtener(nombre: str, parametros: Dict[str, Any], calcular: Callable[[], Any]) -> Any:
+        ttl = ReporteCache.config().get("TTL", 300)
+        backend = ReporteCache.backend()
+        if not ttl or not cache_compartida(backend):
+            return calcular()
+
+        clave = ReporteCache.clave(nombre, parametros)
+        resultado = backend.get(clave)
+        if resultado is not None:
+            ReporteCache._contar(nombre, "hits")
+            return resultado
+
+        ReporteCache._contar(nombre, "misses")
+        resultado = calcular()
+        backend.set(clave, resultado, timeout=ttl)
+        return resultado
+
+    @staticmethod
+    def invalidar(model: Type[models.Model]) -> None:
+        ReporteCache.generaciones().bump(model)
+
+    @staticmethod
+    def estadisticas() -> Dict[str, Dict[str, int]]:
+        backend = ReporteCache.backend()
+        claves = {
+            f"reporte-stats:{nombre}:{tipo}": (nombre, tipo)
+            for nombre in DEPENDENCIAS
+            for tipo in ("hits", "misses")
+        }
+        valores = backend.get_many(list(claves))
+        stats: Dict[str, Dict[str, int]] = {nombre: {"hits": 0, "misses": 0} for nombre in DEPENDENCIAS}
+        for clave, (nombre, tipo) in claves.items():
+            stats[nombre][tipo] = valores.get(clave, 0)
+        return stats
+
+    @staticmethod
+    def _contar(nombre: str, tipo: str) -> None:
+        backend = ReporteCache.backend()
+        clave = f"reporte-stats:{nombre}:{tipo}"
+        if not backend.add(clave, 1, timeout=None):
+            try:
+                backend.incr(clave)
+            except ValueError:
+                backend.add(clave, 1, timeout=None)
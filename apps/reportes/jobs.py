@@ -0,0 +1,113 @@
+"""Cola de reportes en base de datos para ejecuciones largas."""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from common.cache import cache_compartida
+
+from .cache import ReporteCache
+from .models import ReporteJob
+from .services import ReporteService
+
+logger = logging.getLogger("crm.reportes")
+
+
+class ReporteJobService:
+    """Encola, reclama y ejecuta reportes fuera del ciclo de la petición."""
+
+    @staticmethod
+    def encolar(nombre: str, parametros: Dict[str, Any], usuario=None) -> ReporteJob:
+        # La firma de la caché incluye la generación de los datos: un job con la
+        # misma firma sigue siendo válido mientras no cambien los modelos.
+        firma = ReporteCache.firma(nombre, parametros)
+        # Solo se reutilizan jobs del mismo usuario: cada uno consulta los suyos.
+        vigentes = ReporteJob.objects.filter(firma=firma, tipo=nombre, usuario=usuario).exclude(
+            estado=ReporteJob.ERROR
+        )
+        ttl = ReporteCache.config().get("TTL", 300)
+        if cache_compartida(ReporteCache.backend()):
+            frescos = vigentes.exclude(
+                estado=ReporteJob.COMPLETADO,
+                fecha_fin__lt=timezone.now() - timedelta(seconds=ttl),
+            )
+        else:
+            # Con una caché por proceso las generaciones no ven las escrituras
+            # de otros workers: solo se comparte un job que aún no terminó.
+            frescos = vigentes.filter(estado__in=[ReporteJob.PENDIENTE, ReporteJob.PROCESANDO])
+        existente = frescos.order_by("-fecha_creacion").first()
+        if existente is not None:
+            return existente
+        return ReporteJob.objects.create(
+            tipo=nombre,
+            parametros=parametros,
+            firma=firma,
+            usuario=usuario,
+        )
+
+    @staticmethod
+    def reclamar() -> Optional[ReporteJob]:
+        with transaction.atomic():
+            job = (
+                ReporteJob.objects.select_for_update(skip_locked=True)
+                .filter(estado=ReporteJob.PENDIENTE)
+                .order_by("fecha_creacion")
+                .first()
+            )
+            if job is None:
+                return None
+            job.estado = ReporteJob.PROCESANDO
+            job.fecha_inicio = timezone.now()
+            job.save(update_fields=["estado", "fecha_inicio"])
+        return job
+
+    @staticmethod
+    def ejecutar(job: ReporteJob) -> ReporteJob:
+        try:
+            job.resultado = ReporteCache.obtener(
+                job.tipo,
+                job.parametros,
+                lambda: ReporteService.ejecutar(job.tipo, job.parametros),
+            )
+            job.estado = ReporteJob.COMPLETADO
+        except Exception as exc:  # noqa: BLE001 - el error se guarda en el job
+            logger.exception("Error procesando reporte %s", job.pk)
+            job.estado = ReporteJob.ERROR
+            job.error = str(exc)
+        job.fecha_fin = timezone.now()
+        job.save(update_fields=["resultado", "estado", "error", "fecha_fin"])
+        return job
+
+    @staticmethod
+    def liberar_vencidos(segundos: int) -> int:
+        """Devuelve a la cola los jobs de un worker que murió a mitad de proceso."""
+
+        limite = timezone.now() - timedelta(seconds=segundos)
+        return ReporteJob.objects.filter(
+            estado=ReporteJob.PROCESANDO, fecha_inicio__lt=limite
+        ).update(estado=ReporteJob.PENDIENTE, fecha_inicio=None)
+
+    @staticmethod
+    def para_usuario(usuario):
+        """Jobs visibles para ``usuario``: los propios, o todos si es staff."""
+
+        if usuario.is_staff:
+            return ReporteJob.objects.all()
+        return ReporteJob.objects.filter(usuario=usuario)
+
+    @staticmethod
+    def purgar(horas: int) -> int:
+        """Elimina los jobs terminados hace más de ``horas`` (0 los conserva)."""
+
+        if not horas:
+            return 0
+        limite = timezone.now() - timedelta(hours=horas)
+        eliminados, _ = ReporteJob.objects.filter(
+            estado__in=[ReporteJob.COMPLETADO, ReporteJob.ERROR], fecha_fin__lt=limite
+        ).delete()
+        return eliminados
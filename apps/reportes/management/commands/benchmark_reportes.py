@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.oportunidades.models import Oportunidad
+from apps.reportes.benchmark import GeneradorDatos, casos, comparar, medir
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide ReporteService sobre datos sintéticos (tiempo, consultas y memoria pico) "
+        "y compara contra una línea base. Los datos se generan en una transacción que "
+        "se revierte al terminar; usar solo contra una base local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanos",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000, 1_000_000],
+            help="Cantidades de oportunidades a generar.",
+        )
+        parser.add_argument("--reportes", nargs="+", choices=sorted(casos()), help="Subconjunto de reportes.")
+        parser.add_argument("--repeticiones", type=int, default=3, help="Corridas cronometradas por reporte.")
+        parser.add_argument("--output", help="Archivo JSON donde escribir los resultados.")
+        parser.add_argument("--baseline", help="Archivo JSON de referencia contra el que comparar.")
+        parser.add_argument(
+            "--actualizar-baseline",
+            action="store_true",
+            help="Sobrescribe --baseline con los resultados de esta corrida.",
+        )
+        parser.add_argument(
+            "--tolerancia",
+            type=float,
+            default=0.25,
+            help="Aumento relativo admitido de tiempo y memoria antes de marcar regresión.",
+        )
+        parser.add_argument(
+            "--minimo-segundos",
+            type=float,
+            default=0.05,
+            help="Diferencia de tiempo absoluta por debajo de la cual no se marca regresión.",
+        )
+        parser.add_argument(
+            "--forzar",
+            action="store_true",
+            help="Ejecuta aunque la base ya tenga oportunidades (los resultados se mezclan).",
+        )
+
+    def handle(self, *args, **options):
+        if options["actualizar_baseline"] and not options["baseline"]:
+            raise CommandError("--actualizar-baseline requiere --baseline")
+        if Oportunidad.objects.exists() and not options["forzar"]:
+            raise CommandError("La base ya tiene oportunidades; usar una base vacía o --forzar.")
+
+        seleccion = {
+            nombre: funcion
+            for nombre, funcion in casos().items()
+            if not options["reportes"] or nombre in options["reportes"]
+        }
+        resultados = {}
+        for tamano in options["tamanos"]:
+            resultados[str(tamano)] = self._medir_tamano(tamano, seleccion, options["repeticiones"])
+
+        salida = {
+            "fecha": timezone.now().isoformat(),
+            "entorno": {
+                "base_de_datos": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "resultados": resultados,
+        }
+        if options["output"]:
+            self._escribir(options["output"], salida)
+
+        if options["baseline"]:
+            if options["actualizar_baseline"]:
+                self._escribir(options["baseline"], salida)
+                return
+            self._comparar(options["baseline"], resultados, options["tolerancia"], options["minimo_segundos"])
+
+    def _medir_tamano(self, tamano, seleccion, repeticiones):
+        mediciones = {}
+        with transaction.atomic():
+            self.stdout.write(f"Generando {tamano} oportunidades...")
+            GeneradorDatos(tamano).generar()
+            for nombre, funcion in seleccion.items():
+                mediciones[nombre] = medir(funcion, repeticiones)
+                self.stdout.write(
+                    f"  {nombre}: {mediciones[nombre]['segundos']}s, "
+                    f"{mediciones[nombre]['consultas']} consultas, "
+                    f"{mediciones[nombre]['memoria_pico_kb']}KB"
+                )
+            transaction.set_rollback(True)
+        return mediciones
+
+    def _comparar(self, ruta, resultados, tolerancia, minimo_segundos):
+        try:
+            base = json.loads(Path(ruta).read_text(encoding="utf-8"))["resultados"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"No se pudo leer la línea base {ruta}: {exc}") from exc
+
+        regresiones = comparar(resultados, base, tolerancia, minimo_segundos)
+        if regresiones:
+            for regresion in regresiones:
+                self.stderr.write(f"REGRESIÓN {regresion}")
+            raise CommandError(f"{len(regresiones)} regresiones frente a {ruta}")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la línea base"))
+
+    def _escribir(self, ruta, contenido):
+        Path(ruta).write_text(json.dumps(contenido, indent=2, ensure_ascii=False), encoding="utf-8")
+        self.stdout.write(f"Resultados escritos en {ruta}")
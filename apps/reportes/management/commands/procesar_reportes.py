@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reportes.jobs import ReporteJobService
+
+
+class Command(BaseCommand):
+    help = "Worker local que procesa la cola de reportes asíncronos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--una-vez", action="store_true", help="Procesa lo pendiente y termina.")
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre sondeos.")
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=900,
+            help="Segundos tras los cuales un job en proceso se considera abandonado.",
+        )
+        parser.add_argument(
+            "--retener-horas",
+            type=int,
+            default=24,
+            help="Horas que se conservan los jobs terminados antes de eliminarlos (0 los conserva).",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Worker de reportes iniciado")
+        while True:
+            liberados = ReporteJobService.liberar_vencidos(options["timeout"])
+            if liberados:
+                self.stdout.write(f"Jobs abandonados reencolados: {liberados}")
+            purgados = ReporteJobService.purgar(options["retener_horas"])
+            if purgados:
+                self.stdout.write(f"Jobs terminados eliminados: {purgados}")
+
+            job = ReporteJobService.reclamar()
+            if job is None:
+                if options["una_vez"]:
+                    return
+                time.sleep(options["intervalo"])
+                continue
+
+            job = ReporteJobService.ejecutar(job)
+            self.stdout.write(f"Job {job.pk} ({job.tipo}): {job.estado}")
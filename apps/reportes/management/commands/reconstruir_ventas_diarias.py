@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.reportes.cache import ReporteCache
+from apps.reportes.models import VentaDiaria
+from apps.reportes.rollups import VentasRollup
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el rollup diario de ventas (VentaDiaria), completo o por rango de fechas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+        parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        total = VentasRollup.reconstruir(options["desde"], options["hasta"])
+        ReporteCache.invalidar(VentaDiaria)
+        self.stdout.write(self.style.SUCCESS(f"Rollup reconstruido: {total} filas"))
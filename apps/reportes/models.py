@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class VentaDiaria(models.Model):
+    """Acumulado diario de ventas ganadas por moneda (tabla de rollup)."""
+
+    fecha = models.DateField()
+    moneda = models.CharField(max_length=3)
+    cantidad = models.PositiveIntegerField(default=0)
+    valor_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["fecha", "moneda"]
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "moneda"], name="uniq_venta_diaria_fecha_moneda"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.fecha} {self.moneda}: {self.cantidad}"
+
+
+class ReporteJob(models.Model):
+    """Ejecución diferida de un reporte, procesada por ``procesar_reportes``."""
+
+    PENDIENTE = "pendiente"
+    PROCESANDO = "procesando"
+    COMPLETADO = "completado"
+    ERROR = "error"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (PROCESANDO, "Procesando"),
+        (COMPLETADO, "Completado"),
+        (ERROR, "Error"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=40)
+    parametros = models.JSONField(default=dict)
+    firma = models.CharField(max_length=64)
+    estado = models.CharField(max_length=15, choices=ESTADOS, default=PENDIENTE)
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="reporte_jobs",
+        null=True,
+        blank=True,
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["fecha_creacion"]
+        indexes = [
+            models.Index(fields=["estado", "fecha_creacion"], name="idx_reportejob_estado"),
+            models.Index(fields=["firma", "estado"], name="idx_reportejob_firma"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tipo} ({self.estado})"
@@ -5,12 +5,15 @@ from typing import Optional
 
 from pydantic import BaseModel, Field, validator
 
+from apps.oportunidades.schemas import MONEDA_PATTERN, MonedaBaseQuerySchema
+
 
 class VentasQuerySchema(BaseModel):
     fecha_inicio: date
     fecha_fin: date
     agrupar_por: str = Field(default="mes", pattern="^(dia|semana|mes)$")
-    moneda: Optional[str] = Field(default=None, pattern="^(PEN|USD|EUR)$")
+    moneda: Optional[str] = Field(default=None, pattern=MONEDA_PATTERN)
+    moneda_base: Optional[str] = Field(default=None, pattern=MONEDA_PATTERN)
 
     @validator("fecha_fin")
     def validar_rango(cls, value: date, values):
@@ -20,3 +23,10 @@ class VentasQuerySchema(BaseModel):
         return value
 
 
+class ClientesPorEmpresaQuerySchema(MonedaBaseQuerySchema):
+    ordering: str = Field(
+        default="nombre",
+        pattern="^-?(nombre|num_clientes|num_oportunidades|valor_total)$",
+    )
+    page_size: Optional[int] = Field(default=None, ge=1, le=500)
+    cursor: Optional[str] = None
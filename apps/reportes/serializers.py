@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import ReporteJob
+
+
+class ReporteJobSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    resultado = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReporteJob
+        fields = [
+            "id",
+            "tipo",
+            "estado",
+            "parametros",
+            "url",
+            "resultado",
+            "error",
+            "fecha_creacion",
+            "fecha_inicio",
+            "fecha_fin",
+        ]
+        read_only_fields = fields
+
+    def get_url(self, obj: ReporteJob) -> str:
+        url = reverse("reporte-job", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_resultado(self, obj: ReporteJob):
+        return obj.resultado if obj.estado == ReporteJob.COMPLETADO else None
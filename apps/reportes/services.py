@@ -2,120 +2,149 @@ from __future__ import annotations
 
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 
-from django.db.models import Avg, Count, DecimalField, DurationField, ExpressionWrapper, F, Sum
-from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.db.models import (
+    Avg,
+    Count,
+    DecimalField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
 from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 
 from apps.actividades.models import Actividad
 from apps.clientes.models import Cliente
 from apps.empresas.models import Empresa
-from apps.oportunidades.models import Oportunidad
+from apps.oportunidades.models import Oportunidad, TransicionEtapa
+from apps.oportunidades.monedas import ConversionMoneda
+from common.keyset import decode_cursor, encode_cursor, keyset_filter
+from common.pagination import KeysetPagination
+
+from .models import VentaDiaria
+
+STREAM_CHUNK_SIZE = 2000
 
 
 class ReporteService:
     """Service Layer para mantener las agregaciones desacopladas de las vistas."""
 
     @staticmethod
-    def dashboard() -> Dict[str, object]:
-        clientes = Cliente.objects.count()
-        empresas = Empresa.objects.count()
-        oportunidades_abiertas = Oportunidad.objects.filter(estado="abierta").count()
-        oportunidades_cerradas = Oportunidad.objects.filter(estado="cerrada").count()
-        actividades_pendientes = Actividad.objects.filter(estado="pendiente").count()
-        actividades_completadas = Actividad.objects.filter(estado="completada").count()
-
-        abiertas = Oportunidad.objects.filter(estado="abierta")
-        valores = abiertas.aggregate(
-            valor_total=Sum("valor"),
-            valor_ponderado=Sum(
-                ExpressionWrapper(
-                    F("valor") * F("probabilidad") / 100,
-                    output_field=DecimalField(max_digits=14, decimal_places=2),
-                )
-            ),
-        )
+    def ejecutar(nombre: str, parametros: Dict[str, Any]) -> Any:
+        """Despacha un reporte por nombre con parámetros serializables a JSON."""
+
+        moneda_base = parametros.get("moneda_base")
+        if nombre == "dashboard":
+            return ReporteService.dashboard(moneda_base)
+        if nombre == "ventas":
+            return ReporteService.reporte_ventas(**ReporteService._argumentos_ventas(parametros))
+        if nombre == "conversion":
+            return ReporteService.reporte_conversion(moneda_base)
+        if nombre == "clientes_por_empresa":
+            return ReporteService.clientes_por_empresa(
+                parametros.get("ordering", "nombre"),
+                parametros.get("page_size"),
+                parametros.get("cursor"),
+                moneda_base,
+            )
+        raise ValueError(f"Reporte desconocido: {nombre}")
 
+    @staticmethod
+    def iter_filas(nombre: str, parametros: Dict[str, Any]) -> Iterator[Dict[str, object]]:
+        """Filas del reporte producidas desde un iterador del servidor (exportación)."""
+
+        if nombre == "ventas":
+            return ReporteService.iter_ventas_por_periodo(**ReporteService._argumentos_ventas(parametros))
+        if nombre == "clientes_por_empresa":
+            return ReporteService.iter_clientes_por_empresa(
+                parametros.get("ordering", "nombre"),
+                parametros.get("cursor"),
+                parametros.get("moneda_base"),
+            )
+        raise ValueError(f"Reporte sin exportación por filas: {nombre}")
+
+    @staticmethod
+    def dashboard(moneda_base: str | None = None) -> Dict[str, object]:
+        # Agregación condicional: una sola consulta por tabla en lugar de un
+        # COUNT por estado, etapa y tipo.
         now = timezone.now().date()
         mes_actual_inicio = now.replace(day=1)
         mes_anterior_fin = mes_actual_inicio - timedelta(days=1)
         mes_anterior_inicio = mes_anterior_fin.replace(day=1)
 
-        ventas_actual = ReporteService._ventas_por_rango(mes_actual_inicio, now)
-        ventas_anterior = ReporteService._ventas_por_rango(mes_anterior_inicio, mes_anterior_fin)
-
-        etapas = {
-            etapa: Oportunidad.objects.filter(etapa=etapa).count()
-            for etapa, _ in Oportunidad.ETAPAS
-        }
-        actividades_tipo = {
-            tipo: Actividad.objects.filter(tipo=tipo).count()
-            for tipo, _ in Actividad.TIPOS
-        }
+        abiertas = Q(estado="abierta")
+        oportunidades = Oportunidad.objects.aggregate(
+            abiertas=Count("id", filter=abiertas),
+            cerradas=Count("id", filter=Q(estado="cerrada")),
+            valor_total=Sum(ReporteService._valor(moneda_base), filter=abiertas),
+            valor_ponderado=Sum(ReporteService._valor_ponderado(moneda_base), filter=abiertas),
+            **{
+                f"etapa_{etapa}": Count("id", filter=Q(etapa=etapa))
+                for etapa, _ in Oportunidad.ETAPAS
+            },
+        )
+        valor_venta = ReporteService._valor_venta(moneda_base)
+        ventas = ReporteService._ventas_queryset(mes_anterior_inicio, now, None).aggregate(
+            actual=Sum(valor_venta, filter=Q(fecha__gte=mes_actual_inicio)),
+            anterior=Sum(valor_venta, filter=Q(fecha__lte=mes_anterior_fin)),
+        )
+        actividades = Actividad.objects.aggregate(
+            pendientes=Count("id", filter=Q(estado="pendiente")),
+            completadas=Count("id", filter=Q(estado="completada")),
+            **{f"tipo_{tipo}": Count("id", filter=Q(tipo=tipo)) for tipo, _ in Actividad.TIPOS},
+        )
 
         return {
+            **ReporteService._info_moneda(moneda_base),
             "totales": {
-                "clientes": clientes,
-                "empresas": empresas,
-                "oportunidades_abiertas": oportunidades_abiertas,
-                "oportunidades_cerradas": oportunidades_cerradas,
-                "actividades_pendientes": actividades_pendientes,
-                "actividades_completadas": actividades_completadas,
+                "clientes": Cliente.objects.count(),
+                "empresas": Empresa.objects.count(),
+                "oportunidades_abiertas": oportunidades["abiertas"],
+                "oportunidades_cerradas": oportunidades["cerradas"],
+                "actividades_pendientes": actividades["pendientes"],
+                "actividades_completadas": actividades["completadas"],
             },
             "valores": {
-                "valor_total_pipeline": float(valores["valor_total"] or 0),
-                "valor_ponderado_pipeline": float(valores["valor_ponderado"] or 0),
-                "ventas_cerradas_mes_actual": ventas_actual,
-                "ventas_cerradas_mes_anterior": ventas_anterior,
+                "valor_total_pipeline": float(oportunidades["valor_total"] or 0),
+                "valor_ponderado_pipeline": float(oportunidades["valor_ponderado"] or 0),
+                "ventas_cerradas_mes_actual": float(ventas["actual"] or 0),
+                "ventas_cerradas_mes_anterior": float(ventas["anterior"] or 0),
+            },
+            "oportunidades_por_etapa": {
+                etapa: oportunidades[f"etapa_{etapa}"] for etapa, _ in Oportunidad.ETAPAS
+            },
+            "actividades_por_tipo": {
+                tipo: actividades[f"tipo_{tipo}"] for tipo, _ in Actividad.TIPOS
             },
-            "oportunidades_por_etapa": etapas,
-            "actividades_por_tipo": actividades_tipo,
         }
 
     @staticmethod
     def reporte_ventas(
-        fecha_inicio: date, fecha_fin: date, agrupar_por: str, moneda: str | None
+        fecha_inicio: date,
+        fecha_fin: date,
+        agrupar_por: str,
+        moneda: str | None,
+        moneda_base: str | None = None,
     ) -> Dict[str, object]:
-        queryset = Oportunidad.objects.filter(
-            estado="cerrada",
-            resultado="ganada",
-            fecha_cierre_real__date__gte=fecha_inicio,
-            fecha_cierre_real__date__lte=fecha_fin,
+        queryset = ReporteService._ventas_queryset(fecha_inicio, fecha_fin, moneda)
+        resumen = queryset.aggregate(
+            total_ventas=Sum("cantidad"),
+            valor_total=Sum(ReporteService._valor_venta(moneda_base)),
         )
-        if moneda:
-            queryset = queryset.filter(moneda=moneda)
-
-        total_ventas = queryset.count()
-        valor_total = queryset.aggregate(total=Sum("valor"))["total"] or Decimal("0")
+        total_ventas = resumen["total_ventas"] or 0
+        valor_total = resumen["valor_total"] or Decimal("0")
         ticket_promedio = float(valor_total / total_ventas) if total_ventas else 0.0
 
-        trunc_map = {"dia": TruncDay, "semana": TruncWeek, "mes": TruncMonth}
-        trunc = trunc_map[agrupar_por]
-
-        ventas_por_periodo: List[Dict[str, object]] = []
-        for item in (
-            queryset.annotate(periodo=trunc("fecha_cierre_real"))
-            .values("periodo")
-            .annotate(cantidad=Count("id"), valor_total=Sum("valor"))
-            .order_by("periodo")
-        ):
-            periodo_dt = item["periodo"]
-            if agrupar_por == "mes":
-                periodo_label = periodo_dt.strftime("%Y-%m")
-            elif agrupar_por == "semana":
-                periodo_label = periodo_dt.strftime("%Y-W%U")
-            else:
-                periodo_label = periodo_dt.strftime("%Y-%m-%d")
-            ventas_por_periodo.append(
-                {
-                    "periodo": periodo_label,
-                    "cantidad": item["cantidad"],
-                    "valor_total": float(item["valor_total"] or 0),
-                }
-            )
-
         return {
+            **ReporteService._info_moneda(moneda_base),
             "periodo": {
                 "fecha_inicio": fecha_inicio.isoformat(),
                 "fecha_fin": fecha_fin.isoformat(),
@@ -125,106 +154,287 @@ class ReporteService:
                 "valor_total": float(valor_total),
                 "ticket_promedio": ticket_promedio,
             },
-            "ventas_por_periodo": ventas_por_periodo,
+            "ventas_por_periodo": list(
+                ReporteService.iter_ventas_por_periodo(
+                    fecha_inicio, fecha_fin, agrupar_por, moneda, moneda_base
+                )
+            ),
         }
 
     @staticmethod
-    def reporte_conversion() -> Dict[str, object]:
-        queryset = Oportunidad.objects.all()
-        total_creadas = queryset.count()
-        total_ganadas = queryset.filter(resultado="ganada").count()
-        total_perdidas = queryset.filter(resultado="perdida").count()
+    def iter_ventas_por_periodo(
+        fecha_inicio: date,
+        fecha_fin: date,
+        agrupar_por: str,
+        moneda: str | None,
+        moneda_base: str | None = None,
+    ) -> Iterator[Dict[str, object]]:
+        trunc_map = {"dia": TruncDay, "semana": TruncWeek, "mes": TruncMonth}
+        trunc = trunc_map[agrupar_por]
+        formatos = {"dia": "%Y-%m-%d", "semana": "%Y-W%U", "mes": "%Y-%m"}
 
-        conversion_general = (
-            round((total_ganadas / total_creadas) * 100, 2) if total_creadas else 0.0
+        periodos = (
+            ReporteService._ventas_queryset(fecha_inicio, fecha_fin, moneda)
+            .annotate(periodo=trunc("fecha"))
+            .values("periodo")
+            .annotate(
+                cantidad=Sum("cantidad"),
+                valor_total=Sum(ReporteService._valor_venta(moneda_base)),
+            )
+            .order_by("periodo")
         )
+        for item in periodos.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            yield {
+                "periodo": item["periodo"].strftime(formatos[agrupar_por]),
+                "cantidad": item["cantidad"],
+                "valor_total": float(item["valor_total"] or 0),
+            }
 
-        etapas_count = {
-            etapa: queryset.filter(etapa=etapa).count()
-            for etapa, _ in Oportunidad.ETAPAS
-        }
+    @staticmethod
+    def reporte_conversion(moneda_base: str | None = None) -> Dict[str, object]:
+        duracion = ExpressionWrapper(
+            F("fecha_cierre_real") - F("fecha_creacion"), output_field=DurationField()
+        )
+        totales = Oportunidad.objects.aggregate(
+            creadas=Count("id"),
+            ganadas=Count("id", filter=Q(resultado="ganada")),
+            perdidas=Count("id", filter=Q(resultado="perdida")),
+            abiertas=Count("id", filter=Q(estado="abierta")),
+            ticket_ganadas=Avg(ReporteService._valor(moneda_base), filter=Q(resultado="ganada")),
+            duracion=Avg(duracion, filter=Q(fecha_cierre_real__isnull=False)),
+        )
+        total_creadas = totales["creadas"]
+        total_ganadas = totales["ganadas"]
+        total_perdidas = totales["perdidas"]
 
         def ratio(numerador: int, denominador: int) -> float:
             return round((numerador / denominador) * 100, 2) if denominador else 0.0
 
+        # Las tasas salen del historial de transiciones: de las oportunidades que
+        # entraron a una etapa, cuántas pasaron directamente a la siguiente.
+        entradas = dict(
+            TransicionEtapa.objects.values_list("etapa_destino")
+            .annotate(total=Count("oportunidad", distinct=True))
+            .order_by()
+        )
+        pasos: Dict[Tuple[str, str], int] = {}
+        tiempo_por_etapa: Dict[str, List[int]] = {}
+        for item in (
+            TransicionEtapa.objects.filter(etapa_origen__isnull=False)
+            .values("etapa_origen", "etapa_destino")
+            .annotate(
+                total=Count("oportunidad", distinct=True),
+                segundos=Sum("segundos_en_origen"),
+                mediciones=Count("segundos_en_origen"),
+            )
+            .order_by()
+        ):
+            origen, destino = item["etapa_origen"], item["etapa_destino"]
+            pasos[(origen, destino)] = item["total"]
+            acumulado = tiempo_por_etapa.setdefault(origen, [0, 0])
+            acumulado[0] += item["segundos"] or 0
+            acumulado[1] += item["mediciones"]
+
         conversion_por_etapa = {
             "prospeccion_a_calificacion": ratio(
-                etapas_count.get("calificacion", 0), etapas_count.get("prospeccion", 0)
+                pasos.get(("prospeccion", "calificacion"), 0), entradas.get("prospeccion", 0)
             ),
             "calificacion_a_propuesta": ratio(
-                etapas_count.get("propuesta", 0), etapas_count.get("calificacion", 0)
+                pasos.get(("calificacion", "propuesta"), 0), entradas.get("calificacion", 0)
             ),
             "propuesta_a_negociacion": ratio(
-                etapas_count.get("negociacion", 0), etapas_count.get("propuesta", 0)
+                pasos.get(("propuesta", "negociacion"), 0), entradas.get("propuesta", 0)
             ),
             "negociacion_a_cierre": ratio(
-                queryset.filter(etapa__in=["cerrado_ganado", "cerrado_perdido"]).count(),
-                etapas_count.get("negociacion", 0),
+                pasos.get(("negociacion", "cerrado_ganado"), 0)
+                + pasos.get(("negociacion", "cerrado_perdido"), 0),
+                entradas.get("negociacion", 0),
             ),
         }
+        transiciones = [
+            {
+                "desde": origen,
+                "hacia": destino,
+                "oportunidades": total,
+                "tasa": ratio(total, entradas.get(origen, 0)),
+            }
+            for (origen, destino), total in sorted(pasos.items())
+        ]
+        tiempo_promedio_por_etapa = {
+            etapa: round(segundos / mediciones / 86400, 2)
+            for etapa, (segundos, mediciones) in tiempo_por_etapa.items()
+            if mediciones
+        }
 
-        duracion = (
-            queryset.filter(fecha_cierre_real__isnull=False)
-            .annotate(
-                duracion=ExpressionWrapper(
-                    F("fecha_cierre_real") - F("fecha_creacion"),
-                    output_field=DurationField(),
-                )
-            )
-            .aggregate(promedio=Avg("duracion"))
-        )
-        promedio = duracion["promedio"]
+        promedio = totales["duracion"]
         tiempo_promedio_dias = int(promedio.total_seconds() // 86400) if promedio else 0
 
+        # Velocidad de ventas: valor esperado que el pipeline abierto cierra por día.
+        ciclo_dias = promedio.total_seconds() / 86400 if promedio else 0.0
+        tasa_ganancia = total_ganadas / (total_ganadas + total_perdidas) if total_ganadas else 0.0
+        ticket_promedio = float(totales["ticket_ganadas"] or 0)
+        valor_por_dia = (
+            totales["abiertas"] * tasa_ganancia * ticket_promedio / ciclo_dias if ciclo_dias > 0 else 0.0
+        )
+
         return {
+            **ReporteService._info_moneda(moneda_base),
             "total_oportunidades_creadas": total_creadas,
             "total_cerradas_ganadas": total_ganadas,
             "total_cerradas_perdidas": total_perdidas,
-            "tasa_conversion_general": conversion_general,
+            "tasa_conversion_general": ratio(total_ganadas, total_creadas),
             "conversion_por_etapa": conversion_por_etapa,
+            "transiciones": transiciones,
+            "tiempo_promedio_por_etapa_dias": tiempo_promedio_por_etapa,
             "tiempo_promedio_cierre_dias": tiempo_promedio_dias,
+            "velocidad": {
+                "oportunidades_abiertas": totales["abiertas"],
+                "tasa_ganancia": round(tasa_ganancia * 100, 2),
+                "ticket_promedio": round(ticket_promedio, 2),
+                "ciclo_promedio_dias": round(ciclo_dias, 2),
+                "valor_por_dia": round(valor_por_dia, 2),
+            },
         }
 
     @staticmethod
-    def clientes_por_empresa() -> List[Dict[str, object]]:
-        empresas = (
-            Empresa.objects.annotate(
-                num_clientes=Count("clientes", distinct=True),
-                num_oportunidades=Count("oportunidades", distinct=True),
-                valor_total=Sum("oportunidades__valor"),
-            )
-            .order_by("nombre")
-            .values(
-                "id",
-                "nombre",
-                "num_clientes",
-                "num_oportunidades",
-                "valor_total",
-            )
+    def clientes_por_empresa(
+        ordering: str = "nombre",
+        page_size: int | None = None,
+        cursor: str | None = None,
+        moneda_base: str | None = None,
+    ) -> List[Dict[str, object]] | Dict[str, object]:
+        if page_size is None:
+            return list(ReporteService.iter_clientes_por_empresa(ordering, cursor, moneda_base))
+
+        orden = ReporteService._orden_empresas(ordering)
+        hacia_atras, valores = ReporteService._leer_cursor(cursor)
+        consulta = KeysetPagination.invertir(orden) if hacia_atras else orden
+        items = list(ReporteService._empresas_queryset(consulta, valores, moneda_base)[: page_size + 1])
+        hay_mas = len(items) > page_size
+        items = items[:page_size]
+        if hacia_atras:
+            items.reverse()
+
+        def cursor_de(item: Dict[str, object], direccion: str) -> str:
+            return encode_cursor([direccion, [item[campo.lstrip("-")] for campo in orden]])
+
+        # Igual que KeysetPagination: avanzando hay página previa si se llegó
+        # por cursor; retrocediendo siempre existe la siguiente. Una página
+        # vacía tras un cursor enlaza a la primera ("").
+        siguiente = cursor_de(items[-1], "n") if items and (hay_mas or hacia_atras) else None
+        anterior = None
+        if hay_mas if hacia_atras else bool(cursor):
+            anterior = cursor_de(items[0], "p") if items else ""
+        return {
+            "data": [ReporteService._fila_empresa(item) for item in items],
+            "siguiente": siguiente,
+            "anterior": anterior,
+        }
+
+    @staticmethod
+    def iter_clientes_por_empresa(
+        ordering: str = "nombre", cursor: str | None = None, moneda_base: str | None = None
+    ) -> Iterator[Dict[str, object]]:
+        # La exportación continúa hacia adelante desde un cursor de avance. No
+        # es un generador: el cursor se valida antes de empezar la respuesta.
+        hacia_atras, valores = ReporteService._leer_cursor(cursor)
+        if hacia_atras:
+            raise ValidationError({"cursor": ["Cursor inválido"]})
+        orden = ReporteService._orden_empresas(ordering)
+        empresas = ReporteService._empresas_queryset(orden, valores, moneda_base)
+        return (ReporteService._fila_empresa(item) for item in empresas.iterator(chunk_size=STREAM_CHUNK_SIZE))
+
+    @staticmethod
+    def _leer_cursor(cursor: str | None) -> Tuple[bool, List[Any] | None]:
+        if not cursor:
+            return False, None
+        contenido = decode_cursor(cursor)
+        if len(contenido) != 2 or contenido[0] not in ("n", "p") or not isinstance(contenido[1], list):
+            raise ValidationError({"cursor": ["Cursor inválido"]})
+        return contenido[0] == "p", contenido[1]
+
+    @staticmethod
+    def _empresas_queryset(orden: List[str], valores: List[Any] | None, moneda_base: str | None = None):
+        # num_clientes y num_oportunidades son contadores guardados en la
+        # empresa; valor_total se agrega en una subconsulta correlacionada (un
+        # JOIN con oportunidades multiplicaría las filas por empresa).
+        valor_total = Subquery(
+            Oportunidad.objects.filter(empresa=OuterRef("pk"))
+            .order_by()
+            .values("empresa")
+            .annotate(total=Sum(ReporteService._valor(moneda_base)))
+            .values("total")
+        )
+        decimal = DecimalField(max_digits=16, decimal_places=2)
+        empresas = Empresa.objects.annotate(
+            valor_total=Coalesce(valor_total, Value(Decimal("0")), output_field=decimal),
+        )
+        if valores is not None:
+            empresas = empresas.filter(keyset_filter(orden, valores))
+        return empresas.order_by(*orden).values(
+            "id",
+            "nombre",
+            "num_clientes",
+            "num_oportunidades",
+            "valor_total",
         )
 
-        return [
-            {
-                "empresa_id": item["id"],
-                "empresa_nombre": item["nombre"],
-                "num_clientes": item["num_clientes"],
-                "num_oportunidades": item["num_oportunidades"],
-                "valor_total_oportunidades": float(item["valor_total"] or 0),
-            }
-            for item in empresas
-        ]
+    @staticmethod
+    def _orden_empresas(ordering: str) -> List[str]:
+        desempate = "-id" if ordering.startswith("-") else "id"
+        return [ordering, desempate]
+
+    @staticmethod
+    def _fila_empresa(item: Dict[str, object]) -> Dict[str, object]:
+        return {
+            "empresa_id": item["id"],
+            "empresa_nombre": item["nombre"],
+            "num_clientes": item["num_clientes"],
+            "num_oportunidades": item["num_oportunidades"],
+            "valor_total_oportunidades": float(item["valor_total"] or 0),
+        }
 
     @staticmethod
-    def _ventas_por_rango(fecha_inicio: date, fecha_fin: date) -> float:
-        total = (
-            Oportunidad.objects.filter(
-                estado="cerrada",
-                resultado="ganada",
-                fecha_cierre_real__date__gte=fecha_inicio,
-                fecha_cierre_real__date__lte=fecha_fin,
-            ).aggregate(total=Sum("valor"))["total"]
-            or 0
+    def _argumentos_ventas(parametros: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "fecha_inicio": date.fromisoformat(parametros["fecha_inicio"]),
+            "fecha_fin": date.fromisoformat(parametros["fecha_fin"]),
+            "agrupar_por": parametros["agrupar_por"],
+            "moneda": parametros.get("moneda"),
+            "moneda_base": parametros.get("moneda_base"),
+        }
+
+    @staticmethod
+    def _ventas_queryset(fecha_inicio: date, fecha_fin: date, moneda: str | None):
+        # Se lee el rollup diario en lugar de re-agregar las oportunidades ganadas.
+        queryset = VentaDiaria.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+        if moneda:
+            queryset = queryset.filter(moneda=moneda)
+        return queryset
+
+    @staticmethod
+    def _valor(moneda_base: str | None):
+        # Sin moneda base se suman los montos tal cual, como antes.
+        if not moneda_base:
+            return F("valor")
+        return ConversionMoneda.convertir_vigente(F("valor"), moneda_base)
+
+    @staticmethod
+    def _valor_ponderado(moneda_base: str | None = None) -> ExpressionWrapper:
+        return ExpressionWrapper(
+            ReporteService._valor(moneda_base) * F("probabilidad") / 100,
+            output_field=DecimalField(max_digits=14, decimal_places=2),
         )
-        return float(total)
 
+    @staticmethod
+    def _valor_venta(moneda_base: str | None):
+        # Las ventas cerradas se convierten con la tasa del día de cierre.
+        if not moneda_base:
+            return F("valor_total")
+        return ConversionMoneda.convertir_fechado(F("valor_total"), moneda_base, "fecha")
 
+    @staticmethod
+    def _info_moneda(moneda_base: str | None) -> Dict[str, object]:
+        if not moneda_base:
+            return {}
+        return {"moneda_base": moneda_base, "tipos_cambio": ConversionMoneda.referencia(moneda_base)}
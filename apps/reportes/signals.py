@@ -0,0 +1,26 @@
+"""Invalidación de la caché de reportes ante cambios en los datos."""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.actividades.models import Actividad
+from apps.clientes.models import Cliente
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad, TipoCambio
+from common.signals import escritura_masiva
+
+from .cache import ReporteCache
+
+
+@receiver([post_save, post_delete, escritura_masiva], sender=Oportunidad)
+@receiver([post_save, post_delete, escritura_masiva], sender=Actividad)
+@receiver([post_save, post_delete, escritura_masiva], sender=Cliente)
+@receiver([post_save, post_delete, escritura_masiva], sender=Empresa)
+@receiver([post_save, post_delete, escritura_masiva], sender=TipoCambio)
+def invalidar_reportes(sender, **kwargs):
+    # Se invalida al confirmar la transacción para que ninguna petición
+    # concurrente cachee datos previos bajo la nueva generación.
+    transaction.on_commit(lambda: ReporteCache.invalidar(sender))
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.actividades.models import Actividad
+from apps.authentication.models import User
+from apps.clientes.models import Cliente
+from apps.empresas.models import Empresa
+from apps.oportunidades.models import Oportunidad
+from common.keyset import encode_cursor
+
+from .jobs import ReporteJobService
+from .models import ReporteJob, VentaDiaria
+from .rollups import VentasRollup
+from .services import ReporteService
+
+# Oportunidades, actividades, clientes, empresas y las ventas de ambos meses.
+CONSULTAS_DASHBOARD = 5
+
+
+def crear_datos(empresas: int, clientes: int, oportunidades: int) -> User:
+    """``empresas`` × ``clientes`` × ``oportunidades``, con una actividad por oportunidad."""
+
+    usuario = User.objects.create_user(
+        username="reportes", email="reportes@example.com", password="x", nombre_completo="Usuario Reportes"
+    )
+    etapas = [etapa for etapa, _ in Oportunidad.ETAPAS]
+    tipos = [tipo for tipo, _ in Actividad.TIPOS]
+    ahora = timezone.now()
+    indice = 0
+    for i in range(empresas):
+        empresa = Empresa.objects.create(nombre=f"Empresa {i}")
+        for j in range(clientes):
+            cliente = Cliente.objects.create(
+                nombre_completo=f"Cliente {i}-{j}",
+                empresa=empresa,
+                telefono="+51999999999",
+                email=f"cliente{i}-{j}@example.com",
+            )
+            for k in range(oportunidades):
+                etapa = etapas[indice % len(etapas)]
+                cerrada = etapa.startswith("cerrado")
+                oportunidad = Oportunidad.objects.create(
+                    nombre=f"Oportunidad {i}-{j}-{k}",
+                    cliente=cliente,
+                    empresa=empresa,
+                    valor=Decimal("100.00") * (k + 1),
+                    probabilidad=50,
+                    fecha_cierre_estimada=date.today() + timedelta(days=30),
+                    etapa=etapa,
+                    estado="cerrada" if cerrada else "abierta",
+                    resultado=("ganada" if etapa == "cerrado_ganado" else "perdida") if cerrada else None,
+                    fecha_cierre_real=ahora if cerrada else None,
+                )
+                Actividad.objects.create(
+                    tipo=tipos[indice % len(tipos)],
+                    asunto="Seguimiento",
+                    fecha_hora=ahora,
+                    estado="completada" if indice % 2 else "pendiente",
+                    cliente=cliente,
+                    oportunidad=oportunidad,
+                    usuario=usuario,
+                )
+                indice += 1
+    return usuario
+
+
+class DashboardTests(TestCase):
+    def test_consultas_no_dependen_del_volumen(self):
+        crear_datos(empresas=1, clientes=1, oportunidades=2)
+        with self.assertNumQueries(CONSULTAS_DASHBOARD):
+            ReporteService.dashboard()
+
+        antes = Oportunidad.objects.count()
+        for indice in range(10):
+            cliente = Cliente.objects.first()
+            Oportunidad.objects.create(
+                nombre=f"Extra {indice}",
+                cliente=cliente,
+                empresa=cliente.empresa,
+                valor=Decimal("10.00"),
+                probabilidad=10,
+                fecha_cierre_estimada=date.today(),
+                etapa="propuesta",
+            )
+        self.assertEqual(Oportunidad.objects.count(), antes + 10)
+        with self.assertNumQueries(CONSULTAS_DASHBOARD):
+            ReporteService.dashboard()
+
+    def test_totales_por_etapa_y_tipo(self):
+        crear_datos(empresas=2, clientes=2, oportunidades=3)
+        data = ReporteService.dashboard()
+
+        self.assertEqual(data["totales"]["empresas"], 2)
+        self.assertEqual(data["totales"]["clientes"], 4)
+        self.assertEqual(
+            data["totales"]["oportunidades_abiertas"] + data["totales"]["oportunidades_cerradas"],
+            Oportunidad.objects.count(),
+        )
+        for etapa, _ in Oportunidad.ETAPAS:
+            self.assertEqual(data["oportunidades_por_etapa"][etapa], Oportunidad.objects.filter(etapa=etapa).count())
+        for tipo, _ in Actividad.TIPOS:
+            self.assertEqual(data["actividades_por_tipo"][tipo], Actividad.objects.filter(tipo=tipo).count())
+        abiertas = Oportunidad.objects.filter(estado="abierta")
+        self.assertAlmostEqual(data["valores"]["valor_total_pipeline"], float(sum(o.valor for o in abiertas)))
+
+    def test_ventas_del_mes_actual_y_anterior(self):
+        hoy = timezone.now().date()
+        inicio = hoy.replace(day=1)
+        fin_anterior = inicio - timedelta(days=1)
+        for fecha, moneda, valor in (
+            (hoy, "PEN", "100.00"),
+            (inicio, "USD", "50.00"),
+            (fin_anterior, "PEN", "30.00"),
+            (fin_anterior.replace(day=1), "USD", "20.00"),
+            (fin_anterior.replace(day=1) - timedelta(days=1), "PEN", "999.00"),
+        ):
+            VentaDiaria.objects.create(fecha=fecha, moneda=moneda, cantidad=1, valor_total=Decimal(valor))
+
+        valores = ReporteService.dashboard()["valores"]
+        self.assertEqual(valores["ventas_cerradas_mes_actual"], 150.0)
+        self.assertEqual(valores["ventas_cerradas_mes_anterior"], 50.0)
+
+
+class ClientesPorEmpresaTests(TestCase):
+    def test_totales_con_varios_clientes_y_oportunidades(self):
+        # Un JOIN de clientes con oportunidades multiplicaría conteos y sumas.
+        crear_datos(empresas=3, clientes=4, oportunidades=3)
+        filas = ReporteService.clientes_por_empresa()
+
+        self.assertEqual(len(filas), 3)
+        for fila in filas:
+            self.assertEqual(fila["num_clientes"], 4)
+            self.assertEqual(fila["num_oportunidades"], 12)
+            self.assertAlmostEqual(fila["valor_total_oportunidades"], 4 * (100 + 200 + 300))
+
+    def test_paginas_con_enlaces_next_y_previous(self):
+        usuario = crear_datos(empresas=5, clientes=1, oportunidades=1)
+        client = APIClient()
+        client.force_authenticate(usuario)
+        url = reverse("clientes-por-empresa")
+
+        primera = client.get(url, {"page_size": 2}).json()
+        self.assertEqual([f["empresa_nombre"] for f in primera["data"]], ["Empresa 0", "Empresa 1"])
+        self.assertIsNone(primera["previous"])
+
+        segunda = client.get(primera["next"]).json()
+        self.assertEqual([f["empresa_nombre"] for f in segunda["data"]], ["Empresa 2", "Empresa 3"])
+
+        tercera = client.get(segunda["next"]).json()
+        self.assertEqual([f["empresa_nombre"] for f in tercera["data"]], ["Empresa 4"])
+        self.assertIsNone(tercera["next"])
+
+        volver = client.get(tercera["previous"]).json()
+        self.assertEqual(volver["data"], segunda["data"])
+        self.assertIsNotNone(volver["next"])
+
+    def test_exportacion_con_cursor_invalido_responde_400(self):
+        usuario = crear_datos(empresas=1, clientes=1, oportunidades=1)
+        client = APIClient()
+        client.force_authenticate(usuario)
+        url = reverse("clientes-por-empresa")
+
+        # El cursor se valida antes de empezar el streaming, no a mitad del cuerpo.
+        for cursor in ("zzz", encode_cursor(["p", ["Empresa 0", 1]])):
+            respuesta = client.get(url, {"format": "csv", "cursor": cursor})
+            self.assertEqual(respuesta.status_code, 400)
+
+
+class ReporteJobTests(TestCase):
+    def setUp(self):
+        self.duenio = User.objects.create_user(
+            username="duenio", email="duenio@example.com", password="x", nombre_completo="Dueño"
+        )
+        self.otro = User.objects.create_user(
+            username="otro", email="otro@example.com", password="x", nombre_completo="Otro"
+        )
+        self.job = ReporteJobService.encolar("dashboard", {}, usuario=self.duenio)
+        self.url = reverse("reporte-job", args=[self.job.pk])
+        self.client = APIClient()
+
+    def test_solo_el_duenio_o_staff_consultan_el_job(self):
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(self.duenio)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.otro.is_staff = True
+        self.otro.save()
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_no_reutiliza_jobs_de_otro_usuario(self):
+        self.assertNotEqual(ReporteJobService.encolar("dashboard", {}, usuario=self.otro).pk, self.job.pk)
+        self.assertEqual(ReporteJobService.encolar("dashboard", {}, usuario=self.duenio).pk, self.job.pk)
+
+    def test_no_reutiliza_terminados_sobre_un_backend_por_proceso(self):
+        ReporteJobService.ejecutar(ReporteJobService.reclamar())
+        self.assertNotEqual(ReporteJobService.encolar("dashboard", {}, usuario=self.duenio).pk, self.job.pk)
+
+    @override_settings(CACHE_PROCESO_UNICO=True)
+    def test_reutiliza_terminados_si_se_declara_un_solo_proceso(self):
+        ReporteJobService.ejecutar(ReporteJobService.reclamar())
+        self.assertEqual(ReporteJobService.encolar("dashboard", {}, usuario=self.duenio).pk, self.job.pk)
+
+    def test_purgar_elimina_solo_terminados_antiguos(self):
+        ReporteJobService.ejecutar(ReporteJobService.reclamar())
+        reciente = ReporteJobService.encolar("conversion", {}, usuario=self.duenio)
+        ReporteJob.objects.filter(pk=self.job.pk).update(fecha_fin=timezone.now() - timedelta(hours=25))
+
+        self.assertEqual(ReporteJobService.purgar(24), 1)
+        self.assertFalse(ReporteJob.objects.filter(pk=self.job.pk).exists())
+        self.assertTrue(ReporteJob.objects.filter(pk=reciente.pk).exists())
+
+
+class VentasRollupTests(TestCase):
+    def test_reconstruir_un_rango_conserva_el_resto(self):
+        crear_datos(empresas=1, clientes=1, oportunidades=8)
+        hoy = timezone.localdate()
+        antigua = VentaDiaria.objects.create(
+            fecha=hoy - timedelta(days=400), moneda="PEN", cantidad=3, valor_total=Decimal("30.00")
+        )
+        VentaDiaria.objects.create(fecha=hoy, moneda="PEN", cantidad=99, valor_total=Decimal("1.00"))
+
+        VentasRollup.reconstruir(hoy - timedelta(days=1), hoy)
+
+        ganadas = Oportunidad.objects.filter(resultado="ganada")
+        fila = VentaDiaria.objects.get(fecha=hoy, moneda="PEN")
+        self.assertEqual(fila.cantidad, ganadas.count())
+        self.assertEqual(fila.valor_total, sum(o.valor for o in ganadas))
+        self.assertTrue(VentaDiaria.objects.filter(pk=antigua.pk).exists())
@@ -6,6 +6,8 @@ from .views import (
     ClientesPorEmpresaView,
     ConversionReportView,
     DashboardView,
+    ReporteCacheStatsView,
+    ReporteJobView,
     VentasReportView,
 )
 
@@ -18,6 +20,8 @@ urlpatterns = [
         ClientesPorEmpresaView.as_view(),
         name="clientes-por-empresa",
     ),
+    path("cache/", ReporteCacheStatsView.as_view(), name="reportes-cache"),
+    path("jobs/<uuid:job_id>/", ReporteJobView.as_view(), name="reporte-job"),
 ]
 
 
@@ -1,55 +1,149 @@
 from __future__ import annotations
 
+from typing import Any, Dict
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.views import APIView
 
 from common.responses import success_response
 from common.schemas import parse_schema
+from common.streaming import StreamingExportMixin, stream_rows
 
-from .schemas import VentasQuerySchema
+from .cache import ReporteCache
+from .jobs import ReporteJobService
+from .schemas import ClientesPorEmpresaQuerySchema, MonedaBaseQuerySchema, VentasQuerySchema
+from .serializers import ReporteJobSerializer
 from .services import ReporteService
 
 
-@extend_schema(tags=["Reportes"])
-class DashboardView(APIView):
+class ReporteView(StreamingExportMixin, APIView):
+    """Resuelve un reporte desde caché o lo encola si se pide ``?async=true``.
+
+    Las vistas que definen ``export_fields`` aceptan además
+    ``?format=csv|ndjson`` y escriben las filas en streaming.
+    """
+
     permission_classes = [IsAuthenticated]
+    reporte: str = ""
+    success_message: str = ""
+
+    def get_parametros(self, request) -> Dict[str, Any]:
+        return {}
 
     def get(self, request, *args, **kwargs):
-        data = ReporteService.dashboard()
-        return success_response(data, message="Dashboard obtenido exitosamente")
+        parametros = self.get_parametros(request)
+        formato = self.get_export_format(request)
+        if formato:
+            filas = ReporteService.iter_filas(self.reporte, parametros)
+            return stream_rows(formato, self.reporte, self.export_fields, filas)
+
+        if request.query_params.get("async", "").lower() in {"1", "true", "si"}:
+            job = ReporteJobService.encolar(self.reporte, parametros, usuario=request.user)
+            return success_response(
+                ReporteJobSerializer(job, context={"request": request}).data,
+                message="Reporte encolado exitosamente",
+                status_code=status.HTTP_202_ACCEPTED,
+            )
+
+        data = ReporteCache.obtener(
+            self.reporte,
+            parametros,
+            lambda: ReporteService.ejecutar(self.reporte, parametros),
+        )
+        return self.build_response(data)
+
+    def build_response(self, data):
+        return success_response(data, message=self.success_message)
 
 
 @extend_schema(tags=["Reportes"])
-class VentasReportView(APIView):
-    permission_classes = [IsAuthenticated]
+class DashboardView(ReporteView):
+    reporte = "dashboard"
+    success_message = "Dashboard obtenido exitosamente"
 
-    def get(self, request, *args, **kwargs):
-        payload = parse_schema(VentasQuerySchema, request.query_params.dict())
-        data = ReporteService.reporte_ventas(
-            fecha_inicio=payload["fecha_inicio"],
-            fecha_fin=payload["fecha_fin"],
-            agrupar_por=payload["agrupar_por"],
-            moneda=payload.get("moneda"),
-        )
-        return success_response(data, message="Reporte de ventas generado exitosamente")
+    def get_parametros(self, request) -> Dict[str, Any]:
+        # La fecha forma parte de la clave porque define los rangos mensuales.
+        return {
+            "fecha": timezone.localdate().isoformat(),
+            **parse_schema(MonedaBaseQuerySchema, request.query_params.dict()),
+        }
 
 
 @extend_schema(tags=["Reportes"])
-class ConversionReportView(APIView):
-    permission_classes = [IsAuthenticated]
+class VentasReportView(ReporteView):
+    reporte = "ventas"
+    success_message = "Reporte de ventas generado exitosamente"
 
-    def get(self, request, *args, **kwargs):
-        data = ReporteService.reporte_conversion()
-        return success_response(data, message="Reporte de conversión generado exitosamente")
+    export_fields = ("periodo", "cantidad", "valor_total")
+
+    def get_parametros(self, request) -> Dict[str, Any]:
+        return parse_schema(VentasQuerySchema, request.query_params.dict())
+
+
+@extend_schema(tags=["Reportes"])
+class ConversionReportView(ReporteView):
+    reporte = "conversion"
+    success_message = "Reporte de conversión generado exitosamente"
+
+    def get_parametros(self, request) -> Dict[str, Any]:
+        return parse_schema(MonedaBaseQuerySchema, request.query_params.dict())
+
+
+@extend_schema(tags=["Reportes"])
+class ClientesPorEmpresaView(ReporteView):
+    reporte = "clientes_por_empresa"
+    success_message = "Reporte generado exitosamente"
+    export_fields = (
+        "empresa_id",
+        "empresa_nombre",
+        "num_clientes",
+        "num_oportunidades",
+        "valor_total_oportunidades",
+    )
+
+    def get_parametros(self, request) -> Dict[str, Any]:
+        return parse_schema(ClientesPorEmpresaQuerySchema, request.query_params.dict())
+
+    def build_response(self, data):
+        # Con page_size el servicio devuelve la página y sus cursores; los
+        # enlaces se arman aquí porque el resultado cacheado no depende del host.
+        if isinstance(data, dict):
+            return success_response(
+                data["data"],
+                message=self.success_message,
+                next=self.enlace(data["siguiente"]),
+                previous=self.enlace(data["anterior"]),
+            )
+        return super().build_response(data)
+
+    def enlace(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        if not cursor:
+            return remove_query_param(url, "cursor")
+        return replace_query_param(url, "cursor", cursor)
 
 
 @extend_schema(tags=["Reportes"])
-class ClientesPorEmpresaView(APIView):
+class ReporteJobView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
-        data = ReporteService.clientes_por_empresa()
-        return success_response(data, message="Reporte generado exitosamente")
+    def get(self, request, job_id, *args, **kwargs):
+        job = get_object_or_404(ReporteJobService.para_usuario(request.user), pk=job_id)
+        data = ReporteJobSerializer(job, context={"request": request}).data
+        return success_response(data, message="Estado del reporte obtenido exitosamente")
 
 
+@extend_schema(tags=["Reportes"])
+class ReporteCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        data = ReporteCache.estadisticas()
+        return success_response(data, message="Estadísticas de caché obtenidas exitosamente")
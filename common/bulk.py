@@ -0,0 +1,320 @@
+"""Altas y modificaciones en lote (``POST``/``PATCH`` sobre ``bulk/``)."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Type
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from pydantic import BaseModel, TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+
+from .contadores import Contadores
+from .exceptions import ConstraintError
+from .responses import success_response
+from .signals import escritura_masiva
+
+Errores = Dict[int, Dict[str, List[str]]]
+
+
+@lru_cache(maxsize=None)
+def _adaptador(schema_cls: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema_cls])
+
+
+def validar_lote(
+    schema_cls: Type[BaseModel],
+    items: List[Any],
+    exclude_unset: bool = False,
+) -> Tuple[List[Optional[Dict[str, Any]]], Errores]:
+    """Valida ``items`` con ``schema_cls`` y devuelve ``(datos, errores)``.
+
+    Sin errores es una sola llamada a pydantic para toda la lista. Con errores
+    se vuelve a validar solo el resto, para que quien lo necesite (la
+    importación) conserve las filas válidas; ``datos[i]`` es ``None`` en los
+    índices con error. Los valores salen en modo JSON, como en ``parse_schema``.
+    """
+
+    adaptador = _adaptador(schema_cls)
+    errores: Errores = {}
+    try:
+        modelos: List[Optional[BaseModel]] = adaptador.validate_python(items)
+    except PydanticValidationError as exc:
+        for err in exc.errors():
+            indice, *ruta = err["loc"]
+            campo = str(ruta[-1]) if ruta else "non_field_errors"
+            errores.setdefault(indice, {}).setdefault(campo, []).append(err["msg"])
+        validos = [indice for indice in range(len(items)) if indice not in errores]
+        modelos = [None] * len(items)
+        for indice, modelo in zip(validos, adaptador.validate_python([items[indice] for indice in validos])):
+            modelos[indice] = modelo
+    datos = [
+        modelo.model_dump(mode="json", exclude_unset=exclude_unset) if modelo is not None else None
+        for modelo in modelos
+    ]
+    return datos, errores
+
+
+def marcar_auto_now(model, instancias: Sequence[Any]) -> List[str]:
+    """Asigna los ``auto_now`` que ``bulk_update`` no toca (no llama a ``pre_save``)."""
+
+    ahora = timezone.now()
+    campos = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now", False):
+            for instancia in instancias:
+                setattr(instancia, field.attname, ahora)
+            campos.append(field.attname)
+    return campos
+
+
+class BulkMixin:
+    """Valida la lista entera antes de escribir: o se guardan todos o ninguno.
+
+    Los ítems se validan con los esquemas de ``schema_map`` (``create`` y
+    ``partial_update``) en una sola pasada, las FK y los campos únicos se
+    comprueban con una consulta ``IN`` por campo y la escritura usa
+    ``bulk_create``/``bulk_update`` por lotes en una transacción. Como esas
+    operaciones no emiten ``post_save``, al final se envía
+    ``escritura_masiva`` para invalidar cachés. Los viewsets completan cada
+    instancia con ``bulk_prepare`` y reaccionan en ``bulk_after_create`` /
+    ``bulk_after_update`` (transiciones, rollups, ...).
+    """
+
+    bulk_created_message = "Registros creados exitosamente"
+    bulk_updated_message = "Registros actualizados exitosamente"
+
+    def get_bulk_config(self) -> Dict[str, Any]:
+        return getattr(settings, "BULK", {})
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"items": ["Envíe una lista no vacía de registros"]})
+        maximo = self.get_bulk_config().get("MAX_ITEMS")
+        if maximo and len(items) > maximo:
+            raise ValidationError({"items": [f"Se admiten hasta {maximo} registros por petición"]})
+        if request.method == "POST":
+            return self.bulk_create(items)
+        return self.bulk_update(items)
+
+    def bulk_create(self, items: List[Any]):
+        schema_cls = self.schema_map.get("create")
+        if schema_cls is None:
+            raise MethodNotAllowed("POST")
+        datos = self.bulk_validate(schema_cls, items, partial=False)
+        model = self.queryset.model
+        instancias = []
+        for valores in datos:
+            instancia = model(**self.bulk_values(model, valores))
+            self.bulk_prepare(instancia)
+            instancias.append(instancia)
+        self.bulk_check(model, datos, instancias)
+
+        with self.bulk_atomic(model):
+            for lote in self.bulk_lotes(instancias):
+                self.bulk_insert(model, lote)
+            Contadores.altas(model, instancias)
+            self.bulk_after_create(instancias)
+        escritura_masiva.send(sender=model)
+        return success_response(
+            {"ids": [instancia.pk for instancia in instancias]},
+            count=len(instancias),
+            message=self.bulk_created_message,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+    def bulk_update(self, items: List[Any]):
+        schema_cls = self.schema_map.get("partial_update")
+        if schema_cls is None:
+            raise MethodNotAllowed("PATCH")
+        ids, errores = [], {}
+        for indice, item in enumerate(items):
+            pk = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                errores[indice] = {"id": ["Se requiere el id entero del registro"]}
+            elif pk in ids:
+                errores[indice] = {"id": ["id repetido en la petición"]}
+            ids.append(pk)
+        cuerpos = [{k: v for k, v in item.items() if k != "id"} if isinstance(item, dict) else item for item in items]
+        datos = self.bulk_validate(schema_cls, cuerpos, partial=True, errores=errores)
+
+        model = self.queryset.model
+        existentes = model._default_manager.in_bulk(ids)
+        faltantes = {indice: {"id": ["No existe"]} for indice, pk in enumerate(ids) if pk not in existentes}
+        if faltantes:
+            raise self.bulk_error(faltantes)
+
+        campos: Set[str] = set()
+        cambios: List[Tuple[Any, Any]] = []
+        instancias = []
+        for pk, valores in zip(ids, datos):
+            instancia = existentes[pk]
+            anterior = self.bulk_snapshot(instancia)
+            valores = self.bulk_values(model, valores)
+            for nombre, valor in valores.items():
+                setattr(instancia, nombre, valor)
+            campos.update(valores)
+            cambios.append((anterior, instancia))
+            instancias.append(instancia)
+        self.bulk_check(model, datos, instancias)
+
+        campos.update(marcar_auto_now(model, instancias))
+
+        with self.bulk_atomic(model):
+            for lote in self.bulk_lotes(instancias):
+                model.objects.bulk_update(lote, sorted(campos))
+            Contadores.cambios(model, instancias)
+            self.bulk_after_update(cambios)
+        escritura_masiva.send(sender=model)
+        return success_response(
+            {"ids": ids},
+            count=len(ids),
+            message=self.bulk_updated_message,
+        )
+
+    def bulk_validate(
+        self,
+        schema_cls: Type[BaseModel],
+        items: List[Any],
+        partial: bool,
+        errores: Errores | None = None,
+    ) -> List[Dict[str, Any]]:
+        datos, encontrados = validar_lote(schema_cls, items, exclude_unset=partial)
+        errores = dict(errores or {})
+        for indice, campos in encontrados.items():
+            errores.setdefault(indice, {}).update(campos)
+        if errores:
+            raise self.bulk_error(errores)
+        return datos
+
+    @staticmethod
+    def bulk_values(model, valores: Dict[str, Any]) -> Dict[str, Any]:
+        campos = {field.attname: field for field in model._meta.concrete_fields}
+        return {
+            nombre: campos[nombre].to_python(valor) if nombre in campos else valor
+            for nombre, valor in valores.items()
+        }
+
+    def bulk_check(self, model, datos: List[Dict[str, Any]], instancias: Sequence[Any]) -> None:
+        """FK existentes y campos únicos libres, con una consulta por campo."""
+
+        errores: Errores = {}
+        for field in model._meta.concrete_fields:
+            indices = [indice for indice, valores in enumerate(datos) if field.attname in valores]
+            if not indices:
+                continue
+            if field.is_relation:
+                valores = {getattr(instancias[indice], field.attname) for indice in indices} - {None}
+                existentes = set(
+                    field.related_model._default_manager.filter(pk__in=valores).values_list("pk", flat=True)
+                )
+                for indice in indices:
+                    valor = getattr(instancias[indice], field.attname)
+                    if valor is not None and valor not in existentes:
+                        errores.setdefault(indice, {})[field.attname] = [f"No existe el registro {valor}"]
+            elif field.unique and not field.primary_key:
+                vistos: Dict[Any, int] = {}
+                for indice in indices:
+                    valor = getattr(instancias[indice], field.attname)
+                    if valor in vistos:
+                        errores.setdefault(indice, {})[field.name] = ["Valor repetido en la petición"]
+                    vistos.setdefault(valor, indice)
+                ocupados = dict(
+                    model._default_manager.filter(**{f"{field.name}__in": list(vistos)}).values_list(field.name, "pk")
+                )
+                for indice in indices:
+                    valor = getattr(instancias[indice], field.attname)
+                    if valor in ocupados and ocupados[valor] != instancias[indice].pk:
+                        errores.setdefault(indice, {})[field.name] = ["Ya existe un registro con este valor"]
+        if errores:
+            raise self.bulk_error(errores)
+
+    @staticmethod
+    def bulk_error(errores: Errores) -> ValidationError:
+        return ValidationError({"items": {str(indice): errores[indice] for indice in sorted(errores)}})
+
+    def bulk_lotes(self, instancias: List[Any]):
+        tamano = self.get_bulk_config().get("BATCH_SIZE") or len(instancias)
+        for desde in range(0, len(instancias), tamano):
+            yield instancias[desde : desde + tamano]
+
+    @staticmethod
+    @contextmanager
+    def bulk_atomic(model) -> Iterator[None]:
+        # Violaciones de integridad no anticipadas (restricciones compuestas,
+        # carreras con otra petición) responden el 409 habitual.
+        try:
+            with transaction.atomic(using=model.objects.db):
+                yield
+        except IntegrityError as exc:
+            raise ConstraintError() from exc
+
+    @staticmethod
+    def bulk_insert(model, lote: List[Any]) -> None:
+        """``bulk_create`` de ``lote`` dejando asignado el pk de cada instancia.
+
+        Con RETURNING (SQLite, PostgreSQL, MariaDB) Django ya los completa. En
+        MySQL un INSERT de varias filas solo reserva ids consecutivos con
+        ``innodb_autoinc_lock_mode`` 0 o 1; con el modo 2 (el de MySQL 8) los
+        INSERT concurrentes pueden intercalar sus ids, así que se inserta fila
+        por fila y cada id sale de su propio ``LAST_INSERT_ID()``.
+        """
+
+        if not lote:
+            return
+        connection = connections[model.objects.db]
+        paso = None
+        if not connection.features.can_return_rows_from_bulk_insert:
+            paso = BulkMixin.paso_autoincremento(connection)
+            if paso is None:
+                for instancia in lote:
+                    model.objects.bulk_create([instancia])
+                    BulkMixin.bulk_assign_pks(model, [instancia])
+                return
+        model.objects.bulk_create(lote, batch_size=len(lote))
+        BulkMixin.bulk_assign_pks(model, lote, paso or 1)
+
+    @staticmethod
+    def paso_autoincremento(connection) -> Optional[int]:
+        """Incremento entre ids de un mismo INSERT, o ``None`` si no son predecibles."""
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment")
+            modo, incremento = cursor.fetchone()
+        return int(incremento) if int(modo) in (0, 1) else None
+
+    @staticmethod
+    def bulk_assign_pks(model, lote: List[Any], paso: int = 1) -> None:
+        # LAST_INSERT_ID() es el id de la primera fila del último INSERT; el
+        # resto sigue cada ``paso`` (auto_increment_increment) solo si el
+        # servidor reservó el rango completo (ver bulk_insert).
+        if not lote or lote[0].pk is not None:
+            return
+        with connections[model.objects.db].cursor() as cursor:
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            primero = cursor.fetchone()[0]
+        for desplazamiento, instancia in enumerate(lote):
+            instancia.pk = primero + desplazamiento * paso
+
+    def bulk_prepare(self, instancia) -> None:
+        """Completa una instancia nueva (p. ej. el usuario de la petición)."""
+
+    def bulk_snapshot(self, instancia) -> Any:
+        """Estado previo que ``bulk_after_update`` necesita para cada instancia."""
+
+        return None
+
+    def bulk_after_create(self, instancias: List[Any]) -> None:
+        """Efectos posteriores a las altas, dentro de la misma transacción."""
+
+    def bulk_after_update(self, cambios: List[Tuple[Any, Any]]) -> None:
+        """Efectos posteriores a las modificaciones, con ``(snapshot, instancia)``."""
+
@@ -0,0 +1,67 @@
+"""Contadores de generación por modelo para invalidar cachés."""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, Type
+
+from django.conf import settings
+from django.core.cache import BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models
+
+
+def cache_compartida(cache: BaseCache) -> bool:
+    """Indica si un incremento de generación llega a todos los procesos.
+
+    ``locmem`` (y ``dummy``) viven dentro de cada worker: la escritura que
+    atiende uno no invalida lo cacheado en los demás. Las cachés versionadas
+    no se usan sobre ellos salvo que ``CACHE_PROCESO_UNICO`` declare que hay
+    un solo proceso.
+    """
+
+    if getattr(settings, "CACHE_PROCESO_UNICO", False):
+        return True
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+class ModelGeneration:
+    """Versiona cada modelo con un contador que se incrementa en cada escritura.
+
+    Las claves de caché incluyen la generación de los modelos de los que
+    dependen, así que incrementar el contador invalida todas las entradas sin
+    tener que recorrerlas.
+    """
+
+    prefix = "gen"
+
+    def __init__(self, cache: BaseCache):
+        self.cache = cache
+
+    def key(self, model: Type[models.Model]) -> str:
+        return f"{self.prefix}:{model._meta.label_lower}"
+
+    def get_many(self, model_list: Iterable[Type[models.Model]]) -> Dict[str, int]:
+        keys = {self.key(model): model for model in model_list}
+        stored = self.cache.get_many(list(keys))
+        generations: Dict[str, int] = {}
+        for key, model in keys.items():
+            value = stored.get(key)
+            if value is None:
+                value = self._initialize(key)
+            generations[model._meta.label_lower] = value
+        return generations
+
+    def bump(self, model: Type[models.Model]) -> None:
+        key = self.key(model)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self._initialize(key)
+
+    def _initialize(self, key: str) -> int:
+        # Se siembra con un valor basado en el reloj: si el backend expulsa el
+        # contador, la nueva generación no colisiona con claves antiguas.
+        self.cache.add(key, time.time_ns(), timeout=None)
+        return self.cache.get(key)
@@ -0,0 +1,211 @@
+"""Contadores de relaciones guardados en la fila del padre.
+
+Un modelo hijo declara ``contadores = {"fk": "columna_en_el_padre"}`` y
+hereda ``ContadoresMixin``. Cada alta, baja o cambio de FK ajusta la columna
+del padre con ``UPDATE ... SET columna = columna ± n`` en la misma
+transacción que la escritura:
+
+* ``save()`` se envuelve en ``transaction.atomic`` y compara la FK con la
+  leída de la base (``from_db``) para detectar reasignaciones.
+* Las bajas llegan por ``post_delete`` (ver ``common.signals``), que Django
+  envía dentro de la transacción del borrado, incluidas las bajas en cascada.
+* ``bulk_create``/``bulk_update`` no pasan por ``save()``: quien los usa
+  llama a ``Contadores.altas`` / ``Contadores.cambios`` dentro de su
+  transacción.
+
+``QuerySet.update()`` sobre una FK contada no ajusta nada; ``recontar``
+repara cualquier desvío.
+
+El padre hereda ``ContadoresPadreMixin``: sus ``save()`` fuera del alta no
+escriben las columnas contadoras, así que editar una empresa no pisa con el
+valor leído los incrementos que otra transacción aplicó mientras tanto.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# (modelo padre, columna, pk del padre) -> diferencia a aplicar
+Deltas = Counter
+
+
+class ContadoresMixin(models.Model):
+    contadores: Dict[str, str] = {}
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._contadores_previos = Contadores.valores(instancia)
+        return instancia
+
+    def save(self, *args, **kwargs):
+        alta = self._state.adding
+        campos = kwargs.get("update_fields")
+        with transaction.atomic(using=kwargs.get("using") or self._state.db):
+            super().save(*args, **kwargs)
+            if alta:
+                Contadores.altas(type(self), [self])
+            elif campos is None or Contadores.incluye_fk(type(self), campos):
+                Contadores.cambios(type(self), [self])
+
+
+class ContadoresPadreMixin(models.Model):
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get("force_insert"):
+            columnas = Contadores.columnas(type(self))
+            campos = kwargs.get("update_fields")
+            if campos is None:
+                diferidos = self.get_deferred_fields()
+                campos = [
+                    field.attname
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in diferidos
+                ]
+            kwargs["update_fields"] = [campo for campo in campos if campo not in columnas]
+        super().save(*args, **kwargs)
+
+
+class Contadores:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def columnas(padre: Type[models.Model]) -> frozenset:
+        """Columnas de ``padre`` que mantiene algún hijo con ``contadores``."""
+
+        return frozenset(
+            columna
+            for relacion in padre._meta.related_objects
+            if relacion.one_to_many
+            and (columna := getattr(relacion.related_model, "contadores", {}).get(relacion.field.name))
+        )
+
+    @staticmethod
+    def definiciones(modelo: Type[models.Model]) -> Iterator[Tuple[str, Type[models.Model], str]]:
+        """``(attname de la FK, modelo padre, columna)`` por cada contador."""
+
+        for nombre, columna in getattr(modelo, "contadores", {}).items():
+            field = modelo._meta.get_field(nombre)
+            yield field.attname, field.related_model, columna
+
+    @staticmethod
+    def incluye_fk(modelo, campos: Iterable[str]) -> bool:
+        campos = set(campos)
+        return any(nombre in campos or f"{nombre}_id" in campos for nombre in getattr(modelo, "contadores", {}))
+
+    @staticmethod
+    def valores(instancia) -> Dict[str, Any]:
+        # Solo lo cargado: leer una FK diferida dispararía una consulta por fila.
+        return {
+            attname: instancia.__dict__[attname]
+            for attname, _, _ in Contadores.definiciones(type(instancia))
+            if attname in instancia.__dict__
+        }
+
+    @staticmethod
+    def altas(modelo, instancias: Iterable[Any]) -> None:
+        deltas: Deltas = Counter()
+        for instancia in instancias:
+            Contadores._sumar(deltas, modelo, Contadores.valores(instancia), 1)
+            instancia._contadores_previos = Contadores.valores(instancia)
+        Contadores.aplicar(deltas)
+
+    @staticmethod
+    def bajas(modelo, instancias: Iterable[Any]) -> None:
+        deltas: Deltas = Counter()
+        for instancia in instancias:
+            Contadores._sumar(deltas, modelo, Contadores.valores(instancia), -1)
+        Contadores.aplicar(deltas)
+
+    @staticmethod
+    def cambios(modelo, instancias: Iterable[Any]) -> None:
+        """Ajusta las FK que cambiaron desde que se leyó cada instancia."""
+
+        instancias = list(instancias)
+        sin_previo = [
+            instancia.pk
+            for instancia in instancias
+            if set(Contadores.valores(instancia)) - set(getattr(instancia, "_contadores_previos", {}))
+        ]
+        guardados: Dict[Any, Dict[str, Any]] = {}
+        if sin_previo:
+            # Instancias armadas a mano o con la FK diferida: el valor previo sale de la base.
+            attnames = [attname for attname, _, _ in Contadores.definiciones(modelo)]
+            guardados = {
+                fila["pk"]: fila for fila in modelo._default_manager.filter(pk__in=sin_previo).values("pk", *attnames)
+            }
+        deltas: Deltas = Counter()
+        for instancia in instancias:
+            previos = dict(getattr(instancia, "_contadores_previos", {}))
+            actuales = Contadores.valores(instancia)
+            for attname in set(actuales) - set(previos):
+                previos[attname] = guardados.get(instancia.pk, {}).get(attname, actuales[attname])
+            if previos != actuales:
+                Contadores._sumar(deltas, modelo, previos, -1)
+                Contadores._sumar(deltas, modelo, actuales, 1)
+            instancia._contadores_previos = actuales
+        Contadores.aplicar(deltas)
+
+    @staticmethod
+    def aplicar(deltas: Deltas) -> None:
+        # Un UPDATE por columna y diferencia: un alta en lote de N filas sobre
+        # la misma empresa es una sola sentencia con +N.
+        grupos: Dict[Tuple[Any, str, int], List[Any]] = defaultdict(list)
+        for (padre, columna, pk), delta in deltas.items():
+            if delta:
+                grupos[(padre, columna, delta)].append(pk)
+        ahora = timezone.now()
+        for (padre, columna, delta), pks in grupos.items():
+            # fecha_actualizacion cambia con el contador para que el ETag de
+            # listados y detalle del padre lo refleje.
+            padre._default_manager.filter(pk__in=pks).update(
+                **{columna: F(columna) + delta, "fecha_actualizacion": ahora}
+            )
+
+    @staticmethod
+    def _sumar(deltas: Deltas, modelo, valores: Dict[str, Any], signo: int) -> None:
+        for attname, padre, columna in Contadores.definiciones(modelo):
+            if valores.get(attname) is not None:
+                deltas[(padre, columna, valores[attname])] += signo
+
+    @staticmethod
+    def recontar(modelos: Iterable[Type[models.Model]], corregir: bool = True) -> Dict[str, int]:
+        """Compara cada contador con un ``COUNT`` real; devuelve filas desviadas por contador."""
+
+        resultado = {}
+        for modelo in modelos:
+            for nombre, columna in getattr(modelo, "contadores", {}).items():
+                padre = modelo._meta.get_field(nombre).related_model
+                real = Coalesce(
+                    Subquery(
+                        modelo._default_manager.filter(**{nombre: OuterRef("pk")})
+                        .order_by()
+                        .values(nombre)
+                        .annotate(total=Count("pk"))
+                        .values("total")
+                    ),
+                    Value(0),
+                )
+                desviados = list(
+                    padre._default_manager.annotate(real=real)
+                    .exclude(**{columna: F("real")})
+                    .values_list("pk", flat=True)
+                    .iterator()
+                )
+                if corregir and desviados:
+                    # El conteo se recalcula en el mismo UPDATE: una escritura
+                    # concurrente entre la lectura y la corrección no se pierde.
+                    padre._default_manager.filter(pk__in=desviados).update(**{columna: real})
+                resultado[f"{padre._meta.label}.{columna} ({modelo._meta.label}.{nombre})"] = len(desviados)
+        return resultado
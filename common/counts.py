@@ -0,0 +1,125 @@
+"""Conteos cacheados y estimados para la paginación de listados."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, models
+from django.db.models import Count
+
+from .cache import ModelGeneration, cache_compartida
+
+
+class ConteoCache:
+    """Resuelve ``COUNT(*)`` de un queryset filtrado con caché por generación.
+
+    La clave combina el SQL del filtro (sin orden ni límites) con la generación
+    de cada tabla involucrada, así que cualquier escritura en ellas la invalida.
+    Sin un backend compartido entre procesos (ver ``cache_compartida``) no se
+    cachea. Sin filtros y sobre MySQL, las tablas grandes usan la estimación de
+    ``information_schema`` en lugar de recorrer el índice completo.
+    """
+
+    @staticmethod
+    def activa() -> bool:
+        return bool(ConteoCache.config().get("TTL", 300)) and cache_compartida(ConteoCache.backend())
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        return getattr(settings, "LISTADOS_CONTEO", {})
+
+    @staticmethod
+    def backend():
+        return caches[ConteoCache.config().get("ALIAS", "default")]
+
+    @staticmethod
+    def generaciones() -> ModelGeneration:
+        return ModelGeneration(ConteoCache.backend())
+
+    @staticmethod
+    def contar(queryset: models.QuerySet) -> Tuple[int, bool]:
+        """Devuelve ``(total, exacto)``."""
+
+        query = queryset.order_by().query
+        if query.is_empty():
+            # .none(): no hay SQL que cachear.
+            return 0, True
+        umbral = ConteoCache.config().get("UMBRAL_ESTIMADO", 0)
+        if umbral and not query.where and not query.distinct:
+            estimado = ConteoCache.estimar(queryset.model, queryset.db)
+            if estimado is not None and estimado >= umbral:
+                return estimado, False
+
+        if not ConteoCache.activa():
+            return queryset.count(), True
+
+        backend = ConteoCache.backend()
+        clave = ConteoCache.clave(queryset)
+        total = backend.get(clave)
+        if total is None:
+            total = queryset.count()
+            backend.set(clave, total, timeout=ConteoCache.config().get("TTL", 300))
+        return total, True
+
+    @staticmethod
+    def resumir(queryset: models.QuerySet, agregados: Dict[str, Any]) -> Dict[str, Any]:
+        """``COUNT(*)`` y ``agregados`` en una sola consulta, con la caché de ``contar``.
+
+        Devuelve los agregados más ``total``. Las expresiones forman parte de
+        la clave: dos agregados distintos sobre el mismo filtro no se pisan.
+        """
+
+        if queryset.order_by().query.is_empty():
+            return {"total": 0, **{nombre: None for nombre in agregados}}
+
+        def calcular() -> Dict[str, Any]:
+            return queryset.order_by().aggregate(total=Count("pk"), **agregados)
+
+        if not ConteoCache.activa():
+            return calcular()
+        backend = ConteoCache.backend()
+        clave = ConteoCache.clave(queryset, extra=sorted((nombre, repr(expr)) for nombre, expr in agregados.items()))
+        resumen = backend.get(clave)
+        if resumen is None:
+            resumen = calcular()
+            backend.set(clave, resumen, timeout=ConteoCache.config().get("TTL", 300))
+        return resumen
+
+    @staticmethod
+    def clave(queryset: models.QuerySet, extra: Any = None) -> str:
+        sql, params = queryset.order_by().query.sql_with_params()
+        generaciones = ConteoCache.generaciones().get_many(ConteoCache.modelos(queryset))
+        contenido = repr((sql, params, sorted(generaciones.items()), extra))
+        firma = hashlib.sha256(contenido.encode()).hexdigest()
+        prefijo = "resumen" if extra is not None else "conteo"
+        return f"{prefijo}:{queryset.model._meta.label_lower}:{firma}"
+
+    @staticmethod
+    def modelos(queryset: models.QuerySet) -> List[Type[models.Model]]:
+        # Filtros y anotaciones pueden unir otras tablas: sus escrituras también
+        # cambian el resultado.
+        tablas = {join.table_name for join in queryset.query.alias_map.values()}
+        tablas.add(queryset.model._meta.db_table)
+        return [modelo for modelo in apps.get_models() if modelo._meta.db_table in tablas]
+
+    @staticmethod
+    def estimar(modelo: Type[models.Model], alias: str) -> Optional[int]:
+        connection = connections[alias]
+        if connection.vendor != "mysql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [modelo._meta.db_table],
+            )
+            fila = cursor.fetchone()
+        return int(fila[0]) if fila and fila[0] is not None else None
+
+    @staticmethod
+    def invalidar(modelo: Type[models.Model]) -> None:
+        ConteoCache.generaciones().bump(modelo)
@@ -2,22 +2,83 @@
 
 from __future__ import annotations
 
-import csv
-from io import StringIO
-from typing import Iterable, List, Sequence
+import time
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
+from .streaming import iter_csv
 
-def render_csv(filename: str, headers: Sequence[str], rows: Iterable[Sequence]):
-    buffer = StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(headers)
-    for row in rows:
-        writer.writerow(row)
+# Tamaño aproximado de cada bloque enviado al cliente; agrupar filas evita un
+# write al socket por línea.
+BLOQUE_BYTES = 64 * 1024
 
-    response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
+
+def iter_bloques(lineas: Iterable[str], encoding: str = "utf-8") -> Iterator[bytes]:
+    pendientes = []
+    tamano = 0
+    for linea in lineas:
+        codificada = linea.encode(encoding)
+        pendientes.append(codificada)
+        tamano += len(codificada)
+        if tamano >= BLOQUE_BYTES:
+            yield b"".join(pendientes)
+            pendientes, tamano = [], 0
+    if pendientes:
+        yield b"".join(pendientes)
+
+
+def iter_gzip(bloques: Iterable[bytes]) -> Iterator[bytes]:
+    compresor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+class ExportacionInterrumpida(Exception):
+    """Se alcanzó un límite con la respuesta ya iniciada.
+
+    El estado ``200`` ya se envió, así que el error no puede ir en la
+    respuesta: se corta el stream sin cerrarlo (ni el gzip) y el cliente
+    recibe una transferencia incompleta en lugar de un archivo que parece
+    completo.
+    """
 
 
+def limitar(
+    rows: Iterable[Sequence], max_segundos: Optional[float], max_filas: Optional[int] = None
+) -> Iterator[Sequence]:
+    """Interrumpe la exportación al superar ``max_segundos`` o ``max_filas``."""
+
+    inicio = time.monotonic()
+    for numero, row in enumerate(rows, start=1):
+        if max_filas and numero > max_filas:
+            raise ExportacionInterrumpida(f"La exportación superó el máximo de {max_filas} filas")
+        if max_segundos and time.monotonic() - inicio > max_segundos:
+            raise ExportacionInterrumpida(f"La exportación superó el límite de {max_segundos:g} segundos")
+        yield row
+
+
+def render_csv(
+    filename: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence],
+    compresion: Optional[str] = None,
+    max_segundos: Optional[float] = None,
+    max_filas: Optional[int] = None,
+) -> StreamingHttpResponse:
+    """Escribe el CSV en streaming: cada bloque se envía en cuanto se produce."""
+
+    content = iter_bloques(iter_csv(headers, limitar(rows, max_segundos, max_filas)))
+    content_type = "text/csv"
+    if compresion == "gzip":
+        content = iter_gzip(content)
+        content_type = "application/gzip"
+        filename = f"{filename}.gz"
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
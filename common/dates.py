@@ -0,0 +1,72 @@
+"""Rangos de fechas compatibles con índices."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+
+from django import forms
+from django.db.models import Q
+from django.utils import timezone
+import django_filters
+
+
+def rango_local(
+    fecha_inicio: Optional[date], fecha_fin: Optional[date]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Convierte límites de fecha inclusivos en un rango semiabierto [inicio, fin).
+
+    Los límites son datetimes con zona horaria (``TIME_ZONE``), así la columna se
+    compara directamente y MySQL puede usar un range scan sobre su índice en vez
+    de envolverla en ``DATE()``/``CONVERT_TZ``.
+    """
+
+    tz = timezone.get_default_timezone()
+    inicio = timezone.make_aware(datetime.combine(fecha_inicio, time.min), tz) if fecha_inicio else None
+    fin = (
+        timezone.make_aware(datetime.combine(fecha_fin + timedelta(days=1), time.min), tz)
+        if fecha_fin
+        else None
+    )
+    return inicio, fin
+
+
+def filtro_rango(campo: str, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> Q:
+    inicio, fin = rango_local(fecha_inicio, fecha_fin)
+    condiciones = Q()
+    if inicio is not None:
+        condiciones &= Q(**{f"{campo}__gte": inicio})
+    if fin is not None:
+        condiciones &= Q(**{f"{campo}__lt": fin})
+    return condiciones
+
+
+class FechaOFechaHoraField(forms.DateTimeField):
+    """Acepta ``YYYY-MM-DD`` como día completo o un datetime como instante exacto."""
+
+    def to_python(self, value):
+        if isinstance(value, str) and len(value.strip()) == 10:
+            try:
+                return date.fromisoformat(value.strip())
+            except ValueError:
+                pass
+        return super().to_python(value)
+
+
+class FechaLocalFilter(django_filters.Filter):
+    """Filtro de rango sobre DateTimeField que no envuelve la columna en funciones.
+
+    Con una fecha, ``gte`` parte del inicio del día local y ``lte`` se traduce a
+    ``lt`` del día siguiente; con un datetime se compara tal cual.
+    """
+
+    field_class = FechaOFechaHoraField
+
+    def filter(self, qs, value):
+        if value in (None, ""):
+            return qs
+        if isinstance(value, datetime):
+            return super().filter(qs, value)
+        if self.lookup_expr == "gte":
+            return qs.filter(filtro_rango(self.field_name, value, None))
+        return qs.filter(filtro_rango(self.field_name, None, value))
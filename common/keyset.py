@@ -0,0 +1,61 @@
+"""Utilidades de paginación por keyset (cursor sobre columnas ordenadas)."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, List, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Conserva los microsegundos, que DjangoJSONEncoder recorta a milisegundos.
+
+    Un cursor con el instante truncado repetiría o saltaría filas en el límite.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), cls=CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValidationError({"cursor": ["Cursor inválido"]}) from exc
+    if not isinstance(values, list):
+        raise ValidationError({"cursor": ["Cursor inválido"]})
+    return values
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """Construye la condición "posterior a ``values``" para un ORDER BY dado.
+
+    ``ordering`` usa la notación de Django (``-campo`` descendente) y debe
+    terminar en una columna única (normalmente ``id``) para que el orden sea total.
+    """
+
+    if len(ordering) != len(values):
+        raise ValidationError({"cursor": ["Cursor inválido"]})
+
+    condicion = Q()
+    igualdad = Q()
+    for campo, valor in zip(ordering, values):
+        nombre = campo.lstrip("-")
+        lookup = "lt" if campo.startswith("-") else "gt"
+        condicion |= igualdad & Q(**{f"{nombre}__{lookup}": valor})
+        igualdad &= Q(**{nombre: valor})
+    return condicion
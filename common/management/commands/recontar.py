@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.actividades.models import Actividad
+from apps.clientes.models import Cliente
+from apps.oportunidades.models import Oportunidad
+from common.contadores import Contadores
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los contadores guardados (num_clientes, num_oportunidades, num_actividades) "
+        "contra un COUNT real y corrige las filas desviadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--solo-verificar",
+            action="store_true",
+            help="Informa los desvíos sin corregirlos.",
+        )
+
+    def handle(self, *args, **options):
+        corregir = not options["solo_verificar"]
+        resultado = Contadores.recontar([Cliente, Oportunidad, Actividad], corregir=corregir)
+        for contador, desviados in resultado.items():
+            self.stdout.write(f"{contador}: {desviados} filas desviadas")
+
+        total = sum(resultado.values())
+        if not total:
+            self.stdout.write(self.style.SUCCESS("Contadores al día"))
+        elif corregir:
+            self.stdout.write(self.style.SUCCESS(f"{total} contadores corregidos"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{total} contadores desviados; ejecute sin --solo-verificar"))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from common.projection import fila_objeto
+from common.viewsets import BaseModelViewSet
+
+
+def _subclases(clase):
+    for subclase in clase.__subclasses__():
+        yield subclase
+        yield from _subclases(subclase)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara, sobre filas reales, la salida de las proyecciones compiladas (listados y "
+        "exportaciones CSV desde .values()) contra la del serializer y csv_row_builder sobre "
+        "instancias. Termina con error ante cualquier diferencia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limite", type=int, default=500, help="Filas comparadas por recurso.")
+
+    def handle(self, *args, **options):
+        # Importar las URLs registra todos los viewsets.
+        import_module(settings.ROOT_URLCONF)
+        diferencias = []
+        for viewset in sorted(set(_subclases(BaseModelViewSet)), key=lambda clase: clase.__name__):
+            if not viewset.use_projection:
+                continue
+            diferencias.extend(self._listado(viewset, options["limite"]))
+            if getattr(viewset, "csv_values", None):
+                diferencias.extend(self._csv(viewset, options["limite"]))
+
+        if diferencias:
+            for diferencia in diferencias:
+                self.stderr.write(diferencia)
+            raise CommandError(f"{len(diferencias)} diferencias entre proyecciones y serializers")
+        self.stdout.write(self.style.SUCCESS("Proyecciones equivalentes a los serializers"))
+
+    def _vista(self, viewset, accion):
+        vista = viewset(action_map={"get": accion}, args=(), kwargs={}, format_kwarg=None)
+        vista.request = vista.initialize_request(APIRequestFactory().get("/"))
+        return vista
+
+    def _listado(self, viewset, limite):
+        vista = self._vista(viewset, "list")
+        proyeccion = vista.get_projection()
+        if proyeccion is None:
+            return [f"{viewset.__name__}: el serializer no es compilable; se usa el camino lento"]
+
+        queryset = vista.get_queryset().order_by("pk")
+        esperado = vista.get_serializer(list(queryset[:limite]), many=True).data
+        obtenido = proyeccion.construir_todos(proyeccion.values(queryset)[:limite])
+        return self._comparar(viewset.__name__, "list", esperado, obtenido, JSONRenderer().render)
+
+    def _csv(self, viewset, limite):
+        vista = self._vista(viewset, "export")
+        queryset = vista.get_queryset().order_by("pk")
+        esperado = [vista.csv_row_builder(item) for item in queryset[:limite]]
+        obtenido = [
+            vista.csv_row_builder(fila_objeto(fila))
+            for fila in queryset.prefetch_related(None).values(*vista.csv_values)[:limite]
+        ]
+        return self._comparar(viewset.__name__, "export", esperado, obtenido, repr)
+
+    @staticmethod
+    def _comparar(nombre, accion, esperado, obtenido, representar):
+        if len(esperado) != len(obtenido):
+            return [f"{nombre}.{accion}: {len(esperado)} filas esperadas, {len(obtenido)} obtenidas"]
+        for indice, (fila_esperada, fila_obtenida) in enumerate(zip(esperado, obtenido)):
+            if representar(fila_esperada) != representar(fila_obtenida):
+                return [
+                    f"{nombre}.{accion} fila {indice}:\n"
+                    f"  serializer: {representar(fila_esperada)}\n"
+                    f"  proyección: {representar(fila_obtenida)}"
+                ]
+        return []
@@ -2,27 +2,59 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+from typing import Any, Dict, Sequence
 
+from django.conf import settings
 from rest_framework.decorators import action
-from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 
+from .counts import ConteoCache
 from .csv import render_csv
+from .projection import fila_objeto
 
 
 class CSVExportMixin:
     csv_headers: Sequence[str] = ()
     csv_row_builder = None
+    # Rutas de .values() que necesita csv_row_builder; si se declaran, la
+    # exportación lee filas planas en lugar de instanciar modelos.
+    csv_values: Sequence[str] = ()
+
+    def get_csv_config(self) -> Dict[str, Any]:
+        return getattr(settings, "CSV_EXPORT", {})
 
     @action(detail=False, methods=["get"], url_path="export")
     def export(self, request, *args, **kwargs):
+        config = self.get_csv_config()
+        compresion = request.query_params.get("compresion")
+        if compresion not in (None, "", "gzip"):
+            raise ValidationError({"compresion": ["Valor no soportado; use gzip"]})
+
         queryset = self.filter_queryset(self.get_queryset())
-        rows = (
-            self.csv_row_builder(item) if self.csv_row_builder else ()
-            for item in queryset
-        )
+        # El conteo sale de la caché de listados (o de la estimación en tablas
+        # grandes sin filtros); si se queda corto, render_csv interrumpe el
+        # stream al pasar de max_filas.
+        max_filas = config.get("MAX_FILAS")
+        if max_filas and ConteoCache.contar(queryset)[0] > max_filas:
+            raise ValidationError(
+                {"export": [f"La exportación supera el máximo de {max_filas} filas; aplique filtros"]}
+            )
+
+        # iterator() lee por bloques del cursor del servidor en lugar de
+        # materializar el queryset completo en memoria.
+        chunk_size = config.get("CHUNK_SIZE", 2000)
+        if self.csv_values:
+            filas = queryset.prefetch_related(None).values(*self.csv_values).iterator(chunk_size=chunk_size)
+            items = (fila_objeto(fila) for fila in filas)
+        else:
+            items = queryset.iterator(chunk_size=chunk_size)
+        rows = (self.csv_row_builder(item) if self.csv_row_builder else () for item in items)
         base_name = getattr(self, "basename", self.__class__.__name__.lower())
-        filename = f"{base_name}.csv"
-        return render_csv(filename, self.csv_headers, rows)
-
-
+        return render_csv(
+            f"{base_name}.csv",
+            self.csv_headers,
+            rows,
+            compresion=compresion or None,
+            max_segundos=config.get("MAX_SEGUNDOS"),
+            max_filas=max_filas,
+        )
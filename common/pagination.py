@@ -2,14 +2,97 @@
 
 from __future__ import annotations
 
-from rest_framework.pagination import PageNumberPagination
+from typing import Any, List, Optional, Tuple
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import ConteoCache
+from .keyset import decode_cursor, encode_cursor, keyset_filter
+
+
+class PaginaEstimada(Page):
+    """Página de un listado con total estimado: ``has_next`` sale de las filas leídas."""
+
+    def __init__(self, object_list, number, paginator, hay_mas: bool):
+        super().__init__(object_list, number, paginator)
+        self.hay_mas = hay_mas
+
+    def has_next(self) -> bool:
+        return self.hay_mas
+
+
+class ConteoPaginator(Paginator):
+    """Paginator cuyo total sale de ``ConteoCache`` (cacheado o estimado).
+
+    Un total estimado solo se informa: no decide qué páginas existen. La
+    estimación de MySQL puede quedarse corta, y validar contra ella daría
+    ``404`` en las últimas páginas reales; en su lugar se lee una fila de más
+    para saber si hay página siguiente.
+    """
+
+    def __init__(self, *args, conteo: Optional[Tuple[int, bool]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conteo = conteo
+
+    @cached_property
+    def total(self) -> Tuple[int, bool]:
+        """``(total, exacto)``."""
+
+        if self.conteo is not None:
+            return self.conteo
+        if not isinstance(self.object_list, QuerySet):
+            return super().count, True
+        return ConteoCache.contar(self.object_list)
+
+    @property
+    def count(self) -> int:
+        return self.total[0]
+
+    @property
+    def count_exacto(self) -> bool:
+        return self.total[1]
+
+    def validate_number(self, number):
+        if self.count_exacto:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        if self.count_exacto:
+            return super().page(number)
+        number = self.validate_number(number)
+        inicio = (number - 1) * self.per_page
+        items = list(self.object_list[inicio : inicio + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return PaginaEstimada(items[: self.per_page], number, self, hay_mas=len(items) > self.per_page)
 
 
 class StandardPagination(PageNumberPagination):
     # Patrón Strategy para aislar reglas de paginación.
     page_size = 20
     max_page_size = 100
+    # (total, exacto) que la vista ya resolvió (p. ej. en el mismo agregado
+    # que los totales de oportunidades): el paginator no vuelve a contar.
+    conteo: Optional[Tuple[int, bool]] = None
+
+    def django_paginator_class(self, object_list, per_page, *args, **kwargs) -> ConteoPaginator:
+        return ConteoPaginator(object_list, per_page, *args, conteo=self.conteo, **kwargs)
 
     def get_paginated_response(self, data):
         return Response(
@@ -17,6 +100,7 @@ class StandardPagination(PageNumberPagination):
                 "success": True,
                 "data": data,
                 "count": self.page.paginator.count,
+                "count_exacto": self.page.paginator.count_exacto,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "message": "Listado obtenido exitosamente",
@@ -24,4 +108,112 @@ class StandardPagination(PageNumberPagination):
         )
 
 
+class KeysetPagination(BasePagination):
+    """Paginación por cursor sobre el orden vigente del queryset.
+
+    Usa el ``ordering`` pedido (``OrderingFilter``) o el de ``Meta`` y agrega
+    ``pk`` como desempate, de modo que cada página es un ``WHERE`` sobre el
+    índice en lugar de ``COUNT(*)`` + ``OFFSET``. El cursor guarda el orden
+    con el que se generó: si cambia el ``ordering`` el cursor deja de ser válido.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[List[Any]]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.base_url = request.build_absolute_uri()
+
+        hacia_atras = False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            hacia_atras, valores = self.decode(cursor)
+            orden = self.invertir(self.ordering) if hacia_atras else self.ordering
+            queryset = queryset.filter(keyset_filter(orden, valores))
+        else:
+            orden = self.ordering
+
+        items = list(queryset.order_by(*orden)[: self.page_size + 1])
+        hay_mas = len(items) > self.page_size
+        items = items[: self.page_size]
+        if hacia_atras:
+            items.reverse()
+
+        # Avanzando hay página previa si se llegó por cursor; retrocediendo
+        # siempre existe la siguiente (la página desde la que se vino).
+        self.has_next = hay_mas if not hacia_atras else True
+        self.has_previous = hay_mas if hacia_atras else bool(cursor)
+        self.items = items
+        return items
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "success": True,
+                "data": data,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "message": "Listado obtenido exitosamente",
+            }
+        )
+
+    def get_page_size(self, request) -> int:
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            tamano = int(valor)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: ["Debe ser un entero"]})
+        return max(1, min(tamano, self.max_page_size))
+
+    def get_ordering(self, queryset: QuerySet) -> List[str]:
+        orden = [
+            campo
+            for campo in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(campo, str) and campo != "?"
+        ]
+        if not any(campo.lstrip("-") in ("pk", "id") for campo in orden):
+            desempate = "-pk" if orden and orden[0].startswith("-") else "pk"
+            orden.append(desempate)
+        return orden
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.items:
+            return None
+        return self.link(self.items[-1], hacia_atras=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.items:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.link(self.items[0], hacia_atras=True)
+
+    def link(self, item, hacia_atras: bool) -> str:
+        valores = [self.valor(item, campo.lstrip("-")) for campo in self.ordering]
+        cursor = encode_cursor([self.ordering, "p" if hacia_atras else "n", valores])
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode(self, cursor: str):
+        contenido = decode_cursor(cursor)
+        if len(contenido) != 3 or contenido[0] != self.ordering or contenido[1] not in ("n", "p"):
+            raise ValidationError({self.cursor_query_param: ["Cursor inválido"]})
+        return contenido[1] == "p", contenido[2]
+
+    @staticmethod
+    def invertir(orden: List[str]) -> List[str]:
+        return [campo[1:] if campo.startswith("-") else f"-{campo}" for campo in orden]
 
+    @staticmethod
+    def valor(item, campo: str) -> Any:
+        if isinstance(item, dict):
+            # Filas de .values() (proyecciones compiladas).
+            return item[campo]
+        for parte in campo.split("__"):
+            item = getattr(item, parte)
+        return item
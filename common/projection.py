@@ -0,0 +1,118 @@
+"""Proyecciones compiladas: respuestas de listado desde ``.values()``.
+
+Un ``ModelSerializer`` recorre sus campos y resuelve atributos por cada fila.
+``Proyeccion`` hace ese recorrido una sola vez: traduce cada campo a columnas
+de ``.values()`` y a un conversor, y luego arma los dicts directamente desde
+las filas. La salida debe coincidir byte a byte con la del serializer; se
+verifica con ``python manage.py verificar_proyecciones``.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+# Campos cuya representación es el valor tal como lo entrega la base.
+IDENTIDAD = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+Calculado = Tuple[Sequence[str], Callable[..., Any]]
+Constructor = Callable[[Mapping[str, Any]], Any]
+
+
+class NoCompilable(Exception):
+    """El serializer usa campos que la proyección no sabe reproducir."""
+
+
+class Proyeccion:
+    def __init__(
+        self,
+        serializer_class,
+        campos: Optional[Iterable[str]] = None,
+        calculados: Optional[Dict[str, Calculado]] = None,
+    ):
+        self.calculados = calculados or {}
+        self.columnas: List[str] = []
+        self.plan = self._compilar(serializer_class(), "", set(campos) if campos is not None else None)
+
+    def values(self, queryset: QuerySet, extra: Sequence[str] = ()) -> QuerySet:
+        columnas = list(dict.fromkeys([*self.columnas, *extra]))
+        return queryset.prefetch_related(None).values(*columnas)
+
+    def construir(self, fila: Mapping[str, Any]) -> Dict[str, Any]:
+        return {nombre: constructor(fila) for nombre, constructor in self.plan}
+
+    def construir_todos(self, filas: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        construir = self.construir
+        return [construir(fila) for fila in filas]
+
+    def _compilar(self, serializer, prefijo: str, campos: Optional[set]) -> List[Tuple[str, Constructor]]:
+        plan = []
+        for nombre, campo in serializer.fields.items():
+            if campo.write_only or (campos is not None and nombre not in campos):
+                continue
+            plan.append((nombre, self._campo(nombre, campo, prefijo)))
+        return plan
+
+    def _campo(self, nombre: str, campo, prefijo: str) -> Constructor:
+        if not prefijo and nombre in self.calculados:
+            dependencias, funcion = self.calculados[nombre]
+            self.columnas.extend(dependencias)
+            return lambda fila: funcion(*(fila[columna] for columna in dependencias))
+
+        if isinstance(campo, serializers.ListSerializer) or campo.source == "*":
+            raise NoCompilable(nombre)
+        if isinstance(campo, serializers.SerializerMethodField):
+            raise NoCompilable(nombre)
+
+        ruta = prefijo + campo.source.replace(".", "__")
+        if isinstance(campo, serializers.ModelSerializer):
+            clave = f"{ruta}__{campo.Meta.model._meta.pk.name}"
+            self.columnas.append(clave)
+            plan = self._compilar(campo, f"{ruta}__", None)
+
+            def anidado(fila):
+                # FK nula: el serializer anidado representa None.
+                if fila[clave] is None:
+                    return None
+                return {hijo: constructor(fila) for hijo, constructor in plan}
+
+            return anidado
+        if isinstance(campo, serializers.BaseSerializer):
+            raise NoCompilable(nombre)
+
+        self.columnas.append(ruta)
+        if isinstance(campo, IDENTIDAD):
+            return lambda fila: fila[ruta]
+        convertir = campo.to_representation
+        return lambda fila: None if fila[ruta] is None else convertir(fila[ruta])
+
+
+def fila_objeto(fila: Mapping[str, Any]) -> SimpleNamespace:
+    """Convierte una fila de ``.values()`` en un objeto con atributos anidados.
+
+    ``{"cliente__nombre": "x"}`` se lee como ``fila.cliente.nombre``; si todas
+    las columnas de una relación son nulas (FK nula) la relación vale ``None``.
+    Permite reutilizar los ``csv_row_builder`` escritos para instancias.
+    """
+
+    directos: Dict[str, Any] = {}
+    relaciones: Dict[str, Dict[str, Any]] = {}
+    for clave, valor in fila.items():
+        relacion, separador, resto = clave.partition("__")
+        if separador:
+            relaciones.setdefault(relacion, {})[resto] = valor
+        else:
+            directos[clave] = valor
+    for relacion, valores in relaciones.items():
+        anidada = fila_objeto(valores)
+        directos[relacion] = None if all(valor is None for valor in valores.values()) else anidada
+    return SimpleNamespace(**directos)
@@ -0,0 +1,64 @@
+"""Renderer y parser JSON respaldados por orjson.
+
+Producen los mismos bytes que ``JSONRenderer``/``JSONParser`` de DRF para el
+sobre de la API (UTF-8 compacto, datetimes UTC con ``Z``, ``Decimal`` como
+número vía el encoder de DRF). Si orjson no está instalado, o la petición
+pide algo que orjson no reproduce (``indent``, ``ensure_ascii``), se delega en
+la implementación de DRF. Diferencias conocidas: orjson escribe ``NaN`` e
+``Infinity`` como ``null`` en lugar de fallar, y lee como ``float`` los
+enteros que no caben en 64 bits.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_OPCIONES = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compatible(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            contenido = orjson.dumps(data, default=self.encoder_class().default, option=_OPCIONES)
+        except orjson.JSONEncodeError:
+            # Tipos que orjson no admite (p. ej. enteros de más de 64 bits):
+            # el encoder de DRF los resuelve o levanta el mismo error de siempre.
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF escapa los separadores de línea U+2028/U+2029 por compatibilidad con JavaScript.
+        return contenido.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+    def compatible(self, accepted_media_type, renderer_context) -> bool:
+        return (
+            self.get_indent(accepted_media_type, renderer_context) is None
+            and not self.ensure_ascii
+            and self.compact
+        )
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        contenido = stream.read()
+        try:
+            return orjson.loads(contenido)
+        except orjson.JSONDecodeError:
+            # Se reintenta con el parser de DRF para conservar su mensaje de error.
+            return super().parse(io.BytesIO(contenido), media_type, parser_context)
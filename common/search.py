@@ -0,0 +1,227 @@
+"""Búsqueda de texto indexada con ranking y coincidencia por prefijo.
+
+Cada modelo buscable declara un ``FullTextIndex`` en ``Meta.indexes``; sus
+columnas son las que participan en ``?search=``. Hay dos backends con la
+misma semántica:
+
+* ``fulltext`` (MySQL): ``MATCH ... AGAINST`` en modo booleano sobre el
+  índice FULLTEXT.
+* ``ngram``: índice de trigramas en memoria del proceso, para SQLite (tests,
+  desarrollo). Se reconstruye cuando cambia la cantidad de filas o la última
+  ``fecha_actualizacion`` del modelo, así que no conviene con tablas grandes.
+
+``auto`` elige ``fulltext`` en MySQL y ``ngram`` en SQLite. En otras bases
+(p. ej. PostgreSQL) no hay índice: cada término se busca con ``icontains``
+sin ranking, salvo que ``BUSQUEDA["BACKEND"]`` pida uno explícitamente.
+
+En ambos, cada término de la consulta debe ser prefijo de alguna palabra del
+registro (``"jua per"`` encuentra a "Juan Pérez") y los resultados se ordenan
+por relevancia (``relevancia`` anotada, descendente). Los términos que el
+índice de MySQL no guarda (menos de ``LONGITUD_MINIMA`` caracteres o palabras
+vacías) se resuelven con ``icontains`` en ambos backends.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Case, Count, FloatField, Max, Q, Value, When
+
+LONGITUD_MINIMA = 3
+
+# Lista de palabras vacías por defecto de InnoDB (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD).
+PALABRAS_VACIAS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or that the this to "
+    "was what when where who will with und www".split()
+)
+
+PALABRA = re.compile(r"\w+")
+
+
+class FullTextIndex(models.Index):
+    """Índice FULLTEXT en MySQL; índice común en el resto de las bases."""
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        statement = super().create_sql(model, schema_editor, using=using, **kwargs)
+        if schema_editor.connection.vendor == "mysql":
+            statement.template = statement.template.replace("CREATE INDEX", "CREATE FULLTEXT INDEX", 1)
+        return statement
+
+
+class MatchAgainst(models.Func):
+    output_field = FloatField()
+
+    def __init__(self, *campos, consulta: str):
+        super().__init__(*campos)
+        self.consulta = consulta
+
+    def as_sql(self, compiler, connection, **extra_context):
+        columnas, params = [], []
+        for expresion in self.get_source_expressions():
+            sql, parametros = compiler.compile(expresion)
+            columnas.append(sql)
+            params.extend(parametros)
+        return f"MATCH ({', '.join(columnas)}) AGAINST (%s IN BOOLEAN MODE)", (*params, self.consulta)
+
+
+def normalizar(texto: str) -> str:
+    # Equivalente a la collation utf8mb4_unicode_ci: sin mayúsculas ni tildes.
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+
+def palabras(texto: Optional[str]) -> List[str]:
+    return PALABRA.findall(normalizar(texto or ""))
+
+
+def indexable(termino: str) -> bool:
+    return len(termino) >= LONGITUD_MINIMA and termino not in PALABRAS_VACIAS
+
+
+class BackendBusqueda:
+    nombre = ""
+
+    def filtrar(self, queryset: models.QuerySet, campos: Sequence[str], terminos: List[str]) -> models.QuerySet:
+        """Filtra por ``terminos`` (ya indexables) y anota ``relevancia``."""
+
+        raise NotImplementedError
+
+
+class FullTextMySQL(BackendBusqueda):
+    nombre = "fulltext"
+
+    def filtrar(self, queryset, campos, terminos):
+        consulta = " ".join(f"+{termino}*" for termino in terminos)
+        return queryset.annotate(relevancia=MatchAgainst(*campos, consulta=consulta)).filter(relevancia__gt=0)
+
+
+class IndiceNGramas:
+    """Trigramas de inicio de palabra -> ids, con las palabras de cada registro."""
+
+    def __init__(self, filas: Iterable[Tuple[int, Sequence[Optional[str]]]]):
+        self.palabras: Dict[int, List[str]] = {}
+        self.gramas: Dict[str, Set[int]] = defaultdict(set)
+        for pk, valores in filas:
+            tokens = [palabra for valor in valores for palabra in palabras(valor)]
+            self.palabras[pk] = tokens
+            for token in tokens:
+                for grama in self.ngramas(token):
+                    self.gramas[grama].add(pk)
+
+    @staticmethod
+    def ngramas(token: str) -> Set[str]:
+        # El marcador inicial ancla el primer trigrama al comienzo de la palabra.
+        marcado = f" {token}"
+        return {marcado[i : i + 3] for i in range(len(marcado) - 2)}
+
+    def buscar(self, terminos: List[str]) -> Dict[int, float]:
+        """Ids que contienen todos los términos como prefijo, con su puntaje.
+
+        El puntaje imita el de InnoDB: ocurrencias del término en el registro
+        ponderadas por su rareza (IDF) en la tabla.
+        """
+
+        total = max(len(self.palabras), 1)
+        puntajes: Optional[Dict[int, float]] = None
+        for termino in terminos:
+            candidatos = set.intersection(*(self.gramas.get(grama, set()) for grama in self.ngramas(termino)))
+            ocurrencias = {}
+            for pk in candidatos:
+                cantidad = sum(1 for palabra in self.palabras[pk] if palabra.startswith(termino))
+                if cantidad:
+                    ocurrencias[pk] = cantidad
+            idf = math.log10(total / len(ocurrencias)) + 1 if ocurrencias else 0
+            parciales = {pk: cantidad * idf * idf for pk, cantidad in ocurrencias.items()}
+            if puntajes is None:
+                puntajes = parciales
+            else:
+                puntajes = {pk: puntaje + parciales[pk] for pk, puntaje in puntajes.items() if pk in parciales}
+            if not puntajes:
+                break
+        return puntajes or {}
+
+
+class NGramas(BackendBusqueda):
+    nombre = "ngram"
+    # Más resultados que esto solo conservan los de mayor relevancia: el filtro
+    # viaja como IN (...) y el orden como CASE.
+    max_resultados = 1000
+    # Índices en memoria del proceso; los menos usados se descartan primero.
+    max_indices = 16
+    _indices: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[tuple, IndiceNGramas]]" = OrderedDict()
+
+    def indice(self, modelo, campos: Sequence[str], alias: str) -> IndiceNGramas:
+        manager = modelo._default_manager.using(alias)
+        version = tuple(manager.aggregate(total=Count("pk"), ultima=Max("fecha_actualizacion")).values())
+        clave = (f"{alias}:{modelo._meta.label_lower}", tuple(campos))
+        guardado = self._indices.get(clave)
+        if guardado is None or guardado[0] != version:
+            filas = ((fila[0], fila[1:]) for fila in manager.values_list("pk", *campos).iterator())
+            guardado = (version, IndiceNGramas(filas))
+            self._indices[clave] = guardado
+        self._indices.move_to_end(clave)
+        while len(self._indices) > self.max_indices:
+            self._indices.popitem(last=False)
+        return guardado[1]
+
+    def filtrar(self, queryset, campos, terminos):
+        puntajes = self.indice(queryset.model, campos, queryset.db).buscar(terminos)
+        mejores = sorted(puntajes.items(), key=lambda item: (-item[1], item[0]))[: self.max_resultados]
+        if not mejores:
+            return queryset.none().annotate(relevancia=Value(0.0, output_field=FloatField()))
+        relevancia = Case(
+            *(When(pk=pk, then=Value(puntaje)) for pk, puntaje in mejores),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=[pk for pk, _ in mejores]).annotate(relevancia=relevancia)
+
+
+BACKENDS = {backend.nombre: backend for backend in (FullTextMySQL(), NGramas())}
+
+
+class BusquedaTexto:
+    @staticmethod
+    def backend(alias: str) -> Optional[BackendBusqueda]:
+        """Backend indexado para ``alias``; ``None`` busca todo con ``icontains``."""
+
+        nombre = getattr(settings, "BUSQUEDA", {}).get("BACKEND", "auto")
+        if nombre == "auto":
+            nombre = {"mysql": "fulltext", "sqlite": "ngram"}.get(connections[alias].vendor, "icontains")
+        return BACKENDS.get(nombre)
+
+    @staticmethod
+    def campos(modelo) -> Sequence[str]:
+        for indice in modelo._meta.indexes:
+            if isinstance(indice, FullTextIndex):
+                return indice.fields
+        raise LookupError(f"{modelo._meta.label} no declara un FullTextIndex")
+
+    @staticmethod
+    def filtrar(queryset: models.QuerySet, texto: Optional[str]) -> models.QuerySet:
+        """``queryset`` filtrado por ``texto`` y ordenado por relevancia."""
+
+        originales = list(dict.fromkeys(PALABRA.findall(texto or "")))
+        if not originales:
+            return queryset
+        campos = BusquedaTexto.campos(queryset.model)
+        backend = BusquedaTexto.backend(queryset.db)
+        indexables = []
+        for original in originales:
+            termino = normalizar(original)
+            if backend is not None and indexable(termino):
+                indexables.append(termino)
+                continue
+            condicion = Q()
+            for campo in campos:
+                condicion |= Q(**{f"{campo}__icontains": original})
+            queryset = queryset.filter(condicion)
+        if not indexables:
+            return queryset
+        return backend.filtrar(queryset, campos, list(dict.fromkeys(indexables))).order_by("-relevancia", "pk")
@@ -0,0 +1,29 @@
+"""Invalidación de los conteos cacheados, escrituras en lote y contadores guardados."""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .contadores import Contadores
+from .counts import ConteoCache
+
+
+# Enviada con sender=modelo tras bulk_create/bulk_update, que no emiten
+# post_save; los receptores de invalidación escuchan ambas.
+escritura_masiva = Signal()
+
+
+@receiver([post_save, post_delete, escritura_masiva])
+def invalidar_conteos(sender, **kwargs):
+    if sender._meta.app_label in {"sessions", "admin", "contenttypes"}:
+        return
+    transaction.on_commit(lambda: ConteoCache.invalidar(sender))
+
+
+@receiver(post_delete)
+def descontar_relaciones(sender, instance, **kwargs):
+    # post_delete llega dentro de la transacción del borrado, también en cascada.
+    if getattr(sender, "contadores", None):
+        Contadores.bajas(sender, [instance])
@@ -0,0 +1,75 @@
+"""Respuestas en streaming para exportaciones grandes."""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """Buffer mínimo: ``csv.writer`` devuelve la línea en vez de acumularla."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(headers: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def stream_rows(
+    formato: str,
+    filename: str,
+    fields: Sequence[str],
+    rows: Iterable[Dict[str, Any]],
+) -> StreamingHttpResponse:
+    """Escribe cada fila en la respuesta a medida que el iterador la produce."""
+
+    if formato == "csv":
+        content = iter_csv(fields, ([row.get(field) for field in fields] for row in rows))
+    else:
+        content = iter_ndjson(rows)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[formato])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{formato}"'
+    return response
+
+
+class StreamingExportMixin:
+    """Habilita ``?format=csv|ndjson`` en APIViews que declaran ``export_fields``.
+
+    DRF usa ``format`` para elegir renderer; como la respuesta en streaming no
+    pasa por ningún renderer, la negociación se resuelve con el primero
+    disponible (que también formatea los errores de validación).
+    """
+
+    export_formats: Sequence[str] = ("csv", "ndjson")
+    export_fields: Sequence[str] = ()
+
+    def get_export_format(self, request) -> Optional[str]:
+        formato = request.query_params.get("format")
+        if self.export_fields and formato in self.export_formats:
+            return formato
+        return None
+
+    def perform_content_negotiation(self, request, force=False):
+        if self.get_export_format(request):
+            renderer = self.get_renderers()[0]
+            return renderer, renderer.media_type
+        return super().perform_content_negotiation(request, force=force)
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from importlib import import_module
+from unittest import mock
+
+from django.conf import settings
+from django.core.paginator import EmptyPage
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.actividades.models import Actividad
+from apps.clientes.models import Cliente
+from apps.authentication.models import User
+from apps.empresas.models import Empresa
+from apps.reportes.tests import crear_datos
+
+from .bulk import BulkMixin
+from .counts import ConteoCache
+from .csv import ExportacionInterrumpida, limitar
+from .pagination import ConteoPaginator
+from .projection import Proyeccion
+from .search import BusquedaTexto, NGramas
+from .viewsets import BaseModelViewSet, _compilar_proyeccion
+
+
+class LimitarExportacionTests(SimpleTestCase):
+    def test_interrumpe_al_superar_filas_en_lugar_de_escribir_un_aviso(self):
+        filas = limitar(iter([[1], [2], [3]]), max_segundos=None, max_filas=2)
+        self.assertEqual(next(filas), [1])
+        self.assertEqual(next(filas), [2])
+        with self.assertRaises(ExportacionInterrumpida):
+            next(filas)
+
+    def test_interrumpe_al_superar_el_tiempo(self):
+        with mock.patch("common.csv.time.monotonic", side_effect=[0, 0, 10]):
+            filas = limitar(iter([[1], [2]]), max_segundos=5)
+            self.assertEqual(next(filas), [1])
+            with self.assertRaises(ExportacionInterrumpida):
+                next(filas)
+
+
+class ExportacionTests(TestCase):
+    def setUp(self):
+        usuario = User.objects.create_user(
+            username="export", email="export@example.com", password="x", nombre_completo="Usuario Export"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(usuario)
+        Empresa.objects.bulk_create(Empresa(nombre=f"Empresa {i}") for i in range(3))
+        self.url = reverse("empresa-export")
+
+    @override_settings(CSV_EXPORT={"MAX_FILAS": 2})
+    def test_rechaza_antes_de_escribir_si_supera_max_filas(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    @override_settings(CSV_EXPORT={"MAX_FILAS": 2})
+    def test_conteo_estimado_corto_interrumpe_el_stream(self):
+        with mock.patch("common.mixins.ConteoCache.contar", return_value=(1, False)):
+            respuesta = self.client.get(self.url)
+            self.assertEqual(respuesta.status_code, 200)
+            with self.assertRaises(ExportacionInterrumpida):
+                b"".join(respuesta.streaming_content)
+
+
+class ConteoPaginatorTests(TestCase):
+    def setUp(self):
+        Empresa.objects.bulk_create(Empresa(nombre=f"Empresa {i}") for i in range(7))
+        self.empresas = Empresa.objects.order_by("id")
+
+    def test_estimacion_corta_no_oculta_las_ultimas_paginas(self):
+        paginator = ConteoPaginator(self.empresas, 2, conteo=(3, False))
+        self.assertEqual(paginator.count, 3)
+
+        tercera = paginator.page(3)
+        self.assertEqual(len(tercera), 2)
+        self.assertTrue(tercera.has_next())
+        self.assertEqual(tercera.next_page_number(), 4)
+
+        ultima = paginator.page(4)
+        self.assertEqual(len(ultima), 1)
+        self.assertFalse(ultima.has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(5)
+
+    def test_total_exacto_valida_como_siempre(self):
+        paginator = ConteoPaginator(self.empresas, 2, conteo=(7, True))
+        self.assertEqual(len(paginator.page(4)), 1)
+        with self.assertRaises(EmptyPage):
+            paginator.page(5)
+
+
+class ConteoCacheTests(TestCase):
+    def setUp(self):
+        # Las invalidaciones van en on_commit, que no corre dentro de TestCase.
+        ConteoCache.backend().clear()
+        Empresa.objects.create(nombre="Empresa")
+
+    def test_no_cachea_sobre_un_backend_por_proceso(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(ConteoCache.contar(Empresa.objects.all()), (1, True))
+
+    @override_settings(CACHE_PROCESO_UNICO=True)
+    def test_cachea_si_se_declara_un_solo_proceso(self):
+        ConteoCache.contar(Empresa.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual(ConteoCache.contar(Empresa.objects.all()), (1, True))
+
+    def test_resumen_no_se_cachea_sobre_un_backend_por_proceso(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(ConteoCache.resumir(Empresa.objects.all(), {})["total"], 1)
+
+    @override_settings(CACHE_PROCESO_UNICO=True)
+    def test_resumen_se_cachea_si_se_declara_un_solo_proceso(self):
+        ConteoCache.resumir(Empresa.objects.all(), {})
+        with self.assertNumQueries(0):
+            self.assertEqual(ConteoCache.resumir(Empresa.objects.all(), {})["total"], 1)
+
+
+def _subclases(clase):
+    for subclase in clase.__subclasses__():
+        yield subclase
+        yield from _subclases(subclase)
+
+
+class ProyeccionParidadTests(TestCase):
+    """La proyección compilada de cada listado responde lo mismo que su serializer."""
+
+    # basename del router -> viewset con use_projection.
+    RECURSOS = {"empresa", "cliente", "oportunidad", "actividad"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = crear_datos(empresas=2, clientes=2, oportunidades=2)
+        # Filas con los opcionales completos y relaciones nulas.
+        Empresa.objects.create(
+            nombre="Empresa completa",
+            industria="tecnologia",
+            num_empleados=50,
+            sitio_web="https://example.com",
+            telefono="+5114000000",
+            direccion="Av. Siempre Viva 123",
+            notas="Notas",
+        )
+        Actividad.objects.create(
+            tipo="tarea", asunto="Sin cliente ni oportunidad", fecha_hora="2024-01-01T10:00:00Z", usuario=cls.usuario
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        # Importar las URLs registra todos los viewsets.
+        import_module(settings.ROOT_URLCONF)
+
+    def viewset(self, basename):
+        for viewset in _subclases(BaseModelViewSet):
+            if viewset.use_projection and viewset.queryset.model._meta.model_name == basename:
+                return viewset
+        self.fail(f"Sin viewset proyectado para {basename}")
+
+    def test_cubre_todos_los_viewsets_proyectados(self):
+        proyectados = {
+            viewset.queryset.model._meta.model_name for viewset in _subclases(BaseModelViewSet) if viewset.use_projection
+        }
+        self.assertEqual(proyectados, self.RECURSOS)
+
+    def test_listados_iguales_al_serializer(self):
+        for basename in sorted(self.RECURSOS):
+            viewset = self.viewset(basename)
+            # Si no compila, el listado cae al serializer y la comparación no probaría nada.
+            Proyeccion(viewset.serializer_class, None, viewset.projection_computed)
+            url = reverse(f"{basename}-list")
+            for params in ({"page_size": 100}, {"paginacion": "cursor", "page_size": 100}):
+                with self.subTest(recurso=basename, params=params):
+                    proyectado = self.client.get(url, params).json()
+                    with mock.patch.object(viewset, "use_projection", False):
+                        serializado = self.client.get(url, params).json()
+                    self.assertTrue(proyectado["data"])
+                    self.assertEqual(proyectado["data"], serializado["data"])
+
+    def test_exportaciones_iguales_al_csv_row_builder(self):
+        for basename in sorted(self.RECURSOS):
+            viewset = self.viewset(basename)
+            if not viewset.csv_values:
+                continue
+            url = reverse(f"{basename}-export")
+            with self.subTest(recurso=basename):
+                proyectado = b"".join(self.client.get(url).streaming_content)
+                with mock.patch.object(viewset, "csv_values", ()):
+                    instancias = b"".join(self.client.get(url).streaming_content)
+                self.assertEqual(proyectado, instancias)
+
+    def test_cache_de_proyecciones_normaliza_los_campos(self):
+        _compilar_proyeccion.cache_clear()
+        url = reverse("empresa-list")
+        for campos in ("id,nombre", "nombre,id", "nombre,id,nombre"):
+            self.assertEqual(self.client.get(url, {"fields": campos}).status_code, 200)
+        self.assertEqual(_compilar_proyeccion.cache_info().currsize, 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        usuario = User.objects.create_user(
+            username="etag", email="etag@example.com", password="x", nombre_completo="Usuario ETag"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(usuario)
+        Empresa.objects.create(nombre="Empresa")
+        # Sin relaciones en la respuesta: la versión no depende de la caché.
+        self.url = reverse("empresa-list")
+        self.params = {"fields": "id,nombre"}
+
+    def test_sin_encabezados_no_consulta_la_version(self):
+        with CaptureQueriesContext(connection) as simple:
+            respuesta = self.client.get(self.url, self.params)
+        self.assertNotIn("ETag", respuesta)
+
+        with CaptureQueriesContext(connection) as condicional:
+            respuesta = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH='W/"0"')
+        self.assertIn("ETag", respuesta)
+        self.assertEqual(len(condicional), len(simple) + 1)
+
+    def test_etag_vigente_responde_304(self):
+        etag = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH='W/"0"')["ETag"]
+        respuesta = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+        Empresa.objects.create(nombre="Otra")
+        self.assertEqual(self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_relaciones_requieren_cache_compartida(self):
+        # Los clientes muestran su empresa: la versión necesita su generación.
+        url = reverse("cliente-list")
+        self.assertNotIn("ETag", self.client.get(url, HTTP_IF_NONE_MATCH='W/"0"'))
+        with self.settings(CACHE_PROCESO_UNICO=True):
+            self.assertIn("ETag", self.client.get(url, HTTP_IF_NONE_MATCH='W/"0"'))
+
+
+class BusquedaBackendTests(SimpleTestCase):
+    def test_auto_solo_usa_ngramas_en_sqlite(self):
+        for vendor, esperado in (("mysql", "fulltext"), ("sqlite", "ngram"), ("postgresql", None)):
+            with self.subTest(vendor=vendor), mock.patch.object(connections["default"], "vendor", vendor):
+                backend = BusquedaTexto.backend("default")
+                self.assertEqual(backend.nombre if backend else None, esperado)
+
+    @override_settings(BUSQUEDA={"BACKEND": "ngram"})
+    def test_backend_explicito(self):
+        with mock.patch.object(connections["default"], "vendor", "postgresql"):
+            self.assertEqual(BusquedaTexto.backend("default").nombre, "ngram")
+
+
+class BusquedaSinIndiceTests(TestCase):
+    def test_sin_backend_indexado_busca_por_subcadena(self):
+        Empresa.objects.create(nombre="Comercial Andina")
+        Empresa.objects.create(nombre="Minera del Sur")
+        with mock.patch.object(connections["default"], "vendor", "postgresql"):
+            encontradas = BusquedaTexto.filtrar(Empresa.objects.all(), "andina com")
+        self.assertEqual([empresa.nombre for empresa in encontradas], ["Comercial Andina"])
+
+
+class NGramasIndicesTests(TestCase):
+    @mock.patch.object(NGramas, "max_indices", 1)
+    @mock.patch.object(NGramas, "_indices", OrderedDict())
+    def test_descarta_el_indice_de_ngramas_menos_usado(self):
+        backend = NGramas()
+        backend.indice(Empresa, ["nombre"], "default")
+        backend.indice(Cliente, ["nombre_completo"], "default")
+        self.assertEqual(list(NGramas._indices), [("default:clientes.cliente", ("nombre_completo",))])
+
+
+class BulkInsertTests(TestCase):
+    def lote(self):
+        return [Empresa(nombre=f"Empresa {i}") for i in range(3)]
+
+    def test_con_returning_inserta_el_lote_completo(self):
+        lote = self.lote()
+        with self.assertNumQueries(1):
+            BulkMixin.bulk_insert(Empresa, lote)
+        self.assertEqual(sorted(empresa.pk for empresa in lote), sorted(Empresa.objects.values_list("pk", flat=True)))
+
+    def test_sin_ids_consecutivos_inserta_fila_por_fila(self):
+        # MySQL con innodb_autoinc_lock_mode = 2.
+        features = type(connections["default"].features)
+        sin_returning = mock.PropertyMock(return_value=False)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", new=sin_returning), mock.patch.object(
+            BulkMixin, "paso_autoincremento", return_value=None
+        ), mock.patch.object(BulkMixin, "bulk_assign_pks") as asignar:
+            BulkMixin.bulk_insert(Empresa, self.lote())
+        self.assertEqual([len(llamada.args[1]) for llamada in asignar.call_args_list], [1, 1, 1])
+        self.assertEqual(Empresa.objects.count(), 3)
+
+    def test_ids_consecutivos_respetan_el_incremento(self):
+        lote = self.lote()
+        with mock.patch("common.bulk.connections") as conexiones:
+            conexiones.__getitem__.return_value.cursor.return_value.__enter__.return_value.fetchone.return_value = (11,)
+            BulkMixin.bulk_assign_pks(Empresa, lote, paso=2)
+        self.assertEqual([empresa.pk for empresa in lote], [11, 13, 15])
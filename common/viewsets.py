@@ -2,16 +2,43 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Type
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Set, Tuple, Type
 
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from pydantic import BaseModel
-from rest_framework import status, viewsets
+from rest_framework import serializers, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 
+from .bulk import BulkMixin
+from .cache import cache_compartida
+from .counts import ConteoCache
+from .pagination import KeysetPagination
+from .projection import Calculado, NoCompilable, Proyeccion
 from .responses import success_response
 from .schemas import parse_schema
 
 
+# Cada combinación de ?fields= es una entrada: el límite evita que un cliente
+# haga crecer la caché del worker pidiendo subconjuntos distintos.
+PROYECCIONES_EN_CACHE = 256
+
+
+@lru_cache(maxsize=PROYECCIONES_EN_CACHE)
+def _compilar_proyeccion(viewset_class, serializer_class, campos: Optional[Tuple[str, ...]]) -> Optional[Proyeccion]:
+    try:
+        return Proyeccion(serializer_class, campos, viewset_class.projection_computed)
+    except NoCompilable:
+        return None
+
+
 class SchemaValidationMixin:
     """Aplica el patrón Adapter para reutilizar esquemas Pydantic con DRF."""
 
@@ -25,30 +52,393 @@ class SchemaValidationMixin:
         return parse_schema(schema_cls, request.data, exclude_unset=exclude_unset)
 
 
-class BaseModelViewSet(SchemaValidationMixin, viewsets.ModelViewSet):
+class SparseFieldsMixin:
+    """``?fields=a,b`` en lecturas y un plan de consulta por acción.
+
+    El ``queryset`` base queda sin joins ni anotaciones; cada viewset declara
+    qué campo del serializer los necesita y solo se aplican si ese campo se
+    pide (todos cuando no hay ``?fields=``). Las columnas se limitan con
+    ``.only()`` a las que leen los campos pedidos.
+
+    Qué campos cuentan como pedidos depende del plan de la acción (``list``,
+    ``retrieve``, ``export`` o ``write``): ``query_plans`` asigna a cada plan
+    los nombres de ``field_*`` que necesita, o ``None`` para usar los del
+    serializer de la acción. Por defecto las lecturas usan el serializer y
+    las escrituras no aplican ningún join ni anotación.
+    """
+
+    fields_query_param = "fields"
+    sparse_actions: Sequence[str] = ("list", "retrieve")
+    # plan -> nombres de field_select_related / field_prefetch_related /
+    # field_annotations que aplica; None = los campos del serializer.
+    query_plans: Dict[str, Optional[Sequence[str]]] = {}
+    default_query_plans: Dict[str, Optional[Sequence[str]]] = {
+        "list": None,
+        "retrieve": None,
+        "export": None,
+        "write": (),
+    }
+    # acción -> plan, para acciones propias que no siguen la regla general
+    # (métodos no seguros -> write; el resto según sea de detalle o no).
+    action_plans: Dict[str, str] = {}
+    # campo del serializer -> rutas para select_related / prefetch_related
+    field_select_related: Dict[str, Sequence[str]] = {}
+    field_prefetch_related: Dict[str, Sequence[str]] = {}
+    # campo del serializer -> expresión anotada con el mismo nombre
+    field_annotations: Dict[str, Any] = {}
+    # campos calculados (propiedades, SerializerMethodField) -> columnas que leen
+    field_dependencies: Dict[str, Sequence[str]] = {}
+
+    def get_sparse_fields(self) -> Optional[Set[str]]:
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self._parse_sparse_fields()
+        return self._sparse_fields
+
+    def _parse_sparse_fields(self) -> Optional[Set[str]]:
+        if self.action not in self.sparse_actions:
+            return None
+        valor = getattr(self.request, "query_params", {}).get(self.fields_query_param)
+        if not valor:
+            return None
+        pedidos = {campo.strip() for campo in valor.split(",") if campo.strip()}
+        disponibles = set(self.get_serializer_class()().fields)
+        desconocidos = pedidos - disponibles
+        if desconocidos:
+            raise ValidationError(
+                {self.fields_query_param: [f"Campos no disponibles: {', '.join(sorted(desconocidos))}"]}
+            )
+        return pedidos
+
+    def get_query_plan(self) -> str:
+        if self.action in self.action_plans:
+            return self.action_plans[self.action]
+        if getattr(self.request, "method", "GET") not in SAFE_METHODS:
+            return "write"
+        if self.action in ("list", "retrieve", "export"):
+            return self.action
+        return "retrieve" if self.detail else "list"
+
+    def get_plan_fields(self) -> Set[str]:
+        plan = self.get_query_plan()
+        declarados = {**self.default_query_plans, **self.query_plans}.get(plan)
+        campos = self.get_sparse_fields()
+        if declarados is not None:
+            activos = set(declarados) if campos is None else set(declarados) & campos
+        else:
+            activos = campos if campos is not None else self.get_all_field_names()
+        if plan == "write":
+            return activos
+        # Las anotaciones usadas para ordenar se aplican aunque no se muestren.
+        return activos | self.get_ordering_names()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        campos = self.get_sparse_fields()
+        activos = self.get_plan_fields()
+
+        anotaciones = {nombre: expr for nombre, expr in self.field_annotations.items() if nombre in activos}
+        if anotaciones:
+            queryset = queryset.annotate(**anotaciones)
+        relaciones = self._rutas(self.field_select_related, activos)
+        if relaciones:
+            queryset = queryset.select_related(*relaciones)
+        prefetch = self._rutas(self.field_prefetch_related, activos)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if campos is not None:
+            queryset = queryset.only(*self.get_only_fields(queryset.model, campos))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        campos = self.get_sparse_fields()
+        if campos is not None:
+            destino = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for nombre in set(destino.fields) - campos:
+                destino.fields.pop(nombre)
+        return serializer
+
+    def get_all_field_names(self) -> Set[str]:
+        return set(self.get_serializer_class()().fields)
+
+    def get_ordering_names(self) -> Set[str]:
+        valor = getattr(self.request, "query_params", {}).get("ordering", "")
+        return {campo.strip().lstrip("-") for campo in valor.split(",") if campo.strip()}
+
+    def get_only_fields(self, model, campos: Iterable[str]) -> Set[str]:
+        serializer = self.get_serializer_class()()
+        columnas = {"pk"}
+        for nombre in campos:
+            if nombre in self.field_dependencies:
+                columnas.update(self.field_dependencies[nombre])
+                continue
+            if nombre in self.field_annotations:
+                continue
+            campo = serializer.fields[nombre]
+            columnas.update(self._columnas(model, campo.source, campo))
+        # El orden (y el cursor de keyset) se lee de cada fila: sin estas
+        # columnas cada objeto dispararía una consulta diferida.
+        for nombre in self.get_ordering_names() or {c.lstrip("-") for c in model._meta.ordering}:
+            if nombre not in self.field_annotations:
+                columnas.add(nombre)
+        return columnas
+
+    @staticmethod
+    def _columnas(model, source: str, campo) -> Set[str]:
+        try:
+            field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return set()
+        if not field.concrete:
+            # Relaciones inversas: las resuelve prefetch_related, no la columna.
+            return set()
+        if not field.is_relation or not isinstance(campo, serializers.BaseSerializer):
+            return {field.name}
+        # Serializer anidado: la FK y las columnas que lee del modelo relacionado.
+        columnas = {field.name, f"{field.name}__{field.related_model._meta.pk.name}"}
+        for hijo in campo.fields.values():
+            columnas.update(
+                f"{field.name}__{columna}"
+                for columna in SparseFieldsMixin._columnas(field.related_model, hijo.source, hijo)
+            )
+        return columnas
+
+    @staticmethod
+    def _rutas(mapa: Dict[str, Sequence[str]], activos: Set[str]) -> list:
+        rutas = []
+        for nombre, valores in mapa.items():
+            if nombre in activos:
+                rutas.extend(ruta for ruta in valores if ruta not in rutas)
+        return rutas
+
+
+class ConditionalGetMixin:
+    """GET condicional (``ETag``/``Last-Modified``) en ``list`` y ``retrieve``.
+
+    Solo se calcula si la petición trae ``If-None-Match`` o
+    ``If-Modified-Since``: sin ellos no hay consulta extra ni ``ETag``. La
+    versión sale de una sola consulta agregada sobre las filas filtradas
+    (máxima ``fecha_actualizacion`` y cantidad) más la generación de las
+    tablas relacionadas que aparecen en la respuesta; esas generaciones
+    tienen que ser comunes a todos los workers, así que con una caché por
+    proceso solo se versionan las respuestas sin tablas relacionadas. Con
+    ``If-None-Match`` vigente se responde 304 sin serializar nada.
+    ``If-Modified-Since`` solo se atiende en el detalle: en un listado un
+    borrado no mueve la fecha máxima.
+    """
+
+    updated_at_field = "fecha_actualizacion"
+    # Modelos adicionales que alteran la respuesta (p. ej. tasas de cambio).
+    version_models: Sequence[Type] = ()
+
+    def conditional_response(self, construir: Callable[[], Response]) -> Response:
+        if not self.is_conditional():
+            return construir()
+        version = self.get_version()
+        if version is None:
+            return construir()
+        etag, ultima = version
+        if self.not_modified(etag, ultima):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = construir()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        if ultima is not None:
+            response["Last-Modified"] = http_date(ultima.timestamp())
+        return response
+
+    def is_conditional(self) -> bool:
+        return "If-None-Match" in self.request.headers or "If-Modified-Since" in self.request.headers
+
+    def not_modified(self, etag: str, ultima) -> bool:
+        if_none_match = self.request.headers.get("If-None-Match")
+        if if_none_match:
+            # Comparación débil: se ignora el prefijo W/.
+            etiquetas = {etiqueta.removeprefix("W/") for etiqueta in parse_etags(if_none_match)}
+            return "*" in etiquetas or etag.removeprefix("W/") in etiquetas
+        if_modified_since = parse_http_date_safe(self.request.headers.get("If-Modified-Since", ""))
+        return (
+            self.action == "retrieve"
+            and ultima is not None
+            and if_modified_since is not None
+            and int(ultima.timestamp()) <= if_modified_since
+        )
+
+    def get_version(self) -> Optional[Tuple[str, Any]]:
+        queryset = self.get_version_queryset()
+        try:
+            queryset.model._meta.get_field(self.updated_at_field)
+        except FieldDoesNotExist:
+            return None
+        # El agregado ya cubre altas, bajas y cambios de la tabla principal.
+        relacionados = self.get_version_models() - {queryset.model}
+        if relacionados and not cache_compartida(ConteoCache.backend()):
+            return None
+        resumen = queryset.aggregate(ultima=Max(self.updated_at_field), total=Count("pk"))
+        if self.action == "retrieve" and not resumen["total"]:
+            # Que el flujo normal responda el 404.
+            return None
+
+        generaciones = ConteoCache.generaciones().get_many(relacionados)
+        contenido = repr(
+            (
+                self.action,
+                sorted(self.kwargs.items()),
+                sorted(self.request.query_params.lists()),
+                getattr(self.request.user, "pk", None),
+                self.request.accepted_media_type,
+                resumen["ultima"].isoformat() if resumen["ultima"] else None,
+                resumen["total"],
+                sorted(generaciones.items()),
+            )
+        )
+        return f'W/"{hashlib.sha256(contenido.encode()).hexdigest()[:32]}"', resumen["ultima"]
+
+    def get_version_queryset(self):
+        # Los filtros de la petición sobre el queryset base, sin anotaciones ni
+        # orden: deciden qué filas entran, que es lo que versiona el agregado.
+        queryset = super().get_queryset()
+        for backend in self.filter_backends:
+            if not issubclass(backend, OrderingFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_version_models(self) -> Set[Type]:
+        queryset = self.get_queryset()
+        modelos = set(ConteoCache.modelos(queryset))
+        modelos.update(self.version_models)
+        rutas = list(self._rutas_select_related(queryset.query.select_related))
+        rutas.extend(
+            getattr(lookup, "prefetch_through", lookup) for lookup in queryset._prefetch_related_lookups
+        )
+        for ruta in rutas:
+            modelo = queryset.model
+            for parte in ruta.split("__"):
+                modelo = modelo._meta.get_field(parte).related_model
+                modelos.add(modelo)
+        return modelos
+
+    @staticmethod
+    def _rutas_select_related(arbol, prefijo: str = "") -> Iterator[str]:
+        if not isinstance(arbol, dict):
+            return
+        for nombre, hijos in arbol.items():
+            yield prefijo + nombre
+            yield from ConditionalGetMixin._rutas_select_related(hijos, f"{prefijo}{nombre}__")
+
+
+class ParentLookupMixin:
+    """Listados anidados bajo un registro padre (``/empresas/{empresa_pk}/clientes/``).
+
+    ``parent_lookups`` asigna a cada kwarg de la URL la FK que filtra. El
+    filtro se aplica sobre el ``queryset`` base, así que filtros, orden,
+    paginación y la versión del GET condicional trabajan solo con los hijos
+    del padre. Un padre inexistente responde 404 en lugar de una lista vacía.
+    """
+
+    parent_lookups: Dict[str, str] = {}
+
+    def get_parent_filters(self) -> Dict[str, Any]:
+        return {campo: self.kwargs[kwarg] for kwarg, campo in self.parent_lookups.items() if kwarg in self.kwargs}
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        for campo, valor in self.get_parent_filters().items():
+            padre = self.queryset.model._meta.get_field(campo).related_model
+            if not padre._default_manager.filter(pk=valor).exists():
+                raise Http404
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        filtros = self.get_parent_filters()
+        return queryset.filter(**filtros) if filtros else queryset
+
+
+class BaseModelViewSet(
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    ParentLookupMixin,
+    BulkMixin,
+    SchemaValidationMixin,
+    viewsets.ModelViewSet,
+):
     list_message = "Listado obtenido exitosamente"
     retrieve_message = "Recurso obtenido exitosamente"
     create_message = "Recurso creado exitosamente"
     update_message = "Recurso actualizado exitosamente"
     destroy_message = "Recurso eliminado exitosamente"
+    # "pagina" (número de página) o "cursor" (keyset); cada petición puede
+    # elegir con ?paginacion= y enviar ?cursor= implica el modo cursor.
+    pagination_mode = "pagina"
+    cursor_pagination_class = KeysetPagination
+    # Listados armados desde .values() con una proyección compilada del
+    # serializer en lugar de instanciarlo por fila (ver common.projection).
+    use_projection = False
+    projection_computed: Dict[str, Calculado] = {}
+
+    def get_projection(self) -> Optional[Proyeccion]:
+        if not self.use_projection or self.action != "list":
+            return None
+        campos = self.get_sparse_fields()
+        # Campos validados, ordenados y sin repetir: ?fields=b,a,a comparte entrada con ?fields=a,b.
+        return _compilar_proyeccion(
+            type(self), self.get_serializer_class(), tuple(sorted(campos)) if campos is not None else None
+        )
+
+    def get_pagination_mode(self) -> str:
+        params = getattr(self.request, "query_params", {})
+        modo = params.get("paginacion") or ("cursor" if "cursor" in params else self.pagination_mode)
+        if modo not in ("pagina", "cursor"):
+            raise ValidationError({"paginacion": ["Use pagina o cursor"]})
+        return modo
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.pagination_class is None:
+                self._paginator = None
+            elif self.get_pagination_mode() == "cursor":
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(lambda: self.list_response(self.filter_queryset(self.get_queryset())))
+
+    def list_response(self, queryset, conteo: Optional[Tuple[int, bool]] = None):
+        """``conteo``: ``(total, exacto)`` ya conocido del queryset filtrado; evita el COUNT de la página."""
+
+        if conteo is not None and self.paginator is not None:
+            self.paginator.conteo = conteo
+        proyeccion = self.get_projection()
+        if proyeccion is not None:
+            # Las columnas de orden viajan en la fila para el cursor de keyset.
+            orden = [campo.lstrip("-") for campo in queryset.query.order_by or queryset.model._meta.ordering]
+            queryset = proyeccion.values(queryset, extra=[*orden, "pk"])
+
         page = self.paginate_queryset(queryset)
+        items = page if page is not None else queryset
+        if proyeccion is not None:
+            data = proyeccion.construir_todos(items)
+        else:
+            data = self.get_serializer(items, many=True).data
+
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(data)
             response.data["message"] = self.list_message
             return response
-
-        serializer = self.get_serializer(queryset, many=True)
-        return success_response(
-            serializer.data,
-            count=len(serializer.data),
-            message=self.list_message,
-        )
+        return success_response(data, count=len(data), message=self.list_message)
 
     def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self.retrieve_response)
+
+    def retrieve_response(self):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         return success_response(serializer.data, message=self.retrieve_message)
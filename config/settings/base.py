@@ -39,12 +39,14 @@ INSTALLED_APPS = [
     "corsheaders",
     "django_filters",
     # Local apps
+    "common",
     "apps.authentication",
     "apps.empresas",
     "apps.clientes",
     "apps.oportunidades",
     "apps.actividades",
     "apps.reportes",
+    "apps.importaciones",
 ]
 
 MIDDLEWARE = [
@@ -108,6 +110,61 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+CACHES = {
+    "default": env.cache_url("CACHE_URL", default="locmemcache://"),
+    "reportes": env.cache_url("REPORTES_CACHE_URL", default="locmemcache://reportes"),
+}
+# Las cachés invalidadas por generación (reportes, conteos, totales, ETag)
+# solo se activan sobre un backend compartido (dbcache://, rediscache://):
+# con locmem cada worker de gunicorn tendría su propia versión. True
+# permite locmem cuando hay un único proceso (runserver, un solo worker).
+CACHE_PROCESO_UNICO = env.bool("CACHE_PROCESO_UNICO", default=False)
+
+REPORTES_CACHE = {
+    "ALIAS": "reportes",
+    # Segundos de vida de cada resultado; 0 desactiva la caché.
+    "TTL": env.int("REPORTES_CACHE_TTL", default=300),
+}
+
+LISTADOS_CONTEO = {
+    "ALIAS": "default",
+    # Segundos de vida de cada conteo cacheado; 0 cuenta siempre en la base
+    # (igual que un backend por proceso, ver CACHE_PROCESO_UNICO).
+    "TTL": env.int("LISTADOS_CONTEO_TTL", default=300),
+    # Sin filtros, tablas con al menos estas filas usan la estimación de
+    # information_schema (MySQL), solo para informar ``count``; 0 desactiva la
+    # estimación.
+    "UMBRAL_ESTIMADO": env.int("LISTADOS_CONTEO_UMBRAL_ESTIMADO", default=100000),
+}
+
+CSV_EXPORT = {
+    # Filas leídas por viaje al cursor de la base durante /export/.
+    "CHUNK_SIZE": env.int("CSV_EXPORT_CHUNK_SIZE", default=2000),
+    # Límites de protección; 0 desactiva cada uno.
+    "MAX_FILAS": env.int("CSV_EXPORT_MAX_FILAS", default=500000),
+    "MAX_SEGUNDOS": env.float("CSV_EXPORT_MAX_SEGUNDOS", default=300),
+}
+
+BULK = {
+    # Registros admitidos por petición en POST/PATCH .../bulk/; 0 sin límite.
+    "MAX_ITEMS": env.int("BULK_MAX_ITEMS", default=1000),
+    # Filas por INSERT/UPDATE dentro de la transacción.
+    "BATCH_SIZE": env.int("BULK_BATCH_SIZE", default=500),
+}
+
+IMPORTACIONES = {
+    # Filas validadas y guardadas por transacción.
+    "BATCH_SIZE": env.int("IMPORTACIONES_BATCH_SIZE", default=1000),
+    # Tamaño máximo del archivo subido a /importaciones/; 0 sin límite.
+    "MAX_MB": env.int("IMPORTACIONES_MAX_MB", default=100),
+}
+
+BUSQUEDA = {
+    # "auto" (FULLTEXT en MySQL, n-gramas en memoria en SQLite, icontains en
+    # el resto), "fulltext", "ngram" o "icontains".
+    "BACKEND": env("BUSQUEDA_BACKEND", default="auto"),
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "authentication.User"
 
@@ -119,6 +176,15 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_PAGINATION_CLASS": "common.pagination.StandardPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "common.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "common.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
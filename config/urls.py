@@ -18,6 +18,7 @@ urlpatterns = [
     path("api/v1/oportunidades/", include("apps.oportunidades.urls")),
     path("api/v1/actividades/", include("apps.actividades.urls")),
     path("api/v1/reportes/", include("apps.reportes.urls")),
+    path("api/v1/importaciones/", include("apps.importaciones.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path(
         "api/docs/",
@@ -43,6 +43,8 @@ COMMENT='Tabla de usuarios del sistema con autenticación';
 -- ============================================
 -- TABLA: empresas_empresa
 -- ============================================
+-- num_clientes y num_oportunidades se mantienen en cada escritura. Al
+-- agregarlos a una base existente, poblarlos con: python manage.py recontar
 CREATE TABLE IF NOT EXISTS empresas_empresa (
     id BIGINT AUTO_INCREMENT PRIMARY KEY,
     nombre VARCHAR(200) NOT NULL UNIQUE COMMENT 'Nombre de la empresa (único)',
@@ -52,16 +54,24 @@ CREATE TABLE IF NOT EXISTS empresas_empresa (
     telefono VARCHAR(20) NULL COMMENT 'Teléfono de contacto',
     direccion VARCHAR(300) NULL COMMENT 'Dirección física',
     notas TEXT NULL COMMENT 'Notas adicionales sobre la empresa',
+    num_clientes INT NOT NULL DEFAULT 0 COMMENT 'Clientes de la empresa (contador guardado)',
+    num_oportunidades INT NOT NULL DEFAULT 0 COMMENT 'Oportunidades de la empresa (contador guardado)',
     fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de creación del registro',
+    fecha_actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de la última modificación',
     INDEX idx_nombre (nombre),
     INDEX idx_industria (industria),
-    INDEX idx_fecha_creacion (fecha_creacion)
+    INDEX idx_num_clientes (num_clientes),
+    INDEX idx_num_oportunidades (num_oportunidades),
+    INDEX idx_fecha_creacion (fecha_creacion),
+    INDEX idx_fecha_actualizacion (fecha_actualizacion),
+    FULLTEXT INDEX ft_empresa_busqueda (nombre)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Tabla central de organizaciones/empresas cliente';
 
 -- ============================================
 -- TABLA: clientes_cliente
 -- ============================================
+-- num_oportunidades y num_actividades: ver empresas_empresa.
 CREATE TABLE IF NOT EXISTS clientes_cliente (
     id BIGINT AUTO_INCREMENT PRIMARY KEY,
     nombre_completo VARCHAR(150) NOT NULL COMMENT 'Nombre completo del contacto',
@@ -71,12 +81,18 @@ CREATE TABLE IF NOT EXISTS clientes_cliente (
     email VARCHAR(255) NOT NULL COMMENT 'Email de contacto',
     direccion VARCHAR(300) NULL COMMENT 'Dirección física',
     notas TEXT NULL COMMENT 'Notas adicionales sobre el cliente',
+    num_oportunidades INT NOT NULL DEFAULT 0 COMMENT 'Oportunidades del cliente (contador guardado)',
+    num_actividades INT NOT NULL DEFAULT 0 COMMENT 'Actividades del cliente (contador guardado)',
     fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de creación del registro',
+    fecha_actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de la última modificación',
     FOREIGN KEY (empresa_id) REFERENCES empresas_empresa(id) ON DELETE RESTRICT ON UPDATE CASCADE,
     INDEX idx_empresa_id (empresa_id),
     INDEX idx_nombre_completo (nombre_completo),
     INDEX idx_email (email),
-    INDEX idx_fecha_creacion (fecha_creacion)
+    INDEX idx_num_oportunidades (num_oportunidades),
+    INDEX idx_fecha_creacion (fecha_creacion),
+    INDEX idx_fecha_actualizacion (fecha_actualizacion),
+    FULLTEXT INDEX ft_cliente_busqueda (nombre_completo, email)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Contactos individuales asociados a empresas';
 
@@ -97,6 +113,7 @@ CREATE TABLE IF NOT EXISTS oportunidades_oportunidad (
     resultado ENUM('ganada', 'perdida') NULL COMMENT 'Resultado si está cerrada',
     notas TEXT NULL COMMENT 'Notas adicionales',
     fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de creación del registro',
+    fecha_actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de la última modificación',
     fecha_cierre_real DATETIME(6) NULL COMMENT 'Fecha real de cierre',
     FOREIGN KEY (cliente_id) REFERENCES clientes_cliente(id) ON DELETE RESTRICT ON UPDATE CASCADE,
     FOREIGN KEY (empresa_id) REFERENCES empresas_empresa(id) ON DELETE RESTRICT ON UPDATE CASCADE,
@@ -106,6 +123,8 @@ CREATE TABLE IF NOT EXISTS oportunidades_oportunidad (
     INDEX idx_estado (estado),
     INDEX idx_fecha_cierre_estimada (fecha_cierre_estimada),
     INDEX idx_fecha_creacion (fecha_creacion),
+    INDEX idx_fecha_actualizacion (fecha_actualizacion),
+    FULLTEXT INDEX ft_oportunidad_busqueda (nombre),
     CHECK (probabilidad >= 0 AND probabilidad <= 100)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Oportunidades comerciales y pipeline de ventas';
@@ -125,6 +144,7 @@ CREATE TABLE IF NOT EXISTS actividades_actividad (
     usuario_id BIGINT NOT NULL COMMENT 'FK a authentication_user (CASCADE)',
     resultado TEXT NULL COMMENT 'Resultado o notas de la actividad',
     fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de creación del registro',
+    fecha_actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de la última modificación',
     FOREIGN KEY (cliente_id) REFERENCES clientes_cliente(id) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (oportunidad_id) REFERENCES oportunidades_oportunidad(id) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES authentication_user(id) ON DELETE CASCADE ON UPDATE CASCADE,
@@ -134,10 +154,117 @@ CREATE TABLE IF NOT EXISTS actividades_actividad (
     INDEX idx_tipo (tipo),
     INDEX idx_estado (estado),
     INDEX idx_fecha_hora (fecha_hora),
-    INDEX idx_fecha_creacion (fecha_creacion)
+    INDEX idx_fecha_creacion (fecha_creacion),
+    INDEX idx_fecha_actualizacion (fecha_actualizacion)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Registro de actividades, interacciones y tareas';
 
+-- ============================================
+-- TABLA: oportunidades_transicionetapa
+-- ============================================
+-- Historial de cambios de etapa. Poblar registros existentes con:
+-- python manage.py poblar_transiciones_etapa
+CREATE TABLE IF NOT EXISTS oportunidades_transicionetapa (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    oportunidad_id BIGINT NOT NULL COMMENT 'FK a oportunidades_oportunidad (CASCADE)',
+    etapa_origen ENUM('prospeccion', 'calificacion', 'propuesta', 'negociacion', 'cerrado_ganado', 'cerrado_perdido') NULL COMMENT 'Etapa previa (NULL en la creación)',
+    etapa_destino ENUM('prospeccion', 'calificacion', 'propuesta', 'negociacion', 'cerrado_ganado', 'cerrado_perdido') NOT NULL COMMENT 'Etapa nueva',
+    fecha DATETIME(6) NOT NULL COMMENT 'Momento del cambio',
+    segundos_en_origen BIGINT UNSIGNED NULL COMMENT 'Tiempo que la oportunidad permaneció en la etapa previa',
+    FOREIGN KEY (oportunidad_id) REFERENCES oportunidades_oportunidad(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    INDEX idx_transicion_oport_fecha (oportunidad_id, fecha),
+    INDEX idx_transicion_origen_dest (etapa_origen, etapa_destino),
+    INDEX idx_transicion_destino (etapa_destino, oportunidad_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Historial de transiciones de etapa del pipeline';
+
+-- ============================================
+-- TABLA: oportunidades_tipocambio
+-- ============================================
+-- Tasas de cambio fechadas: 1 moneda_origen = tasa moneda_destino.
+-- Los reportes aceptan moneda_base y convierten dentro de la agregación.
+-- MAX(fecha_actualizacion) y COUNT(*) forman la versión con la que cada
+-- proceso detecta que debe recargar sus tasas vigentes.
+CREATE TABLE IF NOT EXISTS oportunidades_tipocambio (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    moneda_origen CHAR(3) NOT NULL COMMENT 'Código de moneda (PEN, USD, EUR)',
+    moneda_destino CHAR(3) NOT NULL COMMENT 'Código de moneda (PEN, USD, EUR)',
+    fecha DATE NOT NULL COMMENT 'Día desde el que rige la tasa',
+    tasa DECIMAL(18, 6) NOT NULL COMMENT 'Unidades de moneda_destino por unidad de moneda_origen',
+    fecha_actualizacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) COMMENT 'Fecha de la última modificación',
+    UNIQUE KEY uniq_tipo_cambio_par_fecha (moneda_origen, moneda_destino, fecha)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Tipos de cambio por fecha';
+
+-- ============================================
+-- TABLA: reportes_ventadiaria
+-- ============================================
+-- Rollup de ventas ganadas por día (America/Lima) y moneda.
+-- Se mantiene de forma incremental desde OportunidadService y se puede
+-- reconstruir con: python manage.py reconstruir_ventas_diarias
+CREATE TABLE IF NOT EXISTS reportes_ventadiaria (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    fecha DATE NOT NULL COMMENT 'Día local de cierre',
+    moneda CHAR(3) NOT NULL COMMENT 'Código de moneda (PEN, USD, EUR)',
+    cantidad INT UNSIGNED NOT NULL DEFAULT 0 COMMENT 'Oportunidades ganadas en el día',
+    valor_total DECIMAL(16, 2) NOT NULL DEFAULT 0 COMMENT 'Suma de valor de las oportunidades ganadas',
+    UNIQUE KEY uniq_venta_diaria_fecha_moneda (fecha, moneda)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Rollup diario de ventas para reportes';
+
+-- ============================================
+-- TABLA: reportes_reportejob
+-- ============================================
+-- Cola de reportes asíncronos (?async=true). Worker:
+-- python manage.py procesar_reportes
+CREATE TABLE IF NOT EXISTS reportes_reportejob (
+    id CHAR(32) PRIMARY KEY COMMENT 'UUID del job',
+    tipo VARCHAR(40) NOT NULL COMMENT 'Nombre del reporte',
+    parametros JSON NOT NULL COMMENT 'Parámetros normalizados del reporte',
+    firma VARCHAR(64) NOT NULL COMMENT 'Hash de parámetros y generación de datos (deduplicación)',
+    estado ENUM('pendiente', 'procesando', 'completado', 'error') NOT NULL DEFAULT 'pendiente',
+    resultado JSON NULL COMMENT 'Salida del reporte',
+    error TEXT NULL,
+    usuario_id BIGINT NULL COMMENT 'FK a authentication_user (SET NULL)',
+    fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    fecha_inicio DATETIME(6) NULL,
+    fecha_fin DATETIME(6) NULL,
+    FOREIGN KEY (usuario_id) REFERENCES authentication_user(id) ON DELETE SET NULL ON UPDATE CASCADE,
+    INDEX idx_reportejob_estado (estado, fecha_creacion),
+    INDEX idx_reportejob_firma (firma, estado)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Cola de ejecución de reportes';
+
+-- ============================================
+-- TABLA: importaciones_importacion
+-- ============================================
+-- Archivos CSV/NDJSON subidos a /importaciones/. Worker:
+-- python manage.py procesar_importaciones
+CREATE TABLE IF NOT EXISTS importaciones_importacion (
+    id CHAR(32) PRIMARY KEY COMMENT 'UUID de la importación',
+    recurso ENUM('empresas', 'clientes') NOT NULL,
+    formato ENUM('csv', 'ndjson') NOT NULL,
+    archivo VARCHAR(100) NOT NULL COMMENT 'Ruta del archivo en MEDIA_ROOT',
+    nombre_archivo VARCHAR(255) NOT NULL COMMENT 'Nombre original del archivo subido',
+    tamano_bytes BIGINT NOT NULL DEFAULT 0,
+    bytes_leidos BIGINT NOT NULL DEFAULT 0 COMMENT 'Avance de la lectura (progreso)',
+    filas_procesadas INT UNSIGNED NOT NULL DEFAULT 0,
+    creados INT UNSIGNED NOT NULL DEFAULT 0,
+    actualizados INT UNSIGNED NOT NULL DEFAULT 0,
+    con_error INT UNSIGNED NOT NULL DEFAULT 0,
+    archivo_errores VARCHAR(100) NULL COMMENT 'Filas rechazadas, mismo formato que la entrada',
+    estado ENUM('pendiente', 'procesando', 'completado', 'error') NOT NULL DEFAULT 'pendiente',
+    error TEXT NULL,
+    usuario_id BIGINT NULL COMMENT 'FK a authentication_user (SET NULL)',
+    fecha_creacion DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    fecha_inicio DATETIME(6) NULL,
+    fecha_progreso DATETIME(6) NULL COMMENT 'Último lote procesado; sin avance por --timeout se reencola',
+    fecha_fin DATETIME(6) NULL,
+    FOREIGN KEY (usuario_id) REFERENCES authentication_user(id) ON DELETE SET NULL ON UPDATE CASCADE,
+    INDEX idx_importacion_estado (estado, fecha_creacion)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Importaciones masivas de empresas y clientes';
+
 -- ============================================
 -- TABLA: django_migrations (Django)
 -- ============================================
@@ -164,6 +291,15 @@ CREATE INDEX idx_oportunidad_estado_etapa ON oportunidades_oportunidad(estado, e
 -- Índice compuesto para reportes de actividades
 CREATE INDEX idx_actividad_usuario_fecha ON actividades_actividad(usuario_id, fecha_hora);
 
+-- Índice compuesto para rangos de ventas cerradas (fecha_cierre_real >= ? AND < ?)
+CREATE INDEX idx_oport_estado_cierre ON oportunidades_oportunidad(estado, resultado, fecha_cierre_real);
+
+-- Índice compuesto para el pipeline: conteo por etapa y cada columna en orden de creación
+CREATE INDEX idx_oport_etapa_creacion ON oportunidades_oportunidad(etapa, fecha_creacion);
+
+-- Índice compuesto para filtros de actividades por estado y rango de fecha
+CREATE INDEX idx_actividad_estado_fecha ON actividades_actividad(estado, fecha_hora);
+
 -- ============================================
 -- COMENTARIOS FINALES
 -- ============================================